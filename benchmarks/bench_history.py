@@ -0,0 +1,122 @@
+"""Time to read one player's history, indexed versus scanning every snapshot.
+
+Runs in-process with in-memory stand-ins for MinIO and Redis, so it measures the
+parsing and lookup work rather than network round trips, which only widen the gap:
+
+    poetry run python -m benchmarks.bench_history
+"""
+
+import asyncio
+import json
+import random
+import time
+
+from pubg.api import history
+from pubg.snapshot import decode_snapshot
+
+SNAPSHOTS = 50
+PLAYERS = 20_000
+LOOKUPS = 1_000
+
+
+class MemoryPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def zadd(self, key, mapping):
+        self.commands.append((key, mapping))
+
+    def zremrangebyscore(self, key, start, end):
+        pass  # the benchmark's snapshots all fall inside the retention window
+
+    def expire(self, key, seconds):
+        pass
+
+    async def execute(self):
+        for key, mapping in self.commands:
+            self.redis.zsets.setdefault(key, {}).update(mapping)
+
+
+class MemoryRedis:
+    def __init__(self):
+        self.strings = {}
+        self.zsets = {}
+
+    def pipeline(self):
+        return MemoryPipeline(self)
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def set(self, key, value):
+        self.strings[key] = value.encode()
+
+    async def zrange(self, key, start, end, byscore=False):
+        members = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        return [member.encode() for member, score in members if start <= score <= end]
+
+
+def _snapshots() -> dict[str, bytes]:
+    rng = random.Random(0)
+    bodies = {}
+    for day in range(SNAPSHOTS):
+        order = list(range(PLAYERS))
+        rng.shuffle(order)
+        players = {
+            f"account.{i}": {"rank": rank, "wins": i, "games_played": day}
+            for rank, i in enumerate(order, start=1)
+        }
+        name = f"data_2024-{1 + day // 28:02d}-{1 + day % 28:02d}-00-00-00.json"
+        bodies[name] = json.dumps(players).encode()
+    return bodies
+
+
+def _scan(bodies: dict[str, bytes], user_id: str) -> list:
+    """The naive read, every snapshot fetched and parsed for one player"""
+    return [decode_snapshot(body, {}).get(user_id) for body in bodies.values()]
+
+
+def main() -> None:
+    bodies = _snapshots()
+    redis = MemoryRedis()
+
+    async def list_snapshots(server, game_mode, start_after, limit):
+        return sorted(n for n in bodies if start_after is None or n > start_after)[
+            :limit
+        ]
+
+    async def stream(game_mode, file_name, server):
+        yield decode_snapshot(bodies[file_name], {})
+
+    history.get_redis_client = lambda: redis  # type: ignore[assignment]
+    history.list_minio_snapshots = list_snapshots  # type: ignore[assignment]
+    history.stream_minio_data = stream  # type: ignore[assignment]
+
+    start = time.perf_counter()
+    asyncio.run(history.index_history("steam", "solo"))
+    print(
+        f"indexed {SNAPSHOTS} snapshots of {PLAYERS} players in {time.perf_counter() - start:.2f}s"
+    )
+
+    start = time.perf_counter()
+    scanned = _scan(bodies, "account.7")
+    scan_seconds = time.perf_counter() - start
+
+    async def lookups():
+        for i in range(LOOKUPS):
+            points = await history.get_player_history("steam", "solo", f"account.{i}")
+        return points
+
+    start = time.perf_counter()
+    asyncio.run(lookups())
+    indexed_seconds = (time.perf_counter() - start) / LOOKUPS
+
+    assert len(scanned) == SNAPSHOTS
+    print(f"{'read':>8} {'ms/player':>12}")
+    print(f"{'scan':>8} {scan_seconds * 1000:>12.2f}")
+    print(f"{'indexed':>8} {indexed_seconds * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Latest-snapshot lookup latency vs bucket size, against a local MinIO.
+
+Run the docker-compose minio service first, then:
+
+    MINIO_ROOT_USER=minioadmin MINIO_ROOT_PASSWORD=minioadmin \\
+        poetry run python -m benchmarks.bench_minio_latest
+"""
+
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from pubg.api import minio_cache
+from pubg.api.clients import get_minio_client
+from pubg.config import MinioConfig
+
+BUCKET = "pubg-leaderboard-bucket-bench-latest"
+SIZES = [100, 1_000, 10_000]
+REPEATS = 20
+
+
+def _put(name: str, body: bytes) -> None:
+    get_minio_client().put_object(BUCKET, name, BytesIO(body), len(body))
+
+
+def _fill(count: int, start: datetime) -> str:
+    """Tops the bucket up to `count` snapshots and returns the newest name."""
+    client = get_minio_client()
+    existing = sum(
+        1 for _ in client.list_objects(BUCKET, prefix=MinioConfig.SNAPSHOT_PREFIX)
+    )
+    names = [
+        f"{MinioConfig.SNAPSHOT_PREFIX}{start + timedelta(hours=i):%Y-%m-%d-%H-%M-%S}.json"
+        for i in range(existing, count)
+    ]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda name: _put(name, b"{}"), names))
+    return f"{MinioConfig.SNAPSHOT_PREFIX}{start + timedelta(hours=count - 1):%Y-%m-%d-%H-%M-%S}.json"
+
+
+def _time_ms(fn) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _full_listing() -> str | None:
+    newest = None
+    for obj in get_minio_client().list_objects(BUCKET, recursive=True):
+        if newest is None or obj.last_modified > newest.last_modified:
+            newest = obj
+    return newest.object_name if newest else None
+
+
+def main() -> None:
+    client = get_minio_client()
+    if not client.bucket_exists(BUCKET):
+        client.make_bucket(BUCKET)
+
+    start = datetime(2020, 1, 1)
+    print(
+        f"{'objects':>8} {'full listing ms':>16} {'prefix fallback ms':>19} {'pointer ms':>11}"
+    )
+    for size in SIZES:
+        newest = _fill(size, start)
+        _put(
+            MinioConfig.LATEST_POINTER_NAME,
+            json.dumps({"object_name": newest}).encode(),
+        )
+
+        pointer_ms = _time_ms(lambda: minio_cache._find_most_recent(BUCKET))
+        client.remove_object(BUCKET, MinioConfig.LATEST_POINTER_NAME)
+        fallback_ms = _time_ms(lambda: minio_cache._find_most_recent(BUCKET))
+        listing_ms = _time_ms(_full_listing)
+
+        print(f"{size:>8} {listing_ms:>16.2f} {fallback_ms:>19.2f} {pointer_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
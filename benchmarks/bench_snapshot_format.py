@@ -0,0 +1,61 @@
+"""Size and encode/decode time of the snapshot formats on a synthetic leaderboard.
+
+    poetry run python -m benchmarks.bench_snapshot_format
+"""
+
+import random
+import timeit
+
+from pubg.snapshot import (
+    COLUMNAR_FORMAT,
+    JSON_FORMAT,
+    decode_snapshot,
+    encode_snapshot,
+    zstandard,
+)
+
+PLAYERS = [500, 100_000]
+REPEATS = 5
+
+
+def _leaderboard(count: int) -> dict:
+    rng = random.Random(0)
+    return {
+        f"account.{rng.getrandbits(128):032x}": {
+            "rank": rank,
+            "wins": rng.randint(0, 500),
+            "games_played": rng.randint(0, 5000),
+        }
+        for rank in range(1, count + 1)
+    }
+
+
+def main() -> None:
+    variants = [(JSON_FORMAT, "none"), (JSON_FORMAT, "gzip")]
+    variants += [(COLUMNAR_FORMAT, "none"), (COLUMNAR_FORMAT, "gzip")]
+    if zstandard is not None:
+        variants += [(JSON_FORMAT, "zstd"), (COLUMNAR_FORMAT, "zstd")]
+
+    for count in PLAYERS:
+        data = _leaderboard(count)
+        print(f"\n{count} players")
+        print(
+            f"{'format':>12} {'compression':>12} {'bytes':>12} {'encode ms':>10} {'decode ms':>10}"
+        )
+        for fmt, compression in variants:
+            body, metadata, _ = encode_snapshot(data, fmt=fmt, compression=compression)
+            headers = {f"x-amz-meta-{key}": value for key, value in metadata.items()}
+            encode = timeit.timeit(
+                lambda: encode_snapshot(data, fmt, compression), number=REPEATS
+            )
+            decode = timeit.timeit(
+                lambda: decode_snapshot(body, headers), number=REPEATS
+            )
+            print(
+                f"{fmt:>12} {compression:>12} {len(body):>12} "
+                f"{encode / REPEATS * 1000:>10.2f} {decode / REPEATS * 1000:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Peak memory of loading a synthetic 1M-player snapshot whole versus streamed.
+
+    poetry run python -m benchmarks.bench_snapshot_memory
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from pubg.config import MinioConfig
+from pubg.snapshot import decode_snapshot, iter_snapshot
+
+PLAYERS = 1_000_000
+
+
+def _write_snapshot(path: str, count: int) -> None:
+    rng = random.Random(0)
+    with open(path, "w") as f:
+        f.write("{")
+        for rank in range(1, count + 1):
+            stats = {
+                "rank": rank,
+                "wins": rng.randint(0, 500),
+                "games_played": rng.randint(0, 5000),
+            }
+            separator = "," if rank > 1 else ""
+            f.write(
+                f'{separator}"account.{rng.getrandbits(128):032x}": {json.dumps(stats)}'
+            )
+        f.write("}")
+
+
+def _whole(path: str) -> int:
+    with open(path, "rb") as f:
+        return len(decode_snapshot(f.read(), {}))
+
+
+def _streamed(path: str) -> int:
+    players = 0
+    with open(path, "rb") as f:
+        chunks = iter(lambda: f.read(MinioConfig.SNAPSHOT_STREAM_CHUNK_SIZE), b"")
+        for batch in iter_snapshot(
+            chunks, {}, batch_size=MinioConfig.SNAPSHOT_STREAM_BATCH_SIZE
+        ):
+            players += len(batch)  # each batch would be written to Redis and dropped
+    return players
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snapshot.json")
+        _write_snapshot(path, PLAYERS)
+        size = os.path.getsize(path)
+        print(f"{PLAYERS} players, {size / 2**20:.1f} MiB of JSON")
+        print(f"{'reader':>10} {'players':>10} {'peak MiB':>10} {'seconds':>10}")
+
+        for name, reader in [("whole", _whole), ("streamed", _streamed)]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            players = reader(path)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:>10} {players:>10} {peak / 2**20:>10.1f} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Requests/sec of /get_user_data for a cached player, model-built vs pre-serialized.
+
+Runs in-process against an in-memory Redis stand-in, so it measures only the
+per-request work of a single worker:
+
+    poetry run python -m benchmarks.bench_user_response
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+from fastapi import APIRouter, FastAPI, HTTPException
+
+from pubg.api import redis_cache
+from pubg.api.models import UserDataRequest, UserDataResponse
+from pubg.api.router import router
+
+REQUESTS = 5_000
+PLAYER = {"rank": 1, "wins": 10, "games_played": 100}
+
+
+class MemoryRedis:
+    async def get(self, key):
+        if key == redis_cache.GENERATION_POINTER_KEY:
+            return None
+        return json.dumps(PLAYER).encode()
+
+
+legacy = APIRouter()
+
+
+@legacy.get("/get_user_data/{user_id}", response_model=UserDataResponse)
+async def get_user_data_model(user_id: str) -> UserDataResponse:
+    """The handler as it was, building the model and re-validating it on the way out."""
+    UserDataRequest(user_id=user_id)
+    data = await redis_cache.fetch_redis(user_id=user_id)
+    if not data:
+        raise HTTPException(status_code=404)
+    return UserDataResponse(user_id=user_id, **data)
+
+
+async def _requests_per_second(target: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await client.get("/get_user_data/account.bench")  # warm the caches
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            response = await client.get("/get_user_data/account.bench")
+            assert response.status_code == 200
+        return REQUESTS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    redis_cache.get_redis_client = lambda: MemoryRedis()  # type: ignore[assignment]
+    # Bare apps, so middleware does not dilute the difference
+    legacy_app, current_app = FastAPI(), FastAPI()
+    legacy_app.include_router(legacy)
+    current_app.include_router(router)
+
+    print(f"{'path':>16} {'requests/s':>12}")
+    for name, target in [("model", legacy_app), ("pre-serialized", current_app)]:
+        requests = asyncio.run(_requests_per_second(target))
+        print(f"{name:>16} {requests:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
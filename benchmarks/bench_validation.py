@@ -0,0 +1,77 @@
+"""Validations/sec of the request models, list scans and strptime vs the current checks.
+
+Runs in-process without any backend, so it measures only the validators:
+
+    poetry run python -m benchmarks.bench_validation
+"""
+
+import time
+from datetime import datetime
+
+from pydantic import BaseModel, field_validator
+
+from pubg.api.models import GameModeRequest, UserDataRequest, WriteRedisRequest
+from pubg.jobs.config import PUBGConfig
+
+VALIDATIONS = 20_000
+OBJECT_NAME = "data_2022-03-25-12-30-45.json"
+
+
+class LegacyWriteRedisRequest(BaseModel):
+    """The request as it was, scanning the configured lists and calling strptime."""
+
+    object_name: str
+    game_mode: str
+    server: str
+
+    @field_validator("server")
+    def validate_server(cls, v):
+        if v not in PUBGConfig.SERVERS:
+            raise ValueError(f"Invalid server: {v}")
+        return v
+
+    @field_validator("game_mode")
+    def validate_game_mode(cls, v):
+        if v not in PUBGConfig.GAME_MODE:
+            raise ValueError(f"Invalid game mode: {v}")
+        return v
+
+    @field_validator("object_name")
+    def validate_object_name(cls, v):
+        datetime.strptime(v.split("_")[1].split(".")[0], "%Y-%m-%d-%H-%M-%S")
+        return v
+
+
+def _per_second(validate) -> float:
+    start = time.perf_counter()
+    for _ in range(VALIDATIONS):
+        validate()
+    return VALIDATIONS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    write_redis = {
+        "object_name": OBJECT_NAME,
+        "server": "kakao",
+        "game_mode": "squad-fpp",
+    }
+    cases = [
+        # The old handlers rebuilt the model from the parsed body, validating twice
+        (
+            "legacy write_redis",
+            lambda: LegacyWriteRedisRequest(
+                **LegacyWriteRedisRequest(**write_redis).model_dump()
+            ),
+        ),
+        ("write_redis", lambda: WriteRedisRequest(**write_redis)),
+        ("game_mode", lambda: GameModeRequest(server="xbox", game_mode="squad")),
+        ("user_id", lambda: UserDataRequest(user_id="account.user123")),
+    ]
+
+    print(f"{'model':>20} {'validations/s':>14}")
+    for name, validate in cases:
+        print(f"{name:>20} {_per_second(validate):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
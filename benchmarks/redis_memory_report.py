@@ -0,0 +1,100 @@
+"""Memory footprint and read latency of the Redis player layouts.
+
+Loads a synthetic 100k player leaderboard under a throwaway key prefix for each
+layout, reports MEMORY USAGE and GET latency, then deletes the keys again. Run the
+docker-compose redis_cluster service first, then:
+
+    REDIS_HOST=localhost REDIS_PORT=7000 poetry run python -m benchmarks.redis_memory_report
+"""
+
+import json
+import random
+import statistics
+import time
+
+from redis.cluster import RedisCluster
+
+from pubg.api.redis_cache import HASH_LAYOUT, LAYOUTS
+from pubg.config import RedisConfig
+
+PLAYERS = 100_000
+SAMPLES = 2_000
+PIPELINE_SIZE = 1_000
+
+
+def _players() -> dict:
+    rng = random.Random(0)
+    return {
+        f"account.{rng.getrandbits(128):032x}": {
+            "rank": rank,
+            "wins": rng.randint(0, 500),
+            "games_played": rng.randint(0, 5000),
+        }
+        for rank in range(1, PLAYERS + 1)
+    }
+
+
+def _used_memory(client: RedisCluster) -> int:
+    info = client.info("memory", target_nodes=RedisCluster.PRIMARIES)
+    return sum(node["used_memory"] for node in info.values())
+
+
+def _load(client: RedisCluster, keys: list, players: dict, layout: str) -> None:
+    pipe = client.pipeline()
+    for i, (key, stats) in enumerate(zip(keys, players.values()), start=1):
+        if layout == HASH_LAYOUT:
+            pipe.hset(key, mapping=stats)
+        else:
+            pipe.set(key, json.dumps(stats))
+        if i % PIPELINE_SIZE == 0:
+            pipe.execute()
+    pipe.execute()
+
+
+def _read_latency_ms(client: RedisCluster, keys: list, layout: str) -> list:
+    read = client.hgetall if layout == HASH_LAYOUT else client.get
+    samples = []
+    for key in random.Random(1).sample(keys, SAMPLES):
+        start = time.perf_counter()
+        read(key)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    client = RedisCluster(
+        host=RedisConfig.REDIS_HOST,
+        port=RedisConfig.REDIS_PORT,
+        password=RedisConfig.REDIS_PASSWORD or None,
+    )
+    players = _players()
+
+    print(
+        f"{'layout':>6} {'MEMORY USAGE avg B':>19} {'used_memory delta MB':>21} "
+        f"{'read p50 ms':>12} {'read p99 ms':>12}"
+    )
+    for layout in LAYOUTS:
+        keys = [f"bench:{layout}:{player_id}" for player_id in players]
+        before = _used_memory(client)
+        _load(client, keys, players, layout)
+        delta_mb = (_used_memory(client) - before) / 1024**2
+
+        sampled = random.Random(2).sample(keys, SAMPLES)
+        usage = statistics.mean(client.memory_usage(key) for key in sampled)
+        latencies = _read_latency_ms(client, keys, layout)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+
+        print(
+            f"{layout:>6} {usage:>19.1f} {delta_mb:>21.1f} "
+            f"{statistics.median(latencies):>12.3f} {p99:>12.3f}"
+        )
+
+        for i in range(0, len(keys), PIPELINE_SIZE):
+            pipe = client.pipeline()
+            for key in keys[i : i + PIPELINE_SIZE]:
+                pipe.delete(key)
+            pipe.execute()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,4 +9,34 @@ class WebsiteUser(HttpUser):
 
     @task
     def get_user_data(self):
-        self.client.get("/get_user_data/account.ef517fe2035046c28edb1b012acc20b6")
\ No newline at end of file
+        self.client.get("/get_user_data/account.ef517fe2035046c28edb1b012acc20b6")
+
+    @task
+    def get_users_data(self):
+        self.client.post(
+            "/get_users_data",
+            json={
+                "user_ids": [
+                    "account.ef517fe2035046c28edb1b012acc20b6",
+                    "account.0d7ba9ea3e8a4ec3a5a2b8c2b0fd4b77",
+                    "account.5d7f3e0c9e1d4b5e8f0a7c6b2d1e3f4a",
+                    "account.9a8b7c6d5e4f4a3b2c1d0e9f8a7b6c5d",
+                ]
+            },
+        )
+
+
+class HotPathUser(HttpUser):
+    """Back-to-back traffic on the backend-bound endpoints, used to compare p50/p99 latency"""
+
+    wait_time = between(0, 0.1)
+
+    @task(10)
+    def get_user_data(self):
+        self.client.get("/get_user_data/account.ef517fe2035046c28edb1b012acc20b6")
+
+    @task(1)
+    def most_recent_data(self):
+        self.client.get(
+            "/most_recent_data", json={"server": "steam", "game_mode": "squad-fpp"}
+        )
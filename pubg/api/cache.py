@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+import cachetools
+
+from pubg.api.coalesce import SingleFlight
+from pubg.api.metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
+
+
+class _InstrumentedTLRUCache(cachetools.TLRUCache):
+    """TLRUCache that counts size evictions and TTL expirations"""
+
+    def __init__(self, name: str, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._name = name
+
+    def popitem(self) -> Tuple[Any, Any]:
+        item = super().popitem()
+        CACHE_EVICTIONS.labels(cache=self._name, reason="size").inc()
+        return item
+
+    def expire(self, time: Any = None) -> Any:
+        expired = super().expire(time)
+        if expired:
+            CACHE_EVICTIONS.labels(cache=self._name, reason="expired").inc(len(expired))
+        return expired
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with separate TTLs for found and not-found results.
+
+    Misses are cached as None for `negative_ttl`, so unknown IDs do not hit the backend
+    on every request but newly loaded players show up quickly. `invalidate` bumps a
+    generation counter and empties the cache, and `store` drops any value whose load
+    started before the most recent invalidation, so an in-flight read cannot put stale
+    data back.
+    """
+
+    def __init__(
+        self, name: str, maxsize: int, ttl: float, negative_ttl: float
+    ) -> None:
+        """
+        Args:
+            name (str): Label for the cache's Prometheus metrics.
+            maxsize (int): Maximum number of entries before least recently used ones are evicted.
+            ttl (float): Seconds a found value is served from the cache.
+            negative_ttl (float): Seconds a not-found (None) result is served from the cache.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.generation = 0
+        self._cache = _InstrumentedTLRUCache(name, maxsize=maxsize, ttu=self._ttu)
+
+    def _ttu(self, _key: Hashable, value: Any, now: float) -> float:
+        return now + (self.negative_ttl if value is None else self.ttl)
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Returns (True, value) on a hit, value may be None for a cached miss, else (False, None)."""
+        try:
+            value = self._cache[key]
+        except KeyError:
+            CACHE_LOOKUPS.labels(cache=self.name, result="miss").inc()
+            return False, None
+
+        result = "negative_hit" if value is None else "hit"
+        CACHE_LOOKUPS.labels(cache=self.name, result=result).inc()
+        return True, value
+
+    def store(self, key: Hashable, value: Any, generation: int) -> None:
+        """Caches a loaded value, unless the cache was invalidated since `generation` was read."""
+        if generation == self.generation:
+            self._cache[key] = value
+
+    def invalidate(self) -> None:
+        """Drops every entry and any load still in flight."""
+        self.generation += 1
+        self._cache.clear()
+
+    def evict(self, keys: Iterable[Hashable]) -> None:
+        """Drops the given entries, and any load still in flight."""
+        self.generation += 1
+        for key in keys:
+            self._cache.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class StaleWhileRevalidateCache:
+    """Small in-process cache that answers from memory and refreshes in the background.
+
+    Values younger than `soft_ttl` are served as is. Older ones are still served while a
+    single background load replaces them, until they reach `hard_ttl`, after which
+    callers wait for a fresh load. A failed background load keeps the old value.
+    `invalidate` drops entries and any load in flight, as in LocalCache.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        soft_ttl: float,
+        hard_ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            name (str): Label for the cache's Prometheus metrics.
+            soft_ttl (float): Seconds a value is served before it is refreshed.
+            hard_ttl (float): Seconds after which a value is no longer served at all.
+            timer (Callable[[], float]): Clock the TTLs are measured against.
+        """
+        self.name = name
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.generation = 0
+        self._timer = timer
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._flight = SingleFlight(name)
+        self._refreshes: Set[asyncio.Future[Any]] = set()
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the cached value for `key`, loading it with `load` if there is none.
+
+        Raises:
+            Exception: Whatever `load` raises, when there is no value to fall back on.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, loaded_at = entry
+            age = self._timer() - loaded_at
+            if age < self.soft_ttl:
+                CACHE_LOOKUPS.labels(cache=self.name, result="hit").inc()
+                return value
+            if age < self.hard_ttl:
+                CACHE_LOOKUPS.labels(cache=self.name, result="stale").inc()
+                self._refresh_in_background(key, load)
+                return value
+
+        CACHE_LOOKUPS.labels(cache=self.name, result="miss").inc()
+        return await self._load(key, load)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self.generation
+
+        async def load_and_store() -> Any:
+            value = await load()
+            if generation == self.generation:
+                self._entries[key] = (value, self._timer())
+            return value
+
+        return await self._flight.do((key, generation), load_and_store)
+
+    def _refresh_in_background(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> None:
+        if (key, self.generation) in self._flight:
+            return
+        refresh = asyncio.ensure_future(self._load(key, load))
+        # Held until done, the event loop only keeps weak references to tasks
+        self._refreshes.add(refresh)
+        refresh.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, refresh: asyncio.Future[Any]) -> None:
+        self._refreshes.discard(refresh)
+        if not refresh.cancelled() and refresh.exception() is not None:
+            logging.warning(
+                f"Background refresh of {self.name} failed: {refresh.exception()}"
+            )
+
+    def invalidate(self, keys: Iterable[Hashable] | None = None) -> None:
+        """Drops the given entries, or all of them, and any load still in flight."""
+        self.generation += 1
+        if keys is None:
+            self._entries.clear()
+        else:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,99 @@
+import logging
+
+import urllib3
+from minio import Minio
+from redis.asyncio.cluster import RedisCluster as Redis
+
+from pubg.config import MinioConfig, RedisConfig
+
+# Long-lived clients shared by every request handled by this process
+_redis_client: Redis | None = None
+_minio_client: Minio | None = None
+_minio_http: urllib3.PoolManager | None = None
+
+
+def _build_redis_client() -> Redis:
+    """Creates an asyncio Redis cluster client with bounded, health-checked connection pools.
+
+    Returns:
+        Redis: A client that discovers the cluster slot layout on first use.
+    """
+    return Redis(
+        host=RedisConfig.REDIS_HOST,
+        password=RedisConfig.REDIS_PASSWORD,
+        port=RedisConfig.REDIS_PORT,
+        max_connections=RedisConfig.REDIS_MAX_CONNECTIONS,
+        health_check_interval=RedisConfig.REDIS_HEALTH_CHECK_INTERVAL,
+        socket_timeout=RedisConfig.REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+    )
+
+
+def _build_minio_client() -> tuple[Minio, urllib3.PoolManager]:
+    """Creates a MinIO client backed by a bounded urllib3 connection pool.
+
+    Returns:
+        tuple[Minio, urllib3.PoolManager]: The client and the pool it uses, so the pool can be cleared on shutdown.
+    """
+    http_client = urllib3.PoolManager(
+        maxsize=MinioConfig.MINIO_MAX_POOL_SIZE,
+        block=True,  # wait for a free connection instead of opening unbounded extras
+        timeout=urllib3.Timeout(
+            connect=MinioConfig.MINIO_CONNECT_TIMEOUT,
+            read=MinioConfig.MINIO_READ_TIMEOUT,
+        ),
+        retries=urllib3.Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+        ),
+    )
+    minio_client = Minio(
+        endpoint=MinioConfig.MINIO_ENDPOINT,
+        access_key=MinioConfig.MINIO_ROOT_USER,
+        secret_key=MinioConfig.MINIO_ROOT_PASSWORD,
+        secure=False,  # no TLS encryption
+        http_client=http_client,
+    )
+    return minio_client, http_client
+
+
+def get_redis_client() -> Redis:
+    """Returns the process-wide Redis client, creating it on first use."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = _build_redis_client()
+    return _redis_client
+
+
+def get_minio_client() -> Minio:
+    """Returns the process-wide MinIO client, creating it on first use."""
+    global _minio_client, _minio_http
+    if _minio_client is None:
+        _minio_client, _minio_http = _build_minio_client()
+    return _minio_client
+
+
+async def init_clients() -> None:
+    """Creates the shared clients at application startup.
+
+    A backend that is unreachable at startup is logged rather than raised, the Redis
+    slot layout is then discovered lazily by the first request that needs it.
+    """
+    get_minio_client()
+    try:
+        await get_redis_client().initialize()
+    except Exception as e:
+        logging.warning("Redis unavailable at startup, will connect lazily: %s", e)
+
+
+async def close_clients() -> None:
+    """Closes the shared clients and releases their pooled connections."""
+    global _redis_client, _minio_client, _minio_http
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+    if _minio_http is not None:
+        _minio_http.clear()
+        _minio_http = None
+    _minio_client = None
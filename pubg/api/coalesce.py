@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from pubg.api.metrics import REQUESTS_COALESCED
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Shares one in-flight backend call between concurrent callers with the same key.
+
+    The first caller for a key starts the call, everyone arriving before it finishes
+    awaits the same result or exception. Nothing is kept once the call completes, so
+    this only collapses bursts, caching is left to LocalCache.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name (str): Label for the coalesced requests metric.
+        """
+        self._name = name
+        self._calls: Dict[Hashable, asyncio.Future[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Runs `call`, or joins the run already in flight for `key`.
+
+        A caller being cancelled does not cancel the shared call for the others.
+
+        Args:
+            key (Hashable): Identifies calls that are interchangeable.
+            call (Callable[[], Awaitable[T]]): Starts the backend call.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            REQUESTS_COALESCED.labels(call=self._name).inc()
+        else:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved so an error is not reported as unhandled if every caller left
+            task.exception()
@@ -7,6 +7,47 @@ class _Config:
     APP_ENV = os.getenv("APP_ENV", "localhost")
     IS_DEBUG = APP_ENV != "production"
 
+    # Server/game mode combinations refreshed at once by /refresh_all_data
+    REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "5"))
+
+    # "full" loads every player into a new generation, "delta" writes only changes in place
+    REFRESH_MODE = os.getenv("REFRESH_MODE", "full")
+
+    # In-process cache in front of fetch_redis, misses are kept for the shorter TTL
+    USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", "10000"))
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+    USER_CACHE_NEGATIVE_TTL = float(os.getenv("USER_CACHE_NEGATIVE_TTL", "15"))
+
+    # Newest snapshot name per server/game mode, refreshed in the background once soft
+    # expired and no longer served once hard expired
+    RECENT_CACHE_SOFT_TTL = float(os.getenv("RECENT_CACHE_SOFT_TTL", "30"))
+    RECENT_CACHE_HARD_TTL = float(os.getenv("RECENT_CACHE_HARD_TTL", "900"))
+
+    # Seconds the live player generation pointer is cached per worker
+    GENERATION_POINTER_TTL = float(os.getenv("GENERATION_POINTER_TTL", "1"))
+
+    # Redis pub/sub channel every worker listens on to evict updated players
+    CACHE_INVALIDATION_CHANNEL = os.getenv(
+        "CACHE_INVALIDATION_CHANNEL", "pubg:leaderboard-updated"
+    )
+    CACHE_INVALIDATION_ENABLED = (
+        os.getenv("CACHE_INVALIDATION_ENABLED", "true") == "true"
+    )
+
+    # Load each snapshot as soon as MinIO reports it written. Every worker listens, one
+    # claims each object, and bursts for a bucket are folded into one load of the newest
+    SNAPSHOT_NOTIFICATIONS_ENABLED = (
+        os.getenv("SNAPSHOT_NOTIFICATIONS_ENABLED", "false") == "true"
+    )
+    SNAPSHOT_NOTIFY_DEBOUNCE = float(os.getenv("SNAPSHOT_NOTIFY_DEBOUNCE", "2"))
+    SNAPSHOT_NOTIFY_CLAIM_TTL = int(os.getenv("SNAPSHOT_NOTIFY_CLAIM_TTL", "86400"))
+
+    # Seconds between history indexing runs. One worker claims each run, and it must
+    # stay well inside MinioConfig.RETENTION_KEEP_DAYS, since snapshots are archived
+    # out of the indexer's reach after that
+    HISTORY_INDEX_ENABLED = os.getenv("HISTORY_INDEX_ENABLED", "true") == "true"
+    HISTORY_INDEX_INTERVAL = float(os.getenv("HISTORY_INDEX_INTERVAL", "3600"))
+
     def __str__(self) -> str:
         return f'Config: name="{self.APP_NAME}" version="{self.APP_VERSION}" env="{self.APP_ENV}"'
 
@@ -0,0 +1,153 @@
+import json
+import logging
+from typing import Dict, List, Set, Tuple
+
+from pubg.api.clients import get_redis_client
+
+# What a delta refresh last loaded for each server/game mode. Both keys share a hash
+# tag, so they can be replaced together in one pipeline.
+
+
+def _state_key(server: str, game_mode: str) -> str:
+    return f"pubg:refresh:{{{server}:{game_mode}}}:state"
+
+
+def _players_key(server: str, game_mode: str) -> str:
+    return f"pubg:refresh:{{{server}:{game_mode}}}:players"
+
+
+def _generation_field(generation: int | None) -> str:
+    return "" if generation is None else str(generation)
+
+
+def _fingerprint(stats: Dict[str, int]) -> str:
+    return json.dumps(stats, sort_keys=True)
+
+
+async def get_loaded_snapshot(
+    server: str, game_mode: str, generation: int | None
+) -> Tuple[str | None, Dict[str, str]]:
+    """Reads what was last loaded for a server/game mode into a generation.
+
+    State recorded against another generation is ignored, as that generation's players
+    are not the ones being served.
+
+    Args:
+        server (str): The server of the leaderboard.
+        game_mode (str): The game mode of the leaderboard.
+        generation (Optional[int]): The generation being written to.
+
+    Returns:
+        Tuple[Optional[str], Dict[str, str]]: The ETag of the snapshot, and each of its
+            players' stats as a fingerprint. None and empty if nothing is known.
+    """
+    redis_client = get_redis_client()
+    pipe = redis_client.pipeline()
+    pipe.hgetall(_state_key(server, game_mode))
+    pipe.hgetall(_players_key(server, game_mode))
+    state, players = await pipe.execute()
+
+    state = {
+        field.decode("utf-8"): value.decode("utf-8") for field, value in state.items()
+    }
+    if state.get("generation") != _generation_field(generation):
+        return None, {}
+
+    return state.get("etag"), {
+        user_id.decode("utf-8"): fingerprint.decode("utf-8")
+        for user_id, fingerprint in players.items()
+    }
+
+
+def diff_players(
+    previous: Dict[str, str], data: Dict[str, Dict[str, int]]
+) -> Tuple[Dict[str, Dict[str, int]], List[str]]:
+    """Finds the players whose stats changed since the previous snapshot.
+
+    Args:
+        previous (Dict[str, str]): Fingerprints of the previously loaded players.
+        data (Dict[str, Dict[str, int]]): The new snapshot.
+
+    Returns:
+        Tuple[Dict[str, Dict[str, int]], List[str]]: The new or changed players, and
+            the IDs of players no longer on the leaderboard.
+    """
+    changed = {
+        user_id: stats
+        for user_id, stats in data.items()
+        if previous.get(user_id) != _fingerprint(stats)
+    }
+    removed = [user_id for user_id in previous if user_id not in data]
+    return changed, removed
+
+
+async def listed_players(
+    combinations: List[Tuple[str, str]], generation: int | None, user_ids: List[str]
+) -> Set[str]:
+    """Finds which players another leaderboard's last loaded snapshot still lists.
+
+    Player keys are shared by every leaderboard, so one that drops off a leaderboard
+    must keep its key while any other leaderboard has it. Leaderboards with no state
+    for this generation list nobody.
+
+    Args:
+        combinations (List[Tuple[str, str]]): The (server, game_mode) leaderboards to check.
+        generation (Optional[int]): The generation being written to.
+        user_ids (List[str]): The players to look for.
+
+    Returns:
+        Set[str]: The players listed by at least one of the leaderboards.
+    """
+    if not user_ids or not combinations:
+        return set()
+
+    pipe = get_redis_client().pipeline()
+    for server, game_mode in combinations:
+        pipe.hget(_state_key(server, game_mode), "generation")
+        pipe.hmget(_players_key(server, game_mode), user_ids)
+    replies = await pipe.execute()
+
+    listed: Set[str] = set()
+    for loaded_generation, fingerprints in zip(replies[::2], replies[1::2]):
+        if loaded_generation is None or loaded_generation.decode(
+            "utf-8"
+        ) != _generation_field(generation):
+            continue
+        listed.update(
+            user_id
+            for user_id, fingerprint in zip(user_ids, fingerprints)
+            if fingerprint is not None
+        )
+    return listed
+
+
+async def save_loaded_snapshot(
+    server: str,
+    game_mode: str,
+    generation: int | None,
+    etag: str,
+    data: Dict[str, Dict[str, int]],
+) -> None:
+    """Records a snapshot as loaded, to diff the next one against.
+
+    Args:
+        server (str): The server of the leaderboard.
+        game_mode (str): The game mode of the leaderboard.
+        generation (Optional[int]): The generation it was loaded into.
+        etag (str): The ETag of the snapshot.
+        data (Dict[str, Dict[str, int]]): The players it contained.
+    """
+    players_key = _players_key(server, game_mode)
+    pipe = get_redis_client().pipeline()
+    pipe.delete(players_key)
+    if data:
+        pipe.hset(
+            players_key,
+            mapping={user_id: _fingerprint(stats) for user_id, stats in data.items()},
+        )
+    pipe.hset(
+        _state_key(server, game_mode),
+        mapping={"etag": etag, "generation": _generation_field(generation)},
+    )
+    await pipe.execute()
+    logging.info(f"Recorded snapshot {etag} as loaded for {server} {game_mode}")
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+from pubg.api.clients import get_redis_client
+from pubg.api.minio_cache import list_minio_snapshots, stream_minio_data
+from pubg.api.models import HistoryIndexResult
+from pubg.config import RedisConfig
+from pubg.snapshot import snapshot_timestamp
+
+# Each player's history is a sorted set of "timestamp:rank:wins:games_played" members
+# scored by the snapshot time. Indexing the same snapshot twice adds nothing new, so a
+# run that fails before moving the cursor can simply be repeated. Points older than
+# RedisConfig.REDIS_HISTORY_RETENTION_DAYS are trimmed whenever a player is indexed.
+
+
+INDEXER_CLAIM_KEY = "pubg:history:indexer"
+
+
+def _history_key(server: str, game_mode: str, user_id: str) -> str:
+    return f"pubg:history:{server}:{game_mode}:{user_id}"
+
+
+def _cursor_key(server: str, game_mode: str) -> str:
+    return f"pubg:history:{server}:{game_mode}:cursor"
+
+
+def _encode_point(timestamp: int, stats: Dict[str, int | None]) -> str:
+    values = (stats.get("rank"), stats.get("wins"), stats.get("games_played"))
+    return ":".join([str(timestamp), *("" if v is None else str(v) for v in values)])
+
+
+def _decode_point(member: bytes) -> Dict[str, datetime | int | None]:
+    timestamp, rank, wins, games_played = member.decode("utf-8").split(":")
+    return {
+        "timestamp": datetime.fromtimestamp(int(timestamp), tz=timezone.utc),
+        "rank": int(rank) if rank else None,
+        "wins": int(wins) if wins else None,
+        "games_played": int(games_played) if games_played else None,
+    }
+
+
+def _score(moment: datetime) -> float:
+    # Scores are UTC epoch seconds, a naive time would otherwise be read as local time
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+async def _index_snapshot(server: str, game_mode: str, object_name: str) -> int:
+    timestamp = int(_score(snapshot_timestamp(object_name)))
+    retention = RedisConfig.REDIS_HISTORY_RETENTION_DAYS * 24 * 60 * 60
+    redis_client = get_redis_client()
+    players = 0
+
+    async for batch in stream_minio_data(
+        game_mode=game_mode, file_name=object_name, server=server
+    ):
+        pipe = redis_client.pipeline()
+        for user_id, stats in batch.items():
+            key = _history_key(server, game_mode, user_id)
+            pipe.zadd(key, {_encode_point(timestamp, stats): timestamp})
+            pipe.zremrangebyscore(key, "-inf", f"({timestamp - retention}")
+            pipe.expire(key, retention)
+        await pipe.execute()
+        players += len(batch)
+    return players
+
+
+async def index_history(server: str, game_mode: str) -> List[str]:
+    """Compacts snapshots written since the last run into each player's rank history.
+
+    Snapshots are indexed oldest first, and the cursor moves past each one only once
+    it is fully indexed. At most RedisConfig.REDIS_HISTORY_INDEX_BATCH snapshots are
+    indexed per call, so a backlog is worked through over several runs.
+
+    Args:
+        server (str): The server to index.
+        game_mode (str): The game mode to index.
+
+    Returns:
+        List[str]: The snapshots indexed, oldest first.
+
+    Raises:
+        S3Error: If a snapshot cannot be listed or read.
+        RedisError: If the history cannot be written.
+    """
+    redis_client = get_redis_client()
+    cursor_key = _cursor_key(server, game_mode)
+    cursor = await redis_client.get(cursor_key)
+
+    names = await list_minio_snapshots(
+        server,
+        game_mode,
+        start_after=cursor.decode("utf-8") if cursor is not None else None,
+        limit=RedisConfig.REDIS_HISTORY_INDEX_BATCH,
+    )
+
+    indexed = []
+    for object_name in names:
+        try:
+            snapshot_timestamp(object_name)
+        except ValueError:
+            logging.warning(f"Skipping {object_name}, its name has no timestamp")
+        else:
+            players = await _index_snapshot(server, game_mode, object_name)
+            logging.info(f"Indexed {players} players from {object_name}")
+            indexed.append(object_name)
+        await redis_client.set(cursor_key, object_name)
+    return indexed
+
+
+async def get_player_history(
+    server: str,
+    game_mode: str,
+    user_id: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> List[Dict[str, datetime | int | None]]:
+    """Reads a player's indexed history with a single ZRANGE.
+
+    Args:
+        server (str): The server of the leaderboard.
+        game_mode (str): The game mode of the leaderboard.
+        user_id (str): The player.
+        since (datetime, optional): Leave out snapshots taken before this time.
+        until (datetime, optional): Leave out snapshots taken after this time.
+            Naive times are read as UTC, like the snapshot names.
+
+    Returns:
+        List[Dict]: The player's timestamp, rank, wins and games_played per snapshot, oldest first.
+    """
+    members = await get_redis_client().zrange(
+        _history_key(server, game_mode, user_id),
+        _score(since) if since is not None else float("-inf"),
+        _score(until) if until is not None else float("inf"),
+        byscore=True,
+    )
+    return [_decode_point(member) for member in members]
+
+
+async def _claim_indexing_run(interval: float) -> bool:
+    try:
+        claimed = await get_redis_client().set(
+            INDEXER_CLAIM_KEY, 1, nx=True, ex=max(1, int(interval))
+        )
+    except Exception as e:
+        logging.warning(
+            f"Could not claim the history indexing run, indexing anyway: {e}"
+        )
+        return True
+    return bool(claimed)
+
+
+async def run_history_indexer(
+    index: Callable[[], Awaitable[List[HistoryIndexResult]]], interval: float
+) -> None:
+    """Indexes new snapshots into player histories every `interval` seconds until cancelled.
+
+    Snapshots are archived by the retention job after MinioConfig.RETENTION_KEEP_DAYS
+    and never read by the indexer again, so indexing cannot be left to manual calls.
+    Every worker runs this loop and one claims each run. A run that indexes a full
+    batch for any combination goes straight on to the next batch, so a backlog is
+    worked through without waiting for the interval.
+
+    Args:
+        index (Callable): Indexes every server and game mode once, e.g. the /index_history handler.
+        interval (float): Seconds between runs.
+    """
+    while True:
+        try:
+            if await _claim_indexing_run(interval):
+                while True:
+                    results = await index()
+                    indexed = sum(result.snapshots_indexed for result in results)
+                    logging.info(
+                        f"Scheduled history indexing added {indexed} snapshots"
+                    )
+                    if all(
+                        result.snapshots_indexed < RedisConfig.REDIS_HISTORY_INDEX_BATCH
+                        for result in results
+                    ):
+                        break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Scheduled history indexing failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List
+
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
+
+from pubg.api.clients import get_redis_client
+from pubg.api.config import Config
+from pubg.api.minio_cache import invalidate_recent_cache
+from pubg.api.redis_cache import invalidate_user_cache
+from pubg.config import RedisConfig
+
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+async def publish_leaderboard_update(
+    server: str, game_mode: str, user_ids: List[str]
+) -> None:
+    """Evicts updated players and the newest snapshot name locally and on every other worker.
+
+    Publishing is best effort, a failure is logged and the local eviction still applies.
+
+    Args:
+        server (str): The server whose leaderboard changed.
+        game_mode (str): The game mode whose leaderboard changed.
+        user_ids (List[str]): The players that were written.
+    """
+    invalidate_user_cache(user_ids)
+    invalidate_recent_cache([(server, game_mode)])
+    await _publish(
+        {"server": server, "game_mode": game_mode, "user_ids": user_ids},
+        f"{server} {game_mode}",
+    )
+
+
+async def publish_generation_swap(generation: int) -> None:
+    """Drops the whole cache locally and on every other worker after a generation swap.
+
+    Args:
+        generation (int): The generation that is now live.
+    """
+    invalidate_user_cache()
+    invalidate_recent_cache()
+    await _publish({"generation": generation}, f"generation {generation}")
+
+
+async def _publish(event: Dict[str, Any], description: str) -> None:
+    if not Config.CACHE_INVALIDATION_ENABLED:
+        return
+
+    try:
+        # Keyless, so any node will do, cluster nodes forward it to every subscriber.
+        # The async cluster client has no publish() helper, so the command is sent raw
+        await get_redis_client().execute_command(
+            "PUBLISH",
+            Config.CACHE_INVALIDATION_CHANNEL,
+            json.dumps(event),
+            target_nodes=RedisCluster.RANDOM,
+        )
+    except Exception as e:
+        logging.warning(f"Failed to publish update for {description}: {e}")
+
+
+def _apply_update(event: Dict[str, Any]) -> None:
+    if "generation" in event:
+        logging.info(
+            f"Dropping cached players, generation {event['generation']} is live"
+        )
+        invalidate_user_cache()
+        invalidate_recent_cache()
+        return
+
+    logging.info(
+        f"Evicting {len(event['user_ids'])} players updated on {event['server']} {event['game_mode']}"
+    )
+    invalidate_user_cache(event["user_ids"])
+    invalidate_recent_cache([(event["server"], event["game_mode"])])
+
+
+async def listen_for_updates() -> None:
+    """Evicts players named in leaderboard update events until cancelled.
+
+    Runs for the lifetime of the worker. Cluster pub/sub is not exposed by the async
+    cluster client, so this subscribes over a plain connection to the configured node.
+    Updates may have been missed while disconnected, so the whole cache is dropped on
+    every (re)subscribe.
+    """
+    while True:
+        client = Redis(
+            host=RedisConfig.REDIS_HOST,
+            port=RedisConfig.REDIS_PORT,
+            password=RedisConfig.REDIS_PASSWORD,
+            socket_keepalive=True,
+            health_check_interval=RedisConfig.REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(Config.CACHE_INVALIDATION_CHANNEL)
+                invalidate_user_cache()
+                invalidate_recent_cache()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        _apply_update(json.loads(message["data"]))
+                    except (ValueError, KeyError) as e:
+                        logging.warning(f"Ignoring malformed update event: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Lost leaderboard update subscription, retrying: {e}")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+        finally:
+            await client.aclose()
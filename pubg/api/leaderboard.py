@@ -0,0 +1,204 @@
+import json
+import logging
+from typing import Dict, List, Tuple
+
+from pubg.api.clients import get_redis_client
+from pubg.config import RedisConfig
+
+RankedPlayers = List[Tuple[str, Dict[str, int]]]
+
+
+def _key(server: str, game_mode: str, suffix: str) -> str:
+    # The hash tag keeps every key of one leaderboard in the same cluster slot
+    return f"pubg:lb:{{{server}:{game_mode}}}:{suffix}"
+
+
+def _pointer_key(server: str, game_mode: str) -> str:
+    return _key(server, game_mode, "current")
+
+
+def _ranks_key(server: str, game_mode: str, version: int) -> str:
+    return _key(server, game_mode, f"v{version}:ranks")
+
+
+def _stats_key(server: str, game_mode: str, version: int) -> str:
+    return _key(server, game_mode, f"v{version}:stats")
+
+
+async def begin_leaderboard_version(server: str, game_mode: str) -> int:
+    """Allocates a new, empty version of a leaderboard's rank index.
+
+    Returns:
+        int: The new version, not yet visible to readers.
+    """
+    return await get_redis_client().incr(_key(server, game_mode, "seq"))
+
+
+async def add_to_leaderboard_version(
+    server: str, game_mode: str, version: int, data: Dict[str, Dict[str, int]]
+) -> None:
+    """Adds players to a version that has not been activated yet.
+
+    Args:
+        server (str): The server the leaderboard belongs to.
+        game_mode (str): The game mode the leaderboard belongs to.
+        version (int): The version being loaded.
+        data (Dict[str, Dict[str, int]]): Player IDs mapped to their rank, wins and games_played.
+    """
+    ranks_key = _ranks_key(server, game_mode, version)
+    stats_key = _stats_key(server, game_mode, version)
+
+    ranked = {
+        user_id: stats
+        for user_id, stats in data.items()
+        if stats.get("rank") is not None
+    }
+    items = list(ranked.items())
+    batch_size = RedisConfig.REDIS_WRITE_BATCH_SIZE
+
+    pipe = get_redis_client().pipeline()
+    for i in range(0, len(items), batch_size):
+        batch = items[i : i + batch_size]
+        pipe.zadd(ranks_key, {user_id: stats["rank"] for user_id, stats in batch})
+        pipe.hset(
+            stats_key,
+            mapping={user_id: json.dumps(stats) for user_id, stats in batch},
+        )
+    await pipe.execute()
+
+
+async def activate_leaderboard_version(
+    server: str, game_mode: str, version: int
+) -> None:
+    """Points readers at a fully loaded version in a single SET.
+
+    The previous version is left to expire once in-flight reads have had time to finish.
+
+    Args:
+        server (str): The server the leaderboard belongs to.
+        game_mode (str): The game mode the leaderboard belongs to.
+        version (int): The version to serve from now on.
+    """
+    redis_client = get_redis_client()
+    previous = await redis_client.set(
+        _pointer_key(server, game_mode), version, get=True
+    )
+    if previous is not None:
+        pipe = redis_client.pipeline()
+        for key in (
+            _ranks_key(server, game_mode, int(previous)),
+            _stats_key(server, game_mode, int(previous)),
+        ):
+            pipe.expire(key, RedisConfig.REDIS_LEADERBOARD_RETENTION)
+        await pipe.execute()
+
+    logging.info(f"Leaderboard {server} {game_mode} now at version {version}")
+
+
+async def discard_leaderboard_version(
+    server: str, game_mode: str, version: int
+) -> None:
+    """Deletes a version that will never be activated, e.g. after a failed load.
+
+    Args:
+        server (str): The server the leaderboard belongs to.
+        game_mode (str): The game mode the leaderboard belongs to.
+        version (int): The staged version to drop.
+    """
+    # Never pointed at, so nothing can be reading it
+    await get_redis_client().delete(
+        _ranks_key(server, game_mode, version), _stats_key(server, game_mode, version)
+    )
+    logging.info(f"Discarded leaderboard {server} {game_mode} version {version}")
+
+
+async def write_leaderboard_index(
+    server: str, game_mode: str, data: Dict[str, Dict[str, int]]
+) -> int:
+    """Writes a new version of a leaderboard's rank index and swaps it in atomically.
+
+    Each version is a sorted set of player IDs scored by rank plus a hash of each
+    player's stats. Both are fully written before the single pointer key is moved to
+    the new version, so readers only ever see one complete leaderboard.
+
+    Args:
+        server (str): The server the leaderboard belongs to.
+        game_mode (str): The game mode the leaderboard belongs to.
+        data (Dict[str, Dict[str, int]]): Player IDs mapped to their rank, wins and games_played.
+
+    Returns:
+        int: The version that is now current.
+    """
+    version = await begin_leaderboard_version(server, game_mode)
+    await add_to_leaderboard_version(server, game_mode, version, data)
+    await activate_leaderboard_version(server, game_mode, version)
+    return version
+
+
+async def _current_version(server: str, game_mode: str) -> int | None:
+    version = await get_redis_client().get(_pointer_key(server, game_mode))
+    return int(version) if version is not None else None
+
+
+async def _with_stats(
+    server: str, game_mode: str, version: int, members: List[Tuple[bytes, float]]
+) -> RankedPlayers:
+    if not members:
+        return []
+    user_ids = [member.decode("utf-8") for member, _ in members]
+    stats = await get_redis_client().hmget(
+        _stats_key(server, game_mode, version), user_ids
+    )
+    return [
+        (user_id, json.loads(raw))
+        for user_id, raw in zip(user_ids, stats)
+        if raw is not None
+    ]
+
+
+async def get_rank_range(
+    server: str, game_mode: str, start_rank: int, count: int
+) -> Tuple[int | None, RankedPlayers]:
+    """Reads the players ranked start_rank to start_rank + count - 1, in O(log N + count).
+
+    Returns:
+        Tuple[Optional[int], RankedPlayers]: The version read, or None if no
+            leaderboard is loaded, and the players in rank order.
+    """
+    version = await _current_version(server, game_mode)
+    if version is None:
+        return None, []
+
+    members = await get_redis_client().zrange(
+        _ranks_key(server, game_mode, version),
+        start_rank,
+        start_rank + count - 1,
+        byscore=True,
+        withscores=True,
+    )
+    return version, await _with_stats(server, game_mode, version, members)
+
+
+async def get_players_around(
+    server: str, game_mode: str, user_id: str, radius: int
+) -> Tuple[int | None, RankedPlayers]:
+    """Reads up to `radius` players either side of a player, in O(log N + radius).
+
+    Returns:
+        Tuple[Optional[int], RankedPlayers]: The version read, or None if the
+            leaderboard or player is not loaded, and the players in rank order.
+    """
+    version = await _current_version(server, game_mode)
+    if version is None:
+        return None, []
+
+    redis_client = get_redis_client()
+    ranks_key = _ranks_key(server, game_mode, version)
+    position = await redis_client.zrank(ranks_key, user_id)
+    if position is None:
+        return None, []
+
+    members = await redis_client.zrange(
+        ranks_key, max(0, position - radius), position + radius, withscores=True
+    )
+    return version, await _with_stats(server, game_mode, version, members)
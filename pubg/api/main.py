@@ -1,15 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from pubg.api.clients import close_clients, init_clients
 from pubg.api.config import Config
-from pubg.api.router import router
+from pubg.api.history import run_history_indexer
+from pubg.api.invalidation import listen_for_updates
+from pubg.api.notifications import listen_for_snapshots
+from pubg.api.router import index_all_history, load_snapshot, router
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Creates the shared backend clients on startup and closes them on shutdown.
+
+    Also keeps this worker subscribed to cache invalidation events, and optionally to
+    MinIO snapshot notifications, and indexes player history on a schedule while it runs.
+    """
+    await init_clients()
+    listeners = []
+    if Config.CACHE_INVALIDATION_ENABLED:
+        listeners.append(asyncio.create_task(listen_for_updates()))
+    if Config.SNAPSHOT_NOTIFICATIONS_ENABLED:
+        listeners.append(asyncio.create_task(listen_for_snapshots(load_snapshot)))
+    if Config.HISTORY_INDEX_ENABLED:
+        listeners.append(
+            asyncio.create_task(
+                run_history_indexer(index_all_history, Config.HISTORY_INDEX_INTERVAL)
+            )
+        )
+
+    yield
+
+    for listener in listeners:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
+    await close_clients()
 
 
 def get_app() -> FastAPI:
     fast_app = FastAPI(
         title=Config.APP_NAME,
         version=Config.APP_VERSION,
+        lifespan=lifespan,
     )
     fast_app.include_router(router)
     return fast_app
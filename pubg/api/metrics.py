@@ -0,0 +1,56 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Registered on the default registry, which the Instrumentator exposes on /metrics
+
+REDIS_KEYS_WRITTEN = Counter(
+    "pubg_redis_keys_written_total",
+    "Number of leaderboard keys written to Redis",
+)
+REDIS_WRITE_KEYS_PER_SECOND = Gauge(
+    "pubg_redis_write_keys_per_second",
+    "Throughput of the most recent bulk write to Redis",
+)
+REDIS_BATCH_RETRIES = Counter(
+    "pubg_redis_write_batch_retries_total",
+    "Number of Redis write batches that were retried",
+)
+REDIS_KEYS_SKIPPED = Counter(
+    "pubg_redis_keys_skipped_total",
+    "Players left unwritten by a delta refresh because they had not changed",
+)
+REDIS_KEYS_DELETED = Counter(
+    "pubg_redis_keys_deleted_total",
+    "Players deleted by a delta refresh because they dropped off a leaderboard",
+)
+SNAPSHOTS_UNCHANGED = Counter(
+    "pubg_refresh_snapshots_unchanged_total",
+    "Delta refreshes skipped because the snapshot was identical to the last one loaded",
+)
+
+CACHE_LOOKUPS = Counter(
+    "pubg_cache_lookups_total",
+    "In-process cache lookups by result",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "pubg_cache_evictions_total",
+    "Entries removed from an in-process cache",
+    ["cache", "reason"],
+)
+
+REQUESTS_COALESCED = Counter(
+    "pubg_requests_coalesced_total",
+    "Lookups that joined an identical backend call already in flight",
+    ["call"],
+)
+
+SNAPSHOT_NOTIFICATIONS = Counter(
+    "pubg_snapshot_notifications_total",
+    "Snapshot written notifications from MinIO by what became of them",
+    ["result"],
+)
+SNAPSHOT_NOTIFY_LAG_SECONDS = Histogram(
+    "pubg_snapshot_notify_lag_seconds",
+    "Time from MinIO reporting a snapshot written to it being loaded into Redis",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
@@ -1,16 +1,132 @@
+import asyncio
 import json
 import logging
-from typing import Dict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
 
-from minio import Minio
 from minio.error import S3Error
 
+from pubg.api.cache import StaleWhileRevalidateCache
+from pubg.api.clients import get_minio_client
+from pubg.api.config import Config
 from pubg.config import MinioConfig
+from pubg.snapshot import Leaderboard, SnapshotTooLarge, iter_snapshot
+
+recent_cache = StaleWhileRevalidateCache(
+    "minio_recent",
+    soft_ttl=Config.RECENT_CACHE_SOFT_TTL,
+    hard_ttl=Config.RECENT_CACHE_HARD_TTL,
+)
+
+
+def _read_object(bucket_name: str, object_name: str) -> bytes:
+    """Blocking download of a whole object, run off the event loop by the async helpers."""
+    minio_client = get_minio_client()
+
+    response = minio_client.get_object(bucket_name=bucket_name, object_name=object_name)
+    try:
+        return response.read()
+    finally:
+        # Hand the connection back to the shared pool
+        response.close()
+        response.release_conn()
+
+
+def _list_prefixes(now: datetime) -> List[str]:
+    """Narrowest listing prefixes first: this month, last month, then every snapshot."""
+    last_month = now.replace(day=1) - timedelta(days=1)
+    base = MinioConfig.SNAPSHOT_PREFIX
+    return [
+        f"{base}{now:%Y-%m}",
+        f"{base}{last_month:%Y-%m}",
+        base,
+    ]
+
+
+def _stream_snapshot(
+    bucket_name: str, object_name: str, batch_size: int
+) -> Iterator[Leaderboard]:
+    """Blocking, streamed download of a snapshot, decoded according to its object metadata.
+
+    The connection is released whether the snapshot is read to the end or abandoned.
+
+    Raises:
+        SnapshotTooLarge: If the object is over MinioConfig.SNAPSHOT_MAX_SIZE.
+    """
+    minio_client = get_minio_client()
+
+    response = minio_client.get_object(bucket_name=bucket_name, object_name=object_name)
+    try:
+        length = response.headers.get("Content-Length")
+        if length is not None and int(length) > MinioConfig.SNAPSHOT_MAX_SIZE:
+            raise SnapshotTooLarge(f"{object_name} is {length} bytes")
+        yield from iter_snapshot(
+            response.stream(MinioConfig.SNAPSHOT_STREAM_CHUNK_SIZE),
+            response.headers,
+            batch_size=batch_size,
+            max_size=MinioConfig.SNAPSHOT_MAX_SIZE,
+        )
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def _read_snapshot(bucket_name: str, object_name: str) -> Leaderboard:
+    """Blocking download of a whole snapshot, parsed as it streams in."""
+    data: Leaderboard = {}
+    for batch in _stream_snapshot(
+        bucket_name, object_name, MinioConfig.SNAPSHOT_STREAM_BATCH_SIZE
+    ):
+        data.update(batch)
+    return data
+
+
+def _find_most_recent(bucket_name: str) -> str | None:
+    """Blocking lookup of the newest snapshot name in a bucket.
+
+    Reads the latest pointer written by the ingestion job. Buckets written before the
+    pointer existed fall back to listing by prefix and comparing the timestamp embedded
+    in the object name.
+
+    Returns:
+        Optional[str]: The newest snapshot, None if the bucket or any snapshot does not exist yet.
+
+    Raises:
+        S3Error: For any other error, so it is not mistaken for an empty bucket.
+    """
+    minio_client = get_minio_client()
+
+    try:
+        pointer = _read_object(bucket_name, MinioConfig.LATEST_POINTER_NAME)
+        return json.loads(pointer)["object_name"]
+    except S3Error as err:
+        if err.code == "NoSuchBucket":
+            logging.info(f"No bucket {bucket_name}, nothing written yet")
+            return None
+        if err.code != "NoSuchKey":
+            raise
+        logging.info(f"No latest pointer in {bucket_name}, falling back to listing")
+
+    for prefix in _list_prefixes(datetime.now()):
+        # Snapshot names embed a sortable timestamp, so the max name is the newest
+        names = (
+            obj.object_name
+            for obj in minio_client.list_objects(bucket_name, prefix=prefix)
+        )
+        most_recent_file = max(names, default=None)
+        if most_recent_file is not None:
+            return most_recent_file
+    return None
 
 
 async def get_minio_data(game_mode: str, file_name: str, server: str) -> Dict[str, int]:
     """Fetches data from Minio object storage.
 
+    The MinIO SDK is blocking, so the download runs in a worker thread to keep the
+    event loop free for other requests. JSON and columnar snapshots are both
+    understood, told apart by the object metadata. Prefer stream_minio_data where the
+    players can be handled a batch at a time.
+
     Args:
         game_mode (str): The game mode for which data is to be fetched.
         file_name (str): The name of the file containing the data.
@@ -21,74 +137,160 @@ async def get_minio_data(game_mode: str, file_name: str, server: str) -> Dict[st
 
     Raises:
         S3Error: If there is an error fetching data from Minio.
+        SnapshotTooLarge: If the object is over MinioConfig.SNAPSHOT_MAX_SIZE.
     """
-    minio_client = Minio(
-        endpoint=MinioConfig.MINIO_ENDPOINT,
-        access_key=MinioConfig.MINIO_ROOT_USER,
-        secret_key=MinioConfig.MINIO_ROOT_PASSWORD,
-        secure=False,  # no TLS encryption
-    )
-
     bucket_name = f"pubg-leaderboard-bucket-{server}-{game_mode}"
 
     logging.info("Fetching data from Minio")
     try:
-        response = minio_client.get_object(
-            bucket_name=bucket_name, object_name=file_name
-        )
-        content = response.read().decode("utf-8")
+        data = await asyncio.to_thread(_read_snapshot, bucket_name, file_name)
     except S3Error as e:
         logging.error(f"Error fetching data from Minio: {e}")
         raise
 
-    data = json.loads(content)
     return data
 
 
+async def stream_minio_data(
+    game_mode: str, file_name: str, server: str, batch_size: int | None = None
+) -> AsyncIterator[Leaderboard]:
+    """Streams a snapshot from Minio in batches of players.
+
+    Each batch is downloaded and parsed in a worker thread. Only one batch is held at a
+    time, so memory use does not grow with the size of the leaderboard.
+
+    Args:
+        game_mode (str): The game mode for which data is to be fetched.
+        file_name (str): The name of the file containing the data.
+        server (str): The name of the server to fetch from
+        batch_size (int, optional): Players per batch. Defaults to MinioConfig.SNAPSHOT_STREAM_BATCH_SIZE.
+
+    Yields:
+        Leaderboard: The next batch of players.
+
+    Raises:
+        S3Error: If there is an error fetching data from Minio.
+        SnapshotTooLarge: If the object is over MinioConfig.SNAPSHOT_MAX_SIZE.
+    """
+    bucket_name = f"pubg-leaderboard-bucket-{server}-{game_mode}"
+    batches = _stream_snapshot(
+        bucket_name, file_name, batch_size or MinioConfig.SNAPSHOT_STREAM_BATCH_SIZE
+    )
+
+    logging.info(f"Streaming {file_name} from {bucket_name}")
+    try:
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                return
+            yield batch
+    except S3Error as e:
+        logging.error(f"Error fetching data from Minio: {e}")
+        raise
+    finally:
+        await asyncio.to_thread(batches.close)
+
+
 async def get_minio_recent(server: str, game_mode: str) -> str | None:
     """
     Retrieve the most recent file object from a MinIO bucket.
 
+    The answer only changes once per job run, so it is served from recent_cache and
+    refreshed in the background once older than Config.RECENT_CACHE_SOFT_TTL. Loads
+    run in a worker thread so a slow bucket does not stall the event loop, and
+    concurrent loads for the same bucket share one listing.
+
     Args:
         server (str): The server identifier.
         game_mode (str): The game mode.
 
     Returns:
-        str: The name of the most recent file object found in the MinIO bucket.
+        Optional[str]: The name of the most recent file object found in the MinIO
+            bucket, None if the bucket or any snapshot does not exist yet.
 
     Raises:
         S3Error: If an error occurs while communicating with MinIO.
     """
-    minio_client = Minio(
-        endpoint=MinioConfig.MINIO_ENDPOINT,
-        access_key=MinioConfig.MINIO_ROOT_USER,
-        secret_key=MinioConfig.MINIO_ROOT_PASSWORD,
-        secure=False,  # no TLS encryption
+    bucket_name = f"pubg-leaderboard-bucket-{server}-{game_mode}"
+
+    logging.info(f"Looking for most recent data from {bucket_name}")
+
+    # Raised rather than read as "no data", a refresh must not skip a leaderboard
+    # that exists but could not be read
+    return await recent_cache.get(
+        (server, game_mode),
+        lambda: asyncio.to_thread(_find_most_recent, bucket_name),
     )
 
+
+async def get_minio_etag(game_mode: str, file_name: str, server: str) -> str:
+    """Fetches the ETag of a snapshot without downloading it.
+
+    The ETag changes whenever the object's bytes do, so a refresh can tell that a
+    snapshot is identical to the one it last loaded from a single HEAD request.
+
+    Args:
+        game_mode (str): The game mode of the snapshot.
+        file_name (str): The name of the snapshot object.
+        server (str): The server of the snapshot.
+
+    Returns:
+        str: The object's ETag.
+
+    Raises:
+        S3Error: If there is an error fetching the object's metadata from Minio.
+    """
     bucket_name = f"pubg-leaderboard-bucket-{server}-{game_mode}"
 
-    logging.info(f"Looking for most recent data from {bucket_name}")
+    stat = await asyncio.to_thread(
+        get_minio_client().stat_object, bucket_name, file_name
+    )
+    return stat.etag
 
-    most_recent_file = None
 
-    try:
-        # List objects in the bucket
-        objects = minio_client.list_objects(bucket_name, recursive=True)
+def _list_snapshots_after(
+    bucket_name: str, start_after: str | None, limit: int
+) -> List[str]:
+    """Blocking listing of up to `limit` snapshot names after `start_after`, oldest first."""
+    objects = get_minio_client().list_objects(
+        bucket_name, prefix=MinioConfig.SNAPSHOT_PREFIX, start_after=start_after
+    )
+    # Names embed a sortable timestamp, so listing order is chronological
+    names = []
+    for obj in objects:
+        names.append(obj.object_name)
+        if len(names) >= limit:
+            break
+    return names
 
-        # Iterate through the objects and find the most recent one
 
-        for obj in objects:
-            if (
-                most_recent_file is None
-                or obj.last_modified > most_recent_file.last_modified
-            ):
-                most_recent_file = obj
+async def list_minio_snapshots(
+    server: str, game_mode: str, start_after: str | None, limit: int
+) -> List[str]:
+    """Lists snapshot names newer than `start_after`, oldest first.
 
-        if most_recent_file:  # get the str name of the file
-            most_recent_file = most_recent_file.object_name
+    Args:
+        server (str): The server identifier.
+        game_mode (str): The game mode.
+        start_after (Optional[str]): The last name already seen, None to start from the oldest.
+        limit (int): The most names to return.
 
-    except S3Error as err:
-        logging.warning(f"MinIO error: {err}")
+    Returns:
+        List[str]: The snapshot names, in the order they were written.
 
-    return most_recent_file
+    Raises:
+        S3Error: If an error occurs while communicating with MinIO.
+    """
+    bucket_name = f"pubg-leaderboard-bucket-{server}-{game_mode}"
+    return await asyncio.to_thread(
+        _list_snapshots_after, bucket_name, start_after, limit
+    )
+
+
+def invalidate_recent_cache(keys: List[Tuple[str, str]] | None = None) -> None:
+    """Forgets the newest snapshot names, called by paths that load or learn of a new one.
+
+    Args:
+        keys (List[Tuple[str, str]], optional): (server, game_mode) pairs to drop. Everything is dropped if not given.
+    """
+    recent_cache.invalidate(keys)
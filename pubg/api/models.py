@@ -1,59 +1,62 @@
 from datetime import datetime
+from typing import Annotated, Dict, List, Literal
 
-from pydantic import BaseModel, field_validator
+from pydantic import AfterValidator, BaseModel, Field
 
 from pubg.jobs.config import PUBGConfig
+from pubg.snapshot import snapshot_timestamp
 
+# Checked once per request, set lookups instead of scanning the configured lists
+_SERVERS = frozenset(PUBGConfig.SERVERS)
+_GAME_MODES = frozenset(PUBGConfig.GAME_MODE)
+_SERVER_CHOICES = ", ".join(PUBGConfig.SERVERS)
+_GAME_MODE_CHOICES = ", ".join(PUBGConfig.GAME_MODE)
 
-class WriteRedisRequest(BaseModel):
-    object_name: str
-    game_mode: str
-    server: str
+_USER_ID_PREFIX = "account."
 
-    @field_validator("game_mode")
-    def validate_game_mode(cls, v):
-        if v not in PUBGConfig.GAME_MODE:
-            raise ValueError(
-                f"Invalid game mode: {v}. Must be one of {', '.join(PUBGConfig.GAME_MODE)}"
-            )
-        return v
-
-    @field_validator("server")
-    def validate_server(cls, v):
-        if v not in PUBGConfig.SERVERS:
-            raise ValueError(
-                f"Invalid server: {v}. Must be one of {', '.join(PUBGConfig.SERVERS)}"
-            )
-        return v
-
-    @field_validator("object_name")
-    def validate_object_name(cls, v):
-        # Split the filename using underscores
-        parts = v.split("_")
-        if len(parts) < 2:
-            raise ValueError(
-                f"Invalid object_name format: {v}. Files will contain a datetime"
-            )
-        try:
-            # Attempt to parse the first part of the filename as a datetime object
-            datetime.strptime(parts[1].replace(".json", ""), "%Y-%m-%d-%H-%M-%S")
-        except ValueError:
-            # If parsing fails, raise a validation error
-            raise ValueError(
-                f"Invalid object_name format: {v}. The datetime part must be in the format YYYY-MM-DD_HH-MM-SS"
-            )
-        return v
 
+def validate_server(v: str) -> str:
+    if v not in _SERVERS:
+        raise ValueError(f"Invalid server: {v}. Must be one of {_SERVER_CHOICES}")
+    return v
 
-class UserDataRequest(BaseModel):
-    user_id: str
 
-    @field_validator("user_id")
-    def validate_user_id_format(cls, v):
-        # Ensure that user_id starts with "account." and has SOMETHING following it
-        if not v.startswith("account.") or len(v) <= len("account."):
-            raise ValueError("user_id must start with 'account.' followed by SOMETHING")
-        return v
+def validate_game_mode(v: str) -> str:
+    if v not in _GAME_MODES:
+        raise ValueError(f"Invalid game mode: {v}. Must be one of {_GAME_MODE_CHOICES}")
+    return v
+
+
+def validate_object_name(v: str) -> str:
+    snapshot_timestamp(v)
+    return v
+
+
+def validate_user_id(v: str) -> str:
+    # Ensure that user_id starts with "account." and has SOMETHING following it
+    if not v.startswith(_USER_ID_PREFIX) or len(v) <= len(_USER_ID_PREFIX):
+        raise ValueError("user_id must start with 'account.' followed by SOMETHING")
+    return v
+
+
+def dedupe_user_ids(v: List[str]) -> List[str]:
+    return list(dict.fromkeys(v))
+
+
+Server = Annotated[str, AfterValidator(validate_server)]
+GameMode = Annotated[str, AfterValidator(validate_game_mode)]
+ObjectName = Annotated[str, AfterValidator(validate_object_name)]
+UserId = Annotated[str, AfterValidator(validate_user_id)]
+
+
+class WriteRedisRequest(BaseModel):
+    object_name: ObjectName
+    game_mode: GameMode
+    server: Server
+
+
+class UserDataRequest(BaseModel):
+    user_id: UserId
 
 
 class UserDataResponse(BaseModel):
@@ -63,22 +66,61 @@ class UserDataResponse(BaseModel):
     games_played: int
 
 
+class BatchUserDataRequest(BaseModel):
+    # Each ID passes the same check as a single lookup, duplicates are fetched once
+    user_ids: Annotated[
+        List[UserId],
+        Field(min_length=1, max_length=100),
+        AfterValidator(dedupe_user_ids),
+    ]
+
+
+class BatchUserDataResponse(BaseModel):
+    players: Dict[str, UserDataResponse]
+    not_found: List[str]
+
+
 class GameModeRequest(BaseModel):
+    game_mode: GameMode
+    server: Server
+
+
+class RefreshResult(BaseModel):
+    server: str
     game_mode: str
+    status: Literal["refreshed", "skipped", "failed", "abandoned"]
+    file_name: str | None = None
+    keys_written: int = 0
+    keys_skipped: int = 0
+    keys_deleted: int = 0
+    duration_seconds: float = 0.0
+    detail: str | None = None
+
+
+class LeaderboardPage(BaseModel):
     server: str
+    game_mode: str
+    version: int
+    players: List[UserDataResponse]
+
 
-    @field_validator("server")
-    def validate_server(cls, v):
-        if v not in PUBGConfig.SERVERS:
-            raise ValueError(
-                f"Invalid server: {v}. Must be one of {', '.join(PUBGConfig.SERVERS)}"
-            )
-        return v
-
-    @field_validator("game_mode")
-    def validate_game_mode(cls, v):
-        if v not in PUBGConfig.GAME_MODE:
-            raise ValueError(
-                f"Invalid game mode: {v}. Must be one of {', '.join(PUBGConfig.GAME_MODE)}"
-            )
-        return v
+class HistoryPoint(BaseModel):
+    timestamp: datetime
+    rank: int | None
+    wins: int | None
+    games_played: int | None
+
+
+class PlayerHistory(BaseModel):
+    user_id: str
+    server: str
+    game_mode: str
+    points: List[HistoryPoint]
+
+
+class HistoryIndexResult(BaseModel):
+    server: str
+    game_mode: str
+    snapshots_indexed: int = 0
+    last_indexed: str | None = None
+    detail: str | None = None
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+from urllib.parse import unquote_plus
+
+import urllib3
+from minio import Minio
+
+from pubg.api.clients import get_redis_client
+from pubg.api.config import Config
+from pubg.api.metrics import SNAPSHOT_NOTIFICATIONS, SNAPSHOT_NOTIFY_LAG_SECONDS
+from pubg.config import MinioConfig
+from pubg.jobs.config import PUBGConfig
+
+RECONNECT_DELAY_SECONDS = 5.0
+
+# Loads one snapshot, called with server, game_mode and the object name
+SnapshotLoader = Callable[[str, str, str], Awaitable[Any]]
+
+
+def _claim_key(server: str, game_mode: str, object_name: str) -> str:
+    return f"pubg:notify:{{{server}:{game_mode}}}:{object_name}"
+
+
+def created_snapshots(event: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Yields the bucket and name of each snapshot an S3 notification reports written."""
+    for record in event.get("Records") or []:
+        s3 = record.get("s3", {})
+        bucket_name = s3.get("bucket", {}).get("name")
+        # Keys arrive URL encoded, as in the S3 event format
+        object_name = unquote_plus(s3.get("object", {}).get("key", ""))
+        if bucket_name and object_name.startswith(MinioConfig.SNAPSHOT_PREFIX):
+            yield bucket_name, object_name
+
+
+class SnapshotNotifier:
+    """Turns snapshot written notifications into at most one load per bucket at a time.
+
+    A notification opens a debounce window for its bucket. Any others arriving in the
+    window only replace the snapshot to load with a newer one, so a burst of writes
+    becomes a single load of the newest. Loads for one bucket never overlap, and the
+    object is claimed in Redis first so only one worker of the fleet loads it.
+    """
+
+    def __init__(
+        self,
+        load: SnapshotLoader,
+        debounce: float = Config.SNAPSHOT_NOTIFY_DEBOUNCE,
+        claim_ttl: int = Config.SNAPSHOT_NOTIFY_CLAIM_TTL,
+    ) -> None:
+        """
+        Args:
+            load (SnapshotLoader): Loads one snapshot into Redis.
+            debounce (float): Seconds to wait for newer snapshots before loading.
+            claim_ttl (int): Seconds a loaded object stays claimed, so redeliveries are ignored.
+        """
+        self.load = load
+        self.debounce = debounce
+        self.claim_ttl = claim_ttl
+        # Newest snapshot waiting per (server, game_mode), and when it was first reported
+        self._pending: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._drains: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def notify(self, server: str, game_mode: str, object_name: str) -> None:
+        """Records a written snapshot, must be called on the event loop."""
+        SNAPSHOT_NOTIFICATIONS.labels("received").inc()
+        key = (server, game_mode)
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = (object_name, time.monotonic())
+        else:
+            SNAPSHOT_NOTIFICATIONS.labels("debounced").inc()
+            # Snapshot names sort by the time they were taken
+            self._pending[key] = (max(pending[0], object_name), pending[1])
+
+        if key not in self._drains:
+            self._drains[key] = asyncio.create_task(self._drain(key))
+
+    async def _drain(self, key: Tuple[str, str]) -> None:
+        try:
+            while key in self._pending:
+                await asyncio.sleep(self.debounce)
+                object_name, reported_at = self._pending.pop(key)
+                await self._ingest(*key, object_name, reported_at)
+        finally:
+            del self._drains[key]
+
+    async def _ingest(
+        self, server: str, game_mode: str, object_name: str, reported_at: float
+    ) -> None:
+        redis_client = get_redis_client()
+        claim_key = _claim_key(server, game_mode, object_name)
+        try:
+            claimed = await redis_client.set(claim_key, 1, nx=True, ex=self.claim_ttl)
+        except Exception as e:
+            logging.warning(f"Could not claim {object_name}, loading anyway: {e}")
+            claimed = True
+        if not claimed:
+            SNAPSHOT_NOTIFICATIONS.labels("duplicate").inc()
+            return
+
+        try:
+            await self.load(server, game_mode, object_name)
+        except Exception as e:
+            SNAPSHOT_NOTIFICATIONS.labels("failed").inc()
+            logging.error(f"Failed to load {server} {game_mode} {object_name}: {e}")
+            # Let a redelivery, or another worker, try again
+            try:
+                await redis_client.delete(claim_key)
+            except Exception as e:
+                logging.warning(f"Could not release {object_name}: {e}")
+            return
+
+        SNAPSHOT_NOTIFICATIONS.labels("loaded").inc()
+        SNAPSHOT_NOTIFY_LAG_SECONDS.observe(time.monotonic() - reported_at)
+        logging.info(f"Loaded {server} {game_mode} {object_name} on notification")
+
+    async def close(self) -> None:
+        """Cancels any waiting or in-progress loads."""
+        for task in list(self._drains.values()):
+            task.cancel()
+        await asyncio.gather(*self._drains.values(), return_exceptions=True)
+
+
+def _build_listen_client(buckets: int) -> Minio:
+    # Notification streams stay open indefinitely, so no read timeout and their own pool
+    return Minio(
+        endpoint=MinioConfig.MINIO_ENDPOINT,
+        access_key=MinioConfig.MINIO_ROOT_USER,
+        secret_key=MinioConfig.MINIO_ROOT_PASSWORD,
+        secure=False,  # no TLS encryption
+        http_client=urllib3.PoolManager(
+            maxsize=buckets,
+            timeout=urllib3.Timeout(
+                connect=MinioConfig.MINIO_CONNECT_TIMEOUT, read=None
+            ),
+        ),
+    )
+
+
+def _listen_bucket(
+    minio_client: Minio,
+    bucket_name: str,
+    on_snapshot: Callable[[str], None],
+    stop: threading.Event,
+) -> None:
+    """Blocking loop passing each snapshot written to the bucket to `on_snapshot`."""
+    while not stop.is_set():
+        try:
+            with minio_client.listen_bucket_notification(
+                bucket_name,
+                prefix=MinioConfig.SNAPSHOT_PREFIX,
+                events=("s3:ObjectCreated:*",),
+            ) as events:
+                for event in events:
+                    if stop.is_set():
+                        return
+                    for event_bucket, object_name in created_snapshots(event):
+                        if event_bucket == bucket_name:
+                            on_snapshot(object_name)
+        except Exception as e:
+            if stop.is_set():
+                return
+            logging.warning(
+                f"Lost notifications for {bucket_name}, retrying in"
+                f" {RECONNECT_DELAY_SECONDS}s: {e}"
+            )
+            stop.wait(RECONNECT_DELAY_SECONDS)
+
+
+async def listen_for_snapshots(
+    load: SnapshotLoader,
+    combinations: List[Tuple[str, str]] | None = None,
+) -> None:
+    """Loads each new snapshot into Redis as MinIO reports it written, until cancelled.
+
+    One notification stream is held open per bucket, on its own thread, as the MinIO
+    client is blocking. Snapshots written while a stream was down are not replayed,
+    /refresh_all_data still catches those up.
+
+    Args:
+        load (SnapshotLoader): Loads one snapshot into Redis.
+        combinations (List[Tuple[str, str]], optional): The (server, game_mode)
+            buckets to watch. Defaults to every configured combination.
+    """
+    if combinations is None:
+        combinations = [
+            (server, game_mode)
+            for server in PUBGConfig.SERVERS
+            for game_mode in PUBGConfig.GAME_MODE
+        ]
+    loop = asyncio.get_running_loop()
+    notifier = SnapshotNotifier(load)
+    minio_client = _build_listen_client(len(combinations))
+    stop = threading.Event()
+
+    for server, game_mode in combinations:
+        bucket_name = f"{MinioConfig.BUCKET_BASE_NAME}-{server}-{game_mode}"
+
+        def on_snapshot(object_name: str, server=server, game_mode=game_mode) -> None:
+            loop.call_soon_threadsafe(notifier.notify, server, game_mode, object_name)
+
+        threading.Thread(
+            target=_listen_bucket,
+            args=(minio_client, bucket_name, on_snapshot, stop),
+            name=f"notify-{bucket_name}",
+            daemon=True,  # blocked reading a stream, nothing to clean up at exit
+        ).start()
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        stop.set()
+        await notifier.close()
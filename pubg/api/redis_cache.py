@@ -1,50 +1,362 @@
 import json
 import logging
-import os
-from typing import Dict
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
-import cachetools.func
 import redis
 import tenacity
-from redis.cluster import RedisCluster as Redis
+from redis.asyncio.cluster import RedisCluster as Redis
+from redis.crc import key_slot
+
+from pubg.api.cache import LocalCache
+from pubg.api.clients import get_redis_client
+from pubg.api.coalesce import SingleFlight
+from pubg.api.config import Config
+from pubg.api.metrics import (
+    REDIS_BATCH_RETRIES,
+    REDIS_KEYS_WRITTEN,
+    REDIS_WRITE_KEYS_PER_SECOND,
+)
+from pubg.api.models import UserDataResponse
+from pubg.config import RedisConfig
+
+user_cache = LocalCache(
+    "user",
+    maxsize=Config.USER_CACHE_MAXSIZE,
+    ttl=Config.USER_CACHE_TTL,
+    negative_ttl=Config.USER_CACHE_NEGATIVE_TTL,
+)
+user_flight = SingleFlight("fetch_redis")
+# Finished /get_user_data bodies, so a hit skips model validation and serialization
+user_body_cache = LocalCache(
+    "user_body",
+    maxsize=Config.USER_CACHE_MAXSIZE,
+    ttl=Config.USER_CACHE_TTL,
+    negative_ttl=Config.USER_CACHE_NEGATIVE_TTL,
+)
+
+# Player storage layouts, selected with RedisConfig.REDIS_STORAGE_LAYOUT
+JSON_LAYOUT = "json"  # one JSON string per player
+HASH_LAYOUT = "hash"  # one hash of integer fields per player
+LAYOUTS = (JSON_LAYOUT, HASH_LAYOUT)
+
+# Refreshes load players into a new generation, pubg:g{N}:{user_id}, and then move the
+# pointer. Without a pointer, players are read from and written to their bare IDs.
+GENERATION_POINTER_KEY = "pubg:players:current"
+GENERATION_SEQUENCE_KEY = "pubg:players:seq"
+
+# The pointer as last read by this worker, and when that read expires
+_live_generation: Tuple[int | None, float] | None = None
+
+
+def _player_prefix(generation: int | None) -> str:
+    return "" if generation is None else f"pubg:g{generation}:"
+
+
+def _members_key(generation: int) -> str:
+    return f"pubg:g{generation}:members"
+
+
+async def get_live_generation(redis_client: Redis, refresh: bool = False) -> int | None:
+    """Resolves the generation readers are served from.
+
+    The pointer is cached for Config.GENERATION_POINTER_TTL seconds, so most reads do
+    not pay an extra round trip for it.
+
+    Args:
+        redis_client (Redis): The client to read the pointer with.
+        refresh (bool): Skip the cached pointer, for writers that must not go stale.
+
+    Returns:
+        Optional[int]: The live generation, or None if players are still stored by bare ID.
+    """
+    global _live_generation
+    now = time.monotonic()
+    if not refresh and _live_generation is not None and _live_generation[1] > now:
+        return _live_generation[0]
+
+    raw = await redis_client.get(GENERATION_POINTER_KEY)
+    generation = int(raw) if raw is not None else None
+    _live_generation = (generation, now + Config.GENERATION_POINTER_TTL)
+    return generation
+
+
+def _forget_live_generation() -> None:
+    global _live_generation
+    _live_generation = None
+
+
+async def begin_generation() -> int:
+    """Allocates a new, empty generation for a refresh to load into.
+
+    Returns:
+        int: The new generation, not yet visible to readers.
+    """
+    return await get_redis_client().incr(GENERATION_SEQUENCE_KEY)
+
+
+async def activate_generation(generation: int) -> int | None:
+    """Points readers at a fully loaded generation in a single SET.
+
+    The generation it replaces is left to expire rather than deleted, so reads that
+    resolved the old pointer just before the swap still find their keys.
+
+    Args:
+        generation (int): The generation to serve from now on.
+
+    Returns:
+        Optional[int]: The generation that was replaced, if any.
+    """
+    global _live_generation
+    raw = await get_redis_client().set(GENERATION_POINTER_KEY, generation, get=True)
+    _live_generation = (generation, time.monotonic() + Config.GENERATION_POINTER_TTL)
+    logging.info(f"Player generation {generation} is now live")
+
+    previous = int(raw) if raw is not None else None
+    if previous is not None and previous != generation:
+        await expire_generation(previous)
+    return previous
+
+
+async def expire_generation(generation: int) -> int:
+    """Sets a TTL of RedisConfig.REDIS_GENERATION_RETENTION on every key of a generation.
+
+    Args:
+        generation (int): A replaced or abandoned generation.
+
+    Returns:
+        int: The number of player keys given a TTL.
+    """
+    redis_client = get_redis_client()
+    prefix = _player_prefix(generation)
+    retention = RedisConfig.REDIS_GENERATION_RETENTION
+    expired = 0
+
+    pipe = redis_client.pipeline()
+    async for user_id in redis_client.sscan_iter(
+        _members_key(generation), count=RedisConfig.REDIS_WRITE_BATCH_SIZE
+    ):
+        pipe.expire(prefix + user_id.decode("utf-8"), retention)
+        expired += 1
+        if expired % RedisConfig.REDIS_WRITE_BATCH_SIZE == 0:
+            await pipe.execute()
+            pipe = redis_client.pipeline()
+    pipe.expire(_members_key(generation), retention)
+    await pipe.execute()
+
+    logging.info(f"Player generation {generation} expires in {retention}s")
+    return expired
+
+
+def _encode(val: Dict[str, int], layout: str) -> Any:
+    if layout == HASH_LAYOUT:
+        # Hash fields cannot hold nulls, a missing stat is left out instead
+        return {field: stat for field, stat in val.items() if stat is not None}
+    return json.dumps(val)
+
+
+def _slot_batches(
+    encoded: Dict[str, Any], batch_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Groups encoded values by cluster hash slot and chunks them into batches.
+
+    Args:
+        encoded (Dict[str, Any]): Keys and their already encoded values.
+        batch_size (int): The maximum number of keys in a single batch.
+
+    Yields:
+        List[Dict[str, Any]]: One mapping per hash slot, so each can be sent as a single MSET.
+    """
+    by_slot: Dict[int, Dict[str, Any]] = defaultdict(dict)
+    for key, val in encoded.items():
+        by_slot[key_slot(key.encode("utf-8"))][key] = val
+
+    batch: List[Dict[str, Any]] = []
+    batch_keys = 0
+    for mapping in by_slot.values():
+        items = list(mapping.items())
+        while items:
+            take = batch_size - batch_keys
+            batch.append(dict(items[:take]))
+            batch_keys += len(items[:take])
+            items = items[take:]
+            if batch_keys >= batch_size:
+                yield batch
+                batch, batch_keys = [], 0
+    if batch:
+        yield batch
+
+
+def _log_batch_retry(retry_state: tenacity.RetryCallState) -> None:
+    REDIS_BATCH_RETRIES.inc()
+    logging.warning(
+        "Retrying Redis write batch (attempt %s): %s",
+        retry_state.attempt_number,
+        retry_state.outcome.exception() if retry_state.outcome else None,
+    )
 
 
 @tenacity.retry(
     wait=tenacity.wait_exponential(min=0.1, max=1.0),
     stop=tenacity.stop_after_attempt(3),
+    before_sleep=_log_batch_retry,
     reraise=True,
 )
-async def write_redis(data: Dict[str, int]) -> None:
-    """Writes data to Redis with exponential backoff retry mechanism.
+async def _write_batch(
+    redis_client: Redis,
+    batch: List[Dict[str, Any]],
+    layout: str,
+    generation: int | None = None,
+) -> None:
+    """Sends one batch as a single pipeline, retried on its own.
+
+    JSON values go out as one MSET per slot. Hashes are replaced with DEL + HSET, as a
+    key still holding the other layout would otherwise reject the write. Players are
+    recorded in the generation's members set, so the generation can be expired later.
+    """
+    pipe = redis_client.pipeline()
+    if generation is not None:
+        prefix = _player_prefix(generation)
+        pipe.sadd(
+            _members_key(generation),
+            *(key[len(prefix) :] for mapping in batch for key in mapping),
+        )
+    for mapping in batch:
+        if layout == HASH_LAYOUT:
+            for key, fields in mapping.items():
+                pipe.delete(key)
+                pipe.hset(key, mapping=fields)
+        else:
+            pipe.mset(mapping)
+    await pipe.execute()
+
+
+async def write_redis(data: Dict[str, int], generation: int | None = None) -> int:
+    """Bulk writes data to Redis in pipelined, slot-grouped batches.
+
+    Each batch is retried with exponential backoff on its own, so a transient failure
+    only resends that batch rather than the whole load. Players are stored in the
+    layout chosen by RedisConfig.REDIS_STORAGE_LAYOUT.
 
     Args:
         data (Dict[str, int]): A dictionary containing keys and integer values to be written to Redis.
+        generation (int, optional): A staged generation to load into. Defaults to the live one.
 
     Returns:
-        None
+        int: The number of keys written.
 
     Raises:
-        RetryError: If retries are exhausted and the operation still fails.
+        RedisError: If a batch still fails once its retries are exhausted.
     """
-    redis_client = Redis(
-        host=os.environ["REDIS_HOST"],
-        password=os.environ["REDIS_PASSWORD"],
-        port=6379,
-        decode_response=True,
-    )  # type: ignore
+    redis_client = get_redis_client()
+    layout = RedisConfig.REDIS_STORAGE_LAYOUT
+    if generation is None:
+        generation = await get_live_generation(redis_client, refresh=True)
+    prefix = _player_prefix(generation)
+
+    logging.info(f"Writing data to Redis as {layout} into generation {generation}")
+    encoded = {prefix + key: _encode(val, layout) for key, val in data.items()}  # type: ignore[arg-type]
 
-    logging.info("Writing data to Redis")
-    for key, val in data.items():
-        encoded_str = json.dumps(val)
-        redis_client.set(key, encoded_str)
+    start = time.perf_counter()
+    for batch in _slot_batches(encoded, RedisConfig.REDIS_WRITE_BATCH_SIZE):
+        await _write_batch(redis_client, batch, layout, generation)
+    elapsed = time.perf_counter() - start
 
-    logging.info("Data written to Redis successfully")
+    keys_per_second = len(encoded) / elapsed if elapsed > 0 else 0.0
+    REDIS_KEYS_WRITTEN.inc(len(encoded))
+    REDIS_WRITE_KEYS_PER_SECOND.set(keys_per_second)
+    logging.info(
+        f"Data written to Redis successfully: {len(encoded)} keys in {elapsed:.3f}s ({keys_per_second:.0f} keys/sec)"
+    )
+    return len(encoded)
 
 
-@cachetools.func.ttl_cache(maxsize=100, ttl=300)  # implement a caching strategy
-def fetch_redis(user_id: str) -> Dict[str, int] | None:
+async def delete_players(user_ids: List[str], generation: int | None = None) -> int:
+    """Deletes players from the live generation, or a given one.
+
+    Args:
+        user_ids (List[str]): The players to delete.
+        generation (int, optional): The generation to delete from. Defaults to the live one.
+
+    Returns:
+        int: The number of players deleted.
+    """
+    if not user_ids:
+        return 0
+
+    redis_client = get_redis_client()
+    if generation is None:
+        generation = await get_live_generation(redis_client, refresh=True)
+    prefix = _player_prefix(generation)
+
+    pipe = redis_client.pipeline()
+    for user_id in user_ids:
+        pipe.delete(prefix + user_id)
+    if generation is not None:
+        pipe.srem(_members_key(generation), *user_ids)
+    await pipe.execute()
+    return len(user_ids)
+
+
+def _decode(raw: Any, layout: str) -> Dict[str, int] | None:
+    if layout == HASH_LAYOUT:
+        return {field.decode("utf-8"): int(stat) for field, stat in raw.items()} or None
+    return json.loads(raw.decode("utf-8")) if raw else None
+
+
+def _other_layout(layout: str) -> str:
+    return HASH_LAYOUT if layout == JSON_LAYOUT else JSON_LAYOUT
+
+
+async def _read_player(
+    redis_client: Redis, key: str, layout: str
+) -> Dict[str, int] | None:
+    if layout == HASH_LAYOUT:
+        return _decode(await redis_client.hgetall(key), layout)
+    return _decode(await redis_client.get(key), layout)
+
+
+async def _read_players(
+    redis_client: Redis, user_ids: List[str], layout: str, prefix: str = ""
+) -> Dict[str, Dict[str, int] | None]:
+    """Reads many players in one pipeline, JSON keys as one MGET per hash slot.
+
+    Keys holding the other layout come back as None, MGET returns nil for them and
+    HGETALL errors with WRONGTYPE, which is not raised.
+    """
+    pipe = redis_client.pipeline()
+    if layout == HASH_LAYOUT:
+        ordered = user_ids
+        for user_id in ordered:
+            pipe.hgetall(prefix + user_id)
+        replies = await pipe.execute(raise_on_error=False)
+    else:
+        by_slot: Dict[int, List[str]] = defaultdict(list)
+        for user_id in user_ids:
+            by_slot[key_slot((prefix + user_id).encode("utf-8"))].append(user_id)
+        ordered = [user_id for keys in by_slot.values() for user_id in keys]
+        for keys in by_slot.values():
+            pipe.mget([prefix + user_id for user_id in keys])
+        replies = [value for values in await pipe.execute() for value in values]
+
+    return {
+        user_id: None if isinstance(raw, Exception) else _decode(raw, layout)
+        for user_id, raw in zip(ordered, replies)
+    }
+
+
+async def fetch_redis(user_id: str) -> Dict[str, int] | None:
     """Fetches data from Redis with caching.
 
+    Found players are cached for Config.USER_CACHE_TTL and unknown IDs for the shorter
+    Config.USER_CACHE_NEGATIVE_TTL. Redis errors are not cached.
+
+    Concurrent misses for the same player share a single Redis read. Reads the
+    configured layout first and falls back to the other one when the key still holds
+    the old type, so both layouts can be served during a migration. Keys are read from
+    the live generation.
+
     Args:
         user_id (str): The ID of the user for which data is to be fetched.
 
@@ -54,28 +366,140 @@ def fetch_redis(user_id: str) -> Dict[str, int] | None:
     Raises:
         RedisError: If an error occurs while fetching data from Redis.
     """
-    redis_client = Redis(
-        host=os.environ["REDIS_HOST"],
-        password=os.environ["REDIS_PASSWORD"],
-        port=6379,
-        decode_response=True,
-    )  # type: ignore
+    hit, cached = user_cache.lookup(user_id)
+    if hit:
+        return cached
+
+    # Misses after an invalidation start a new read rather than join an older one
+    generation = user_cache.generation
+    return await user_flight.do(
+        (user_id, generation), lambda: _load_player(user_id, generation)
+    )
+
+
+async def _load_player(user_id: str, generation: int) -> Dict[str, int] | None:
+    redis_client = get_redis_client()
+    layout = RedisConfig.REDIS_STORAGE_LAYOUT
+    decoded_data = None
 
     try:
-        data = redis_client.get(user_id)
+        key = _player_prefix(await get_live_generation(redis_client)) + user_id
+        try:
+            decoded_data = await _read_player(redis_client, key, layout)
+        except redis.exceptions.ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            decoded_data = await _read_player(redis_client, key, _other_layout(layout))
 
-        if data:
-            decoded_data = json.loads(data.decode("utf-8"))  # type: ignore
-            return decoded_data
-        else:
+        if decoded_data is None:
             logging.info(f"No data found for the key {user_id}")
 
     except redis.exceptions.RedisError as e:
         # Handle Redis errors
         logging.error("An error occurred while fetching data from Redis: %s", e)
+        return None
 
     except Exception as e:
         # Handle other exceptions
         logging.error("An unexpected error occurred: %s", e)
+        return None
+
+    user_cache.store(user_id, decoded_data, generation)
+    return decoded_data
+
+
+async def fetch_redis_many(user_ids: List[str]) -> Dict[str, Dict[str, int] | None]:
+    """Fetches many players, serving what it can from the cache.
+
+    The remaining players are read with one pipeline of slot-grouped MGETs, then any
+    still missing are retried in the other layout, as in fetch_redis.
+
+    Args:
+        user_ids (List[str]): The IDs of the users to fetch.
 
-    return None
+    Returns:
+        Dict[str, Optional[Dict[str, int]]]: Each requested ID mapped to its data, or None if not found.
+
+    Raises:
+        RedisError: If an error occurs while fetching data from Redis.
+    """
+    results: Dict[str, Dict[str, int] | None] = {}
+    missing = []
+    for user_id in user_ids:
+        hit, cached = user_cache.lookup(user_id)
+        if hit:
+            results[user_id] = cached
+        else:
+            missing.append(user_id)
+
+    if not missing:
+        return results
+
+    generation = user_cache.generation
+    redis_client = get_redis_client()
+    layout = RedisConfig.REDIS_STORAGE_LAYOUT
+
+    prefix = _player_prefix(await get_live_generation(redis_client))
+
+    loaded = await _read_players(redis_client, missing, layout, prefix)
+    not_found = [user_id for user_id, data in loaded.items() if data is None]
+    if not_found:
+        loaded.update(
+            await _read_players(redis_client, not_found, _other_layout(layout), prefix)
+        )
+
+    for user_id in missing:
+        user_cache.store(user_id, loaded[user_id], generation)
+        results[user_id] = loaded[user_id]
+    return results
+
+
+def _dump_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+async def fetch_user_body(user_id: str) -> bytes | None:
+    """Fetches a player as a ready to send UserDataResponse JSON body.
+
+    The body is validated and serialized once, when it is first loaded, and then
+    served from user_body_cache. Unknown players are not kept here, fetch_redis
+    already caches them.
+
+    Args:
+        user_id (str): The ID of the user for which data is to be fetched.
+
+    Returns:
+        Optional[bytes]: The JSON body, or None if no data is found.
+
+    Raises:
+        ValidationError: If the stored player is missing a stat.
+    """
+    hit, body = user_body_cache.lookup(user_id)
+    if hit:
+        return body
+
+    generation = user_body_cache.generation
+    data = await fetch_redis(user_id=user_id)
+    if not data:
+        return None
+
+    body = _dump_json(UserDataResponse(user_id=user_id, **data).model_dump())
+    user_body_cache.store(user_id, body, generation)
+    return body
+
+
+def invalidate_user_cache(user_ids: Iterable[str] | None = None) -> None:
+    """Drops cached player data, called once new data has been written to Redis.
+
+    Args:
+        user_ids (Iterable[str], optional): Players to drop. Everything is dropped if not given.
+    """
+    # A swapped generation must be picked up before players are read back in
+    _forget_live_generation()
+    if user_ids is None:
+        user_cache.invalidate()
+        user_body_cache.invalidate()
+    else:
+        user_ids = list(user_ids)
+        user_cache.evict(user_ids)
+        user_body_cache.evict(user_ids)
@@ -1,19 +1,68 @@
+import asyncio
 import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
 
 import tenacity
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Query, Response
 from minio.error import S3Error
-from pydantic import ValidationError
-
-from pubg.api.minio_cache import get_minio_data, get_minio_recent
+from redis.exceptions import RedisError
+
+from pubg.api.clients import get_redis_client
+from pubg.api.config import Config
+from pubg.api.delta import (
+    diff_players,
+    get_loaded_snapshot,
+    listed_players,
+    save_loaded_snapshot,
+)
+from pubg.api.history import get_player_history, index_history
+from pubg.api.invalidation import publish_generation_swap, publish_leaderboard_update
+from pubg.api.leaderboard import (
+    RankedPlayers,
+    activate_leaderboard_version,
+    add_to_leaderboard_version,
+    begin_leaderboard_version,
+    discard_leaderboard_version,
+    get_players_around,
+    get_rank_range,
+    write_leaderboard_index,
+)
+from pubg.api.metrics import REDIS_KEYS_DELETED, REDIS_KEYS_SKIPPED, SNAPSHOTS_UNCHANGED
+from pubg.api.minio_cache import (
+    get_minio_data,
+    get_minio_etag,
+    get_minio_recent,
+    invalidate_recent_cache,
+    stream_minio_data,
+)
 from pubg.api.models import (
+    BatchUserDataRequest,
+    BatchUserDataResponse,
     GameModeRequest,
-    UserDataRequest,
+    HistoryIndexResult,
+    LeaderboardPage,
+    PlayerHistory,
+    RefreshResult,
     UserDataResponse,
     WriteRedisRequest,
+    validate_game_mode,
+    validate_server,
+    validate_user_id,
+)
+from pubg.api.redis_cache import (
+    activate_generation,
+    begin_generation,
+    delete_players,
+    expire_generation,
+    fetch_redis_many,
+    fetch_user_body,
+    get_live_generation,
+    write_redis,
 )
-from pubg.api.redis_cache import fetch_redis, write_redis
 from pubg.jobs.config import PUBGConfig
+from pubg.snapshot import SnapshotTooLarge
 
 logging.basicConfig(level=logging.INFO)
 
@@ -26,63 +75,337 @@ async def get_healthcheck() -> None:
     return None
 
 
-@router.post("/refresh_all_data")
-async def refresh_data() -> str:
-    """Fetches the most recent data file for all combinations of game modes and servers,
-    and writes them to Redis.
+async def _discard_staged(server: str, game_mode: str, version: int) -> None:
+    try:
+        await discard_leaderboard_version(server, game_mode, version)
+    except Exception as e:
+        # Never raised over the failure that got us here
+        logging.warning(
+            f"Could not discard leaderboard {server} {game_mode} v{version}: {e}"
+        )
+
+
+async def _stream_into_redis(
+    server: str,
+    game_mode: str,
+    file_name: str,
+    generation: int | None,
+    publish: bool = False,
+    activate: bool = True,
+) -> Tuple[int, int]:
+    """Streams a snapshot into Redis a batch at a time, along with a new leaderboard version.
+
+    Args:
+        server (str): The server of the snapshot.
+        game_mode (str): The game mode of the snapshot.
+        file_name (str): The snapshot to load.
+        generation (Optional[int]): The player generation to write into.
+        publish (bool): Evict each batch from every worker's cache as it is written.
+        activate (bool): Serve the new leaderboard version straight away. Otherwise it
+            is left staged for the caller to activate or discard.
 
     Returns:
-        str: A completion message indicating which combinations were refreshed.
+        Tuple[int, int]: The number of players written, and the leaderboard version.
 
     Raises:
-        HTTPException: If no recent data is found for a combination.
+        S3Error: If the snapshot cannot be read, the partly staged version is dropped.
+        RedisError: If a write fails, the partly staged version is dropped.
     """
+    version = await begin_leaderboard_version(server, game_mode)
+    keys_written = 0
+
+    try:
+        async for batch in stream_minio_data(
+            game_mode=game_mode, file_name=file_name, server=server
+        ):
+            try:
+                keys_written += await write_redis(data=batch, generation=generation)
+            finally:
+                if publish:
+                    # Even a partial write may have replaced cached players
+                    await publish_leaderboard_update(server, game_mode, list(batch))
+            await add_to_leaderboard_version(server, game_mode, version, batch)
+    except BaseException:
+        await _discard_staged(server, game_mode, version)
+        raise
+
+    if activate:
+        await activate_leaderboard_version(server, game_mode, version)
+    return keys_written, version
+
 
-    output = []
+async def load_snapshot(server: str, game_mode: str, object_name: str) -> int:
+    """Loads one snapshot into the live generation, evicting its players everywhere.
 
-    logging.info("Beginning to refresh data!")
-    for server in PUBGConfig.SERVERS:
-        logging.info(f"Beginning to refresh data from server {server}")
-        for game_mode in PUBGConfig.GAME_MODE:
-            logging.info(f"Beginning to refresh data for game mode {game_mode}")
+    Args:
+        server (str): The server of the snapshot.
+        game_mode (str): The game mode of the snapshot.
+        object_name (str): The snapshot to load.
+
+    Returns:
+        int: The number of players written.
+    """
+    keys_written, _ = await _stream_into_redis(
+        server, game_mode, object_name, generation=None, publish=True
+    )
+    return keys_written
+
+
+async def _load_delta(
+    result: RefreshResult,
+    generation: int | None,
+    dropped: Dict[Tuple[str, str], List[str]],
+) -> None:
+    """Writes only the players that changed since the snapshot last loaded, in place.
+
+    A snapshot with the same ETag as the last one is skipped without being downloaded.
+    Players no longer on the leaderboard are added to `dropped`, to be deleted once
+    every leaderboard has loaded, if none of the others still has them.
+    """
+    server, game_mode, file_name = result.server, result.game_mode, result.file_name
+    etag = await get_minio_etag(game_mode=game_mode, file_name=file_name, server=server)
+    loaded_etag, previous = await get_loaded_snapshot(server, game_mode, generation)
+
+    if etag == loaded_etag:
+        logging.info(f"Snapshot unchanged for {server} {game_mode}, skipping")
+        SNAPSHOTS_UNCHANGED.inc()
+        result.detail = "Snapshot unchanged"
+        return
+
+    data = await get_minio_data(game_mode=game_mode, file_name=file_name, server=server)
+    changed, removed = diff_players(previous, data)
+
+    if changed:
+        result.keys_written = await write_redis(data=changed, generation=generation)
+    dropped[server, game_mode] = removed
+    result.keys_skipped = len(data) - len(changed)
+    REDIS_KEYS_SKIPPED.inc(result.keys_skipped)
+
+    if changed or removed:
+        await write_leaderboard_index(server, game_mode, data)
+        await publish_leaderboard_update(server, game_mode, list(changed) + removed)
+    await save_loaded_snapshot(server, game_mode, generation, etag, data)
+
+    logging.info(
+        f"Delta refresh for {server} {game_mode}: {result.keys_written} written, "
+        f"{result.keys_skipped} unchanged, {len(removed)} dropped off"
+    )
+    result.status = "refreshed"
+
+
+async def _refresh_combination(
+    server: str,
+    game_mode: str,
+    semaphore: asyncio.Semaphore,
+    generation: int | None,
+    delta: bool = False,
+    staged: Dict[Tuple[str, str], int] | None = None,
+    dropped: Dict[Tuple[str, str], List[str]] | None = None,
+) -> RefreshResult:
+    """Loads the most recent data file for one server/game mode into Redis.
+
+    Failures are caught and reported in the result so one combination cannot abort the others.
 
-            # Try and fetch the data file from the bucket
-            most_recent_file_name = await get_minio_recent(
+    Args:
+        server (str): The server to refresh.
+        game_mode (str): The game mode to refresh.
+        semaphore (asyncio.Semaphore): Bounds how many combinations run at once.
+        generation (Optional[int]): The generation to write into. A full refresh loads
+            a staged generation, a delta refresh updates the live one.
+        delta (bool): Write only the players that changed since the last delta refresh.
+        staged (Dict[Tuple[str, str], int], optional): Collects the leaderboard version
+            loaded by a full refresh, left for the caller to activate with the generation.
+        dropped (Dict[Tuple[str, str], List[str]], optional): Collects the players a
+            delta refresh found gone from the leaderboard, left for the caller to delete.
+
+    Returns:
+        RefreshResult: The outcome of the refresh for this combination.
+    """
+    async with semaphore:
+        logging.info(f"Beginning to refresh data for {server} {game_mode}")
+        start = time.perf_counter()
+        result = RefreshResult(server=server, game_mode=game_mode, status="skipped")
+
+        try:
+            # A refresh must see the newest snapshot, not a cached name
+            invalidate_recent_cache([(server, game_mode)])
+            result.file_name = await get_minio_recent(
                 game_mode=game_mode,
                 server=server,
             )
 
-            if (
-                most_recent_file_name is None
-            ):  # TODO - needs to be fixed to be less messy
+            if result.file_name is None:
                 logging.info(f"No data found for {game_mode} {server}, skipping")
-                continue  # move onto next combination
-
-            # Fetch data from minio to write out
-            try:
-                data = await get_minio_data(
-                    game_mode=game_mode,
-                    file_name=most_recent_file_name,
+                result.detail = "No data found"
+            elif delta:
+                await _load_delta(
+                    result, generation, dropped if dropped is not None else {}
+                )
+            else:
+                result.keys_written, version = await _stream_into_redis(
+                    server,
+                    game_mode,
+                    result.file_name,
+                    generation,
+                    activate=staged is None,
+                )
+                if staged is not None:
+                    staged[server, game_mode] = version
+                result.status = "refreshed"
+                logging.info(f"Refresh completed for {server} {game_mode}")
+
+        except S3Error as e:
+            # Only a missing bucket or snapshot is skipped, anything else blocks the
+            # generation from going live without this leaderboard
+            logging.warning(f"MinIO read failed for {server} {game_mode}: {e}")
+            result.status = "failed"
+            result.detail = f"MinIO error: {e.code}"
+        except (tenacity.RetryError, RedisError) as e:
+            logging.error(f"Redis write failed for {server} {game_mode}: {e}")
+            result.status = "failed"
+            result.detail = "Retry attempts exhausted"
+        except Exception as e:
+            logging.exception(f"Refresh failed for {server} {game_mode}")
+            result.status = "failed"
+            result.detail = str(e)
+
+        result.duration_seconds = time.perf_counter() - start
+        return result
+
+
+async def _refresh_all(
+    generation: int | None,
+    delta: bool,
+    staged: Dict[Tuple[str, str], int] | None = None,
+    dropped: Dict[Tuple[str, str], List[str]] | None = None,
+) -> List[RefreshResult]:
+    semaphore = asyncio.Semaphore(Config.REFRESH_CONCURRENCY)
+    return list(
+        await asyncio.gather(
+            *(
+                _refresh_combination(
                     server=server,
+                    game_mode=game_mode,
+                    semaphore=semaphore,
+                    generation=generation,
+                    delta=delta,
+                    staged=staged,
+                    dropped=dropped,
                 )
-            except S3Error:
-                logging.warning(f"Failure to find data for {most_recent_file_name}!")
-                continue
+                for server in PUBGConfig.SERVERS
+                for game_mode in PUBGConfig.GAME_MODE
+            )
+        )
+    )
 
-            # Call the write_redis function with retry logic
-            try:
-                await write_redis(data=data)
-            except tenacity.RetryError as e:
-                # If retry attempts are exhausted, raise HTTP 503 Service Unavailable
-                raise HTTPException(
-                    status_code=503, detail="Retry attempts exhausted"
-                ) from e
 
-            output.append(f"{game_mode}&{server}")
-            logging.info(f"Refresh completed for {game_mode}")
-        logging.info(f"Refresh completed for {server}")
+async def _delete_dropped(
+    results: List[RefreshResult],
+    generation: int | None,
+    dropped: Dict[Tuple[str, str], List[str]],
+) -> None:
+    """Deletes players who dropped off a leaderboard and are on no other one.
+
+    Runs once every leaderboard has recorded what it loaded, so a player moving from
+    one leaderboard to another in the same refresh keeps their key. Their removal
+    from the dropping leaderboard's rank index happened when it was rewritten.
+    """
+    combinations = [
+        (server, game_mode)
+        for server in PUBGConfig.SERVERS
+        for game_mode in PUBGConfig.GAME_MODE
+    ]
+    for result in results:
+        combination = (result.server, result.game_mode)
+        removed = dropped.get(combination)
+        if not removed:
+            continue
+        others = [other for other in combinations if other != combination]
+        try:
+            listed = await listed_players(others, generation, removed)
+            result.keys_deleted = await delete_players(
+                [user_id for user_id in removed if user_id not in listed], generation
+            )
+        except RedisError as e:
+            logging.error(f"Could not delete dropped players for {combination}: {e}")
+            result.detail = "Dropped players not deleted"
+            continue
+        REDIS_KEYS_DELETED.inc(result.keys_deleted)
+
+
+@router.post("/refresh_all_data", response_model=List[RefreshResult])
+async def refresh_data() -> List[RefreshResult]:
+    """Fetches the most recent data file for all combinations of game modes and servers,
+    and writes them to Redis.
+
+    Combinations are processed concurrently, up to Config.REFRESH_CONCURRENCY at a time,
+    into a new generation. Readers are only switched over to it once every combination
+    has loaded, so they never see a mix of old and new leaderboards. The rank indexes
+    are staged alongside and switched over with it. If any combination fails, the new
+    generation and indexes are abandoned, the current ones keep being served, and the
+    combinations that did load are reported as "abandoned".
+
+    With Config.REFRESH_MODE set to "delta", only players that changed since the last
+    delta refresh are written, in place in the live generation, and identical
+    snapshots are skipped.
+
+    Returns:
+        List[RefreshResult]: The status, file used, keys written and duration of each combination.
+
+    Raises:
+        HTTPException: If a new generation cannot be allocated or swapped in.
+    """
+    logging.info(f"Beginning to refresh data in {Config.REFRESH_MODE} mode!")
+
+    if Config.REFRESH_MODE == "delta":
+        try:
+            live = await get_live_generation(get_redis_client(), refresh=True)
+        except RedisError as e:
+            raise HTTPException(status_code=503, detail="Redis unavailable") from e
+        dropped: Dict[Tuple[str, str], List[str]] = {}
+        results = await _refresh_all(generation=live, delta=True, dropped=dropped)
+        await _delete_dropped(results, live, dropped)
+        logging.info("Delta refresh completed for all combinations")
+        return results
+
+    try:
+        generation = await begin_generation()
+    except RedisError as e:
+        raise HTTPException(status_code=503, detail="Redis unavailable") from e
+
+    staged: Dict[Tuple[str, str], int] = {}
+    results = await _refresh_all(generation=generation, delta=False, staged=staged)
+
+    failed = [r for r in results if r.status == "failed"]
+    refreshed = [r for r in results if r.status == "refreshed"]
+    try:
+        if failed or not refreshed:
+            # Keep serving the current generation rather than one with holes in it
+            logging.error(
+                f"Not activating generation {generation}: {len(failed)} failed, {len(refreshed)} refreshed"
+            )
+            await expire_generation(generation)
+            for (server, game_mode), version in staged.items():
+                await _discard_staged(server, game_mode, version)
+            for result in refreshed:
+                result.status = "abandoned"
+                result.detail = (
+                    f"Generation {generation} not activated, {len(failed)} failed"
+                )
+        else:
+            await activate_generation(generation)
+            await asyncio.gather(
+                *(
+                    activate_leaderboard_version(server, game_mode, version)
+                    for (server, game_mode), version in staged.items()
+                )
+            )
+            await publish_generation_swap(generation)
+    except RedisError as e:
+        raise HTTPException(status_code=503, detail="Redis unavailable") from e
 
-    return "Completed refresh for:" + ";".join(output)
+    logging.info("Refresh completed for all combinations")
+    return results
 
 
 @router.get("/most_recent_data")
@@ -96,19 +419,13 @@ async def get_most_recent_data(request: GameModeRequest) -> str | None:
         Optional[str]: The most recent data file or None if no data is found.
 
     Raises:
-        HTTPException: If the request payload is invalid or no recent data is found.
+        HTTPException: If no recent data is found.
     """
-    # Validate the request payload
-    try:
-        validated_request = GameModeRequest(**request.dict())
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    # Try and fetch the data file from the bucket
+    # The payload was validated by FastAPI when it was parsed
     try:
         data = await get_minio_recent(
-            game_mode=validated_request.game_mode,
-            server=validated_request.server,
+            game_mode=request.game_mode,
+            server=request.server,
         )
     except S3Error as e:
         raise HTTPException(status_code=400, detail="No recent data found!") from e
@@ -124,63 +441,264 @@ async def write_redis_data(request: WriteRedisRequest) -> None:
         request (WriteRedisRequest): The request containing the details of the data to be written.
 
     Raises:
-        HTTPException: If there is an error in the request payload or fetching data from Minio.
+        HTTPException: If there is an error fetching data from Minio.
+        HTTPException: If the data file is too large or malformed.
         HTTPException: If retry attempts are exhausted while writing data to Redis.
     """
-
-    # Validate the request payload
-    try:
-        validated_request = WriteRedisRequest(**request.dict())
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    # Try and fetch the data file from the bucket
+    # The payload was validated by FastAPI when it was parsed, stream the data file
+    # from the bucket into the live generation
     try:
-        data = await get_minio_data(
-            game_mode=validated_request.game_mode,
-            file_name=validated_request.object_name,
-            server=validated_request.server,
-        )
+        await load_snapshot(request.server, request.game_mode, request.object_name)
     except S3Error as e:
         raise HTTPException(status_code=400, detail="Data file not found!") from e
-
-    # Call the write_redis function with retry logic
-    try:
-        await write_redis(data=data)
-    except tenacity.RetryError as e:
+    except SnapshotTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data file: {e}") from e
+    except (tenacity.RetryError, RedisError) as e:
         # If retry attempts are exhausted, raise HTTP 503 Service Unavailable
         raise HTTPException(status_code=503, detail="Retry attempts exhausted") from e
 
 
 @router.get("/get_user_data/{user_id}", response_model=UserDataResponse)
-async def get_user_data(user_id: str) -> UserDataResponse:
+async def get_user_data(user_id: str) -> Response:
     """Gets user data from Redis.
 
+    The cached body is returned as is, response_model only documents it.
+
     Args:
         user_id (str): The ID of the user for which data is to be fetched.
 
     Returns:
-        UserDataResponse: The response containing the user data.
+        Response: The UserDataResponse JSON for the user.
 
     Raises:
         HTTPException: If there is an error while fetching user data from Redis.
         HTTPException: If the user data is not found or invalid.
     """
-    # Validate the request payload
+    # Validate the path parameter, without building a model for it
     try:
-        UserDataRequest(user_id=user_id)
-    except ValidationError as e:
+        validate_user_id(user_id)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     try:
-        data = fetch_redis(user_id=user_id)
+        body = await fetch_user_body(user_id=user_id)
     except Exception as e:
         # Log the exception
         logging.error("An unexpected error occurred: %s", e)
         # Raise an HTTP 500 error for Internal Server Error
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
-    if data:
-        return UserDataResponse(user_id=user_id, **data)
-    else:
+    if body is None:
         raise HTTPException(status_code=404, detail="User not found or invalid data")
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/get_users_data", response_model=BatchUserDataResponse)
+async def get_users_data(request: BatchUserDataRequest) -> BatchUserDataResponse:
+    """Gets data for up to 100 users in one request.
+
+    Args:
+        request (BatchUserDataRequest): The IDs of the users to fetch.
+
+    Returns:
+        BatchUserDataResponse: The users that were found, keyed by ID, and the IDs that were not.
+
+    Raises:
+        HTTPException: If there is an error while fetching user data from Redis.
+    """
+    try:
+        data = await fetch_redis_many(user_ids=request.user_ids)
+    except Exception as e:
+        logging.error("An unexpected error occurred: %s", e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    players = {}
+    not_found = []
+    for user_id in request.user_ids:
+        stats = data[user_id]
+        if stats:
+            players[user_id] = UserDataResponse(user_id=user_id, **stats)
+        else:
+            not_found.append(user_id)
+
+    return BatchUserDataResponse(players=players, not_found=not_found)
+
+
+def _validate_leaderboard(server: str, game_mode: str) -> None:
+    try:
+        validate_server(server)
+        validate_game_mode(game_mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _leaderboard_page(
+    server: str, game_mode: str, version: int, players: RankedPlayers
+) -> LeaderboardPage:
+    return LeaderboardPage(
+        server=server,
+        game_mode=game_mode,
+        version=version,
+        players=[
+            UserDataResponse(user_id=user_id, **stats) for user_id, stats in players
+        ],
+    )
+
+
+@router.get("/leaderboard/{server}/{game_mode}", response_model=LeaderboardPage)
+async def get_leaderboard(
+    server: str,
+    game_mode: str,
+    start_rank: int = Query(1, ge=1),
+    count: int = Query(100, ge=1, le=500),
+) -> LeaderboardPage:
+    """Gets a page of a leaderboard by rank, e.g. ranks 200 to 249.
+
+    Args:
+        server (str): The server of the leaderboard.
+        game_mode (str): The game mode of the leaderboard.
+        start_rank (int): The first rank to return.
+        count (int): How many ranks to return.
+
+    Returns:
+        LeaderboardPage: The players holding those ranks, in rank order.
+
+    Raises:
+        HTTPException: If the server or game mode is invalid.
+        HTTPException: If no leaderboard has been loaded.
+    """
+    _validate_leaderboard(server, game_mode)
+
+    try:
+        version, players = await get_rank_range(server, game_mode, start_rank, count)
+    except RedisError as e:
+        logging.error("An unexpected error occurred: %s", e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    if version is None:
+        raise HTTPException(status_code=404, detail="Leaderboard not loaded")
+    return _leaderboard_page(server, game_mode, version, players)
+
+
+@router.get(
+    "/leaderboard/{server}/{game_mode}/around/{user_id}",
+    response_model=LeaderboardPage,
+)
+async def get_leaderboard_around(
+    server: str,
+    game_mode: str,
+    user_id: str,
+    radius: int = Query(5, ge=0, le=50),
+) -> LeaderboardPage:
+    """Gets the players ranked just above and below a player.
+
+    Args:
+        server (str): The server of the leaderboard.
+        game_mode (str): The game mode of the leaderboard.
+        user_id (str): The player to centre the page on.
+        radius (int): How many players to return either side.
+
+    Returns:
+        LeaderboardPage: The player and their neighbours, in rank order.
+
+    Raises:
+        HTTPException: If the server, game mode or user ID is invalid.
+        HTTPException: If the player is not on the loaded leaderboard.
+    """
+    _validate_leaderboard(server, game_mode)
+    try:
+        validate_user_id(user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        version, players = await get_players_around(server, game_mode, user_id, radius)
+    except RedisError as e:
+        logging.error("An unexpected error occurred: %s", e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not on leaderboard")
+    return _leaderboard_page(server, game_mode, version, players)
+
+
+async def _index_combination(server: str, game_mode: str) -> HistoryIndexResult:
+    result = HistoryIndexResult(server=server, game_mode=game_mode)
+    try:
+        indexed = await index_history(server, game_mode)
+    except S3Error as e:
+        logging.error(f"Could not index {server}/{game_mode}: {e}")
+        result.detail = f"Failed to read from MinIO: {e}"
+    except (RedisError, ValueError) as e:
+        logging.error(f"Could not index {server}/{game_mode}: {e}")
+        result.detail = str(e)
+    else:
+        result.snapshots_indexed = len(indexed)
+        result.last_indexed = indexed[-1] if indexed else None
+    return result
+
+
+@router.post("/index_history", response_model=List[HistoryIndexResult])
+async def index_all_history() -> List[HistoryIndexResult]:
+    """Adds snapshots written since the last run to every player's rank history.
+
+    Returns:
+        List[HistoryIndexResult]: What was indexed for each server and game mode.
+    """
+    return list(
+        await asyncio.gather(
+            *(
+                _index_combination(server, game_mode)
+                for server in PUBGConfig.SERVERS
+                for game_mode in PUBGConfig.GAME_MODE
+            )
+        )
+    )
+
+
+@router.get(
+    "/history/{server}/{game_mode}/{user_id}",
+    response_model=PlayerHistory,
+)
+async def get_history(
+    server: str,
+    game_mode: str,
+    user_id: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> PlayerHistory:
+    """Gets a player's rank, wins and games played across the indexed snapshots.
+
+    Args:
+        server (str): The server of the leaderboard.
+        game_mode (str): The game mode of the leaderboard.
+        user_id (str): The player.
+        since (datetime, optional): Leave out snapshots taken before this time.
+        until (datetime, optional): Leave out snapshots taken after this time.
+
+    Returns:
+        PlayerHistory: One point per snapshot the player appeared in, oldest first.
+
+    Raises:
+        HTTPException: If the server, game mode or user ID is invalid.
+        HTTPException: If the player has no indexed history.
+    """
+    _validate_leaderboard(server, game_mode)
+    try:
+        validate_user_id(user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        points = await get_player_history(server, game_mode, user_id, since, until)
+    except RedisError as e:
+        logging.error("An unexpected error occurred: %s", e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    if not points:
+        raise HTTPException(status_code=404, detail="No history for user")
+    return PlayerHistory(
+        user_id=user_id, server=server, game_mode=game_mode, points=points
+    )
@@ -11,5 +11,65 @@ class _MinioConfig(BaseSettings):
     # The base name, will concat w/ season type
     BUCKET_BASE_NAME: str = "pubg-leaderboard-bucket"
 
+    # Small object in each bucket naming its newest snapshot, avoids listing the bucket
+    LATEST_POINTER_NAME: str = "latest.json"
+    SNAPSHOT_PREFIX: str = "data_"
+
+    # "json" or "columnar-v1", compressed with "none", "gzip" or "zstd"
+    SNAPSHOT_FORMAT: str = "json"
+    SNAPSHOT_COMPRESSION: str = "none"
+
+    # Connection pool shared by every request in a process
+    MINIO_MAX_POOL_SIZE: int = 32
+    MINIO_CONNECT_TIMEOUT: float = 5.0
+    MINIO_READ_TIMEOUT: float = 30.0
+
+    # Snapshots are kept as written for RETENTION_KEEP_DAYS, then rolled up into one
+    # archive per day, and after a further RETENTION_DAILY_DAYS into one per ISO week
+    ARCHIVE_PREFIX: str = "archive_"
+    RETENTION_KEEP_DAYS: int = 7
+    RETENTION_DAILY_DAYS: int = 28
+
+    # Snapshots are parsed as they download, a batch of players at a time
+    SNAPSHOT_MAX_SIZE: int = 256 * 1024 * 1024
+    SNAPSHOT_STREAM_CHUNK_SIZE: int = 64 * 1024
+    SNAPSHOT_STREAM_BATCH_SIZE: int = 5000
+
 
 MinioConfig = _MinioConfig()
+
+
+class _RedisConfig(BaseSettings):
+    """Config for connecting to the Redis cluster"""
+
+    REDIS_HOST: str = "localhost"
+    REDIS_PASSWORD: str = ""
+    REDIS_PORT: int = 6379
+
+    # Pool bounds are per cluster node
+    REDIS_MAX_CONNECTIONS: int = 32
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # seconds idle before a PING on checkout
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+
+    # Keys sent per pipelined round of MSETs when bulk loading
+    REDIS_WRITE_BATCH_SIZE: int = 500
+
+    # Seconds a replaced leaderboard version stays readable for in-flight requests
+    REDIS_LEADERBOARD_RETENTION: int = 300
+
+    # Seconds a replaced (or abandoned) player generation stays readable
+    REDIS_GENERATION_RETENTION: int = 300
+
+    # Snapshots compacted into the rank history per server/game mode on each indexing run
+    REDIS_HISTORY_INDEX_BATCH: int = 100
+
+    # Days of snapshots kept in each player's rank history. Older points are trimmed as
+    # newer ones are indexed, and a player missing from every snapshot for this long
+    # loses the whole history
+    REDIS_HISTORY_RETENTION_DAYS: int = 90
+
+    # "json" string per player, or "hash" of integer fields. Reads accept both
+    REDIS_STORAGE_LAYOUT: str = "json"
+
+
+RedisConfig = _RedisConfig()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -18,6 +18,26 @@ class _PUBGConfig(BaseSettings):
 
     PUBG_API_TOKEN: str = ""  # NEEDS TO BE SET LOCALLY
 
+    # Starting budget, corrected at runtime from the X-Ratelimit-* response headers
+    RATE_LIMIT_REQUESTS: int = 10
+    RATE_LIMIT_PERIOD: float = 60.0
+    MAX_RATE_LIMIT_RETRIES: int = 3
+
+    FETCH_WORKERS: int = 4
+
+    # Optional file the current season per server is kept in between runs
+    SEASON_CACHE_PATH: Optional[str] = None
+    SEASON_CACHE_TTL: float = 6 * 3600
+    UPLOAD_WORKERS: int = 2
+
+    # Pipeline mode also loads each leaderboard into Redis as soon as it is uploaded.
+    # Each stage hands over through a queue of this size, so a slow stage holds back
+    # the ones before it instead of buffering every leaderboard in memory
+    PIPELINE_MODE: bool = False
+    PIPELINE_QUEUE_SIZE: int = 2
+    # Batch jobs are not scraped, their metrics are pushed here at the end of a run
+    PIPELINE_PUSHGATEWAY: Optional[str] = None
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
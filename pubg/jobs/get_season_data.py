@@ -1,20 +1,105 @@
 import logging
+import time
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from pubg.jobs.config import PUBGConfig
+from pubg.jobs.normalize import Leaderboard, normalize_leaderboard
+from pubg.jobs.rate_limit import TokenBucket
+from pubg.jobs.season_cache import SeasonCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)  # Set logging level to INFO
 
+season_cache = SeasonCache(
+    path=PUBGConfig.SEASON_CACHE_PATH, ttl=PUBGConfig.SEASON_CACHE_TTL
+)
 
-# @tenacity.retry(
-#     wait=tenacity.wait_exponential(min=0.1, max=1.0),
-#     stop=tenacity.stop_after_attempt(5),
-#     reraise=True,
-# )
-def fetch_pubg_cur_season(server: str, url: Optional[str] = None) -> Any:
+_session: Optional[requests.Session] = None
+
+
+class _ServerErrorRetry(Retry):
+    """Retry policy that leaves 429s to `_get`, so waits are shared through the rate limiter"""
+
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the keep-alive session shared by every fetch in the job.
+
+    Transient server errors are retried with exponential backoff, honouring any
+    Retry-After header. 429s are left to `_get` so the rate limiter sees them.
+    """
+    global _session
+    if _session is None:
+        retry = _ServerErrorRetry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=PUBGConfig.FETCH_WORKERS, max_retries=retry
+        )
+        _session = requests.Session()
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+
+def _get(
+    url: str, headers: Dict[str, str], rate_limiter: Optional[TokenBucket] = None
+) -> requests.Response:
+    """
+    Sends a GET within the rate limit, waiting out and retrying any 429 responses.
+
+    Args:
+        url (str): The URL to fetch.
+        headers (Dict[str, str]): The request headers.
+        rate_limiter (TokenBucket, optional): Shared budget for all fetches in the job.
+
+    Returns:
+        requests.Response: The successful response.
+    """
+    for _ in range(PUBGConfig.MAX_RATE_LIMIT_RETRIES + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        response = get_session().get(url, headers=headers)
+
+        if rate_limiter is not None:
+            rate_limiter.update_from_headers(response.headers)
+
+        if response.status_code != 429:
+            break
+
+        retry_after = response.headers.get("Retry-After")
+        reset = response.headers.get("X-Ratelimit-Reset")
+        if retry_after is not None:
+            wait = float(retry_after)
+        elif reset is not None:
+            wait = float(reset) - time.time()
+        else:
+            wait = PUBGConfig.RATE_LIMIT_PERIOD
+        logging.warning(f"Rate limited on {url}, waiting {wait:.1f}s")
+        if rate_limiter is not None:
+            rate_limiter.block_for(wait)
+        else:
+            time.sleep(max(0.0, wait))
+
+    response.raise_for_status()  # Raise an exception for bad response status
+    return response
+
+
+def fetch_pubg_cur_season(
+    server: str, url: Optional[str] = None, rate_limiter: Optional[TokenBucket] = None
+) -> Any:
     """
     Fetches the current PUBG season ID.
 
@@ -22,6 +107,7 @@ def fetch_pubg_cur_season(server: str, url: Optional[str] = None) -> Any:
         server: the server being evaluated
         url (str, optional): The URL for the PUBG season data endpoint.
             If not provided, default is fetched from PUBGConfig.
+        rate_limiter (TokenBucket, optional): Shared request budget for the job.
 
     Returns:
         str: The ID of the current season.
@@ -38,8 +124,7 @@ def fetch_pubg_cur_season(server: str, url: Optional[str] = None) -> Any:
         "Authorization": f"Bearer {PUBGConfig.PUBG_API_TOKEN}",
     }
 
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()  # Raise an exception for bad response status
+    response = _get(url, headers=headers, rate_limiter=rate_limiter)
     data = response.json()
 
     # Iterate over the items in the 'data' list
@@ -54,16 +139,13 @@ def fetch_pubg_cur_season(server: str, url: Optional[str] = None) -> Any:
     return None
 
 
-# @tenacity.retry(
-#     wait=tenacity.wait_exponential(
-#         min=0.1, max=1.0
-#     ),  # Exponential backoff wait strategy
-#     stop=tenacity.stop_after_attempt(3),  # Retry 3 times
-#     reraise=True,  # Reraise exceptions after retries
-# )
 def fetch_pubg_leaderboard(
-    server: str, game_mode: str, url: str = PUBGConfig.LEADERBOARD_URL
-) -> Dict[str, Dict[str, str]]:
+    server: str,
+    game_mode: str,
+    url: str = PUBGConfig.LEADERBOARD_URL,
+    season_url: Optional[str] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> Leaderboard:
     """
     Fetches PUBG leaderboard data.
 
@@ -71,9 +153,12 @@ def fetch_pubg_leaderboard(
         server (str): The PUBG server type (e.g., "xbox", "steam).
         game_mode (str): The PUBG game mode type (e.g., "squad", "duo", "solo").
         url (str, optional): The base URL for PUBG leaderboard. Defaults to PUBGConfig.LEADERBOARD_URL.
+        season_url (str, optional): The base URL for the season lookup. Defaults to PUBGConfig.BASE_URL.
+        rate_limiter (TokenBucket, optional): Shared request budget for the job.
 
     Returns:
-        Dict[str, Dict[str, str]]: A dictionary containing player IDs as keys and their leaderboard details as values.
+        Leaderboard: Player IDs mapped to their rank, wins and games_played.
+            Malformed rows are left out, and an inactive game mode is empty.
     """
 
     headers = {
@@ -83,8 +168,13 @@ def fetch_pubg_leaderboard(
 
     logging.info(f"Fetching PUBG leaderboard for: {server}")
 
-    # Fetch the current season ID
-    cur_season_id = fetch_pubg_cur_season(server=server)
+    # Fetch the current season ID, looked up once per server per run
+    cur_season_id = season_cache.get(
+        server,
+        lambda: fetch_pubg_cur_season(
+            server=server, url=season_url, rate_limiter=rate_limiter
+        ),
+    )
 
     if cur_season_id is None:
         logging.error(
@@ -95,23 +185,19 @@ def fetch_pubg_leaderboard(
     # Construct the URL with the current season ID and season type
     url = f"{url}/{cur_season_id}/{game_mode}"
 
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
+    response = _get(url, headers=headers, rate_limiter=rate_limiter)
     data = response.json()
 
     # If no data in current season / not active
-    if "included" not in data or len(data.get("included", [])) != 500:
+    included = data.get("included")
+    if not isinstance(included, list) or not included:
         logging.info(f"Current season not active game mode {game_mode} for {server}")
         return {}
 
-    # Extract player details from the response
-    player_dict = {}
-    for player in data.get("included", []):
-        details = player.get("attributes", {})
-        player_dict[player["id"]] = {
-            "rank": details.get("rank"),
-            "wins": details["stats"].get("wins"),
-            "games_played": details["stats"].get("games"),
-        }
-
+    # Keep only well-formed players, a partial leaderboard is still worth writing
+    player_dict, rejected = normalize_leaderboard(included)
+    if rejected:
+        logging.warning(
+            f"Dropped {rejected} malformed players from {server} {game_mode}"
+        )
     return player_dict
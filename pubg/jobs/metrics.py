@@ -0,0 +1,41 @@
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+# A registry of its own, pushed to PUBGConfig.PIPELINE_PUSHGATEWAY when a run ends
+registry = CollectorRegistry()
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pubg_pipeline_stage_seconds",
+    "Time spent fetching, uploading or loading one leaderboard",
+    ["stage"],
+    registry=registry,
+)
+PIPELINE_BLOCKED_SECONDS = Histogram(
+    "pubg_pipeline_blocked_seconds",
+    "Time a stage waited for room in the next stage's queue",
+    ["stage"],
+    registry=registry,
+)
+PIPELINE_QUEUE_DEPTH = Gauge(
+    "pubg_pipeline_queue_depth",
+    "Leaderboards waiting in front of a stage",
+    ["stage"],
+    registry=registry,
+)
+PIPELINE_FRESHNESS_SECONDS = Histogram(
+    "pubg_pipeline_freshness_lag_seconds",
+    "Time from a leaderboard being fetched to it being readable from Redis",
+    buckets=(1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+    registry=registry,
+)
+PIPELINE_LAST_FRESHNESS_SECONDS = Gauge(
+    "pubg_pipeline_last_freshness_lag_seconds",
+    "Freshness lag of the most recent load of each leaderboard",
+    ["server", "game_mode"],
+    registry=registry,
+)
+PIPELINE_LEADERBOARDS = Counter(
+    "pubg_pipeline_leaderboards_total",
+    "Leaderboards that passed through the pipeline by outcome",
+    ["result"],
+    registry=registry,
+)
@@ -0,0 +1,71 @@
+from collections import Counter
+from typing import Any, Dict, List, Tuple, TypedDict
+
+
+class PlayerStats(TypedDict):
+    rank: int
+    wins: int
+    games_played: int
+
+
+Leaderboard = Dict[str, PlayerStats]
+
+_USER_ID_PREFIX = "account."
+
+
+def _column(rows: List[Any], *path: str) -> List[Any]:
+    """Pulls one field out of every row, None wherever the path is missing"""
+    values = rows
+    for key in path:
+        values = [v.get(key) if isinstance(v, dict) else None for v in values]
+    return values
+
+
+def _counts(values: List[Any], minimum: int) -> List[bool]:
+    # bool is an int subclass, but a True rank is still malformed
+    return [type(v) is int and v >= minimum for v in values]
+
+
+def normalize_leaderboard(
+    included: List[Any],
+) -> Tuple[Leaderboard, int]:
+    """
+    Turns the `included` entries of a leaderboard response into typed player stats.
+
+    Each field is extracted and checked as a whole column, then rows failing any
+    check are dropped rather than written with missing values. A row is kept when
+    it has an "account." ID seen only once, a rank of at least 1, and whole numbers
+    of wins and games with wins no more than games.
+
+    Args:
+        included (List[Any]): The player entries of the response.
+
+    Returns:
+        Tuple[Leaderboard, int]: The valid players by ID, and how many rows were rejected.
+    """
+    ids = _column(included, "id")
+    ranks = _column(included, "attributes", "rank")
+    wins = _column(included, "attributes", "stats", "wins")
+    games = _column(included, "attributes", "stats", "games")
+
+    seen = Counter(v for v in ids if isinstance(v, str))
+
+    valid_ids = [
+        isinstance(v, str) and v.startswith(_USER_ID_PREFIX) and seen[v] == 1
+        for v in ids
+    ]
+    valid = [
+        all(checks) and w <= g
+        for checks, w, g in zip(
+            zip(valid_ids, _counts(ranks, 1), _counts(wins, 0), _counts(games, 0)),
+            wins,
+            games,
+        )
+    ]
+
+    players: Leaderboard = {
+        user_id: {"rank": rank, "wins": w, "games_played": g}
+        for user_id, rank, w, g, ok in zip(ids, ranks, wins, games, valid)
+        if ok
+    }
+    return players, len(included) - len(players)
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import push_to_gateway
+
+from pubg.api.clients import close_clients
+from pubg.api.invalidation import publish_leaderboard_update
+from pubg.api.leaderboard import write_leaderboard_index
+from pubg.api.redis_cache import write_redis
+from pubg.config import MinioConfig
+from pubg.jobs.config import PUBGConfig
+from pubg.jobs.get_season_data import fetch_pubg_leaderboard
+from pubg.jobs.metrics import (
+    PIPELINE_BLOCKED_SECONDS,
+    PIPELINE_FRESHNESS_SECONDS,
+    PIPELINE_LAST_FRESHNESS_SECONDS,
+    PIPELINE_LEADERBOARDS,
+    PIPELINE_QUEUE_DEPTH,
+    PIPELINE_STAGE_SECONDS,
+    registry,
+)
+from pubg.jobs.normalize import Leaderboard
+from pubg.jobs.rate_limit import TokenBucket
+from pubg.jobs.scheduler import FetchFn, WriteFn
+from pubg.jobs.write_minio import write_leaderboard_data_minio
+
+LoadFn = Callable[[str, str, Leaderboard], Awaitable[Any]]
+
+# server, game mode, the leaderboard, and the monotonic time it was fetched
+_Item = Tuple[str, str, Leaderboard, float]
+_DONE = None  # queued once per consumer when its producers have finished
+
+
+async def load_into_redis(server: str, game_mode: str, data: Leaderboard) -> int:
+    """
+    Writes a leaderboard into the live player generation and its rank index.
+
+    Args:
+        server (str): The server of the leaderboard.
+        game_mode (str): The game mode of the leaderboard.
+        data (Leaderboard): Player IDs mapped to their stats.
+
+    Returns:
+        int: The number of players written.
+    """
+    try:
+        written = await write_redis(data=data)  # type: ignore[arg-type]
+    finally:
+        # Even a partial write may have replaced players the API workers cached
+        await publish_leaderboard_update(server, game_mode, list(data))
+    await write_leaderboard_index(server, game_mode, data)  # type: ignore[arg-type]
+    return written
+
+
+class _StageQueue:
+    """The bounded queue in front of a stage, blocking producers while it is full"""
+
+    def __init__(self, stage: str, size: int) -> None:
+        self.stage = stage
+        self._queue: queue.Queue[Optional[_Item]] = queue.Queue(maxsize=size)
+
+    def put(self, item: Optional[_Item]) -> None:
+        start = time.perf_counter()
+        self._queue.put(item)
+        PIPELINE_BLOCKED_SECONDS.labels(self.stage).observe(time.perf_counter() - start)
+        PIPELINE_QUEUE_DEPTH.labels(self.stage).set(self._queue.qsize())
+
+    def get(self) -> Optional[_Item]:
+        item = self._queue.get()
+        PIPELINE_QUEUE_DEPTH.labels(self.stage).set(self._queue.qsize())
+        return item
+
+
+def _push_metrics() -> None:
+    if not PUBGConfig.PIPELINE_PUSHGATEWAY:
+        return
+    try:
+        push_to_gateway(
+            PUBGConfig.PIPELINE_PUSHGATEWAY, job="pubg-pipeline", registry=registry
+        )
+    except OSError as e:
+        logging.warning(f"Could not push pipeline metrics: {e}")
+
+
+class _Pipeline:
+    """One run's stages and the queues between them"""
+
+    def __init__(
+        self,
+        rate_limiter: TokenBucket,
+        queue_size: int,
+        fetch: FetchFn,
+        write: WriteFn,
+        load: LoadFn,
+    ) -> None:
+        self.rate_limiter = rate_limiter
+        self.fetch = fetch
+        self.write = write
+        self.load = load
+        self.uploads = _StageQueue("upload", queue_size)
+        self.loads = _StageQueue("load", queue_size)
+        self.results: Dict[Tuple[str, str], str] = {}
+        self._results_lock = threading.Lock()
+
+    def record(self, server: str, game_mode: str, result: str) -> None:
+        with self._results_lock:
+            self.results[server, game_mode] = result
+        PIPELINE_LEADERBOARDS.labels(result.split(":")[0]).inc()
+
+    def fetch_one(self, server: str, game_mode: str) -> None:
+        logging.info(f"Beginning fetch for {server} in game mode {game_mode}")
+        start = time.perf_counter()
+        try:
+            data = self.fetch(
+                server=server, game_mode=game_mode, rate_limiter=self.rate_limiter
+            )
+        except Exception as e:
+            logging.error(f"Fetch failed for {(server, game_mode)}: {e}")
+            self.record(server, game_mode, f"fetch failed: {e}")
+            return
+        finally:
+            PIPELINE_STAGE_SECONDS.labels("fetch").observe(time.perf_counter() - start)
+
+        if not data:
+            self.record(server, game_mode, "inactive")
+            return
+        self.uploads.put((server, game_mode, data, time.monotonic()))
+
+    def upload_worker(self) -> None:
+        while (item := self.uploads.get()) is not _DONE:
+            server, game_mode, data, _ = item
+            bucket_name = f"{MinioConfig.BUCKET_BASE_NAME}-{server}-{game_mode}"
+            start = time.perf_counter()
+            try:
+                written = self.write(bucket_name=bucket_name, data=data)
+            except Exception as e:
+                logging.error(f"Upload failed for {bucket_name}: {e}")
+                self.record(server, game_mode, f"upload failed: {e}")
+                continue
+            finally:
+                PIPELINE_STAGE_SECONDS.labels("upload").observe(
+                    time.perf_counter() - start
+                )
+
+            if written is False:
+                self.record(server, game_mode, "unchanged")
+                continue
+            self.loads.put(item)
+
+    async def _load_one(self, item: _Item) -> None:
+        server, game_mode, data, fetched_at = item
+        start = time.perf_counter()
+        try:
+            await self.load(server, game_mode, data)
+        except Exception as e:
+            logging.error(f"Load failed for {(server, game_mode)}: {e}")
+            self.record(server, game_mode, f"load failed: {e}")
+            return
+        finally:
+            PIPELINE_STAGE_SECONDS.labels("load").observe(time.perf_counter() - start)
+
+        lag = time.monotonic() - fetched_at
+        PIPELINE_FRESHNESS_SECONDS.observe(lag)
+        PIPELINE_LAST_FRESHNESS_SECONDS.labels(server, game_mode).set(lag)
+        self.record(server, game_mode, "loaded")
+        logging.info(f"{server} {game_mode} readable {lag:.1f}s after fetch")
+
+    async def load_all(self) -> None:
+        try:
+            while (item := await asyncio.to_thread(self.loads.get)) is not _DONE:
+                await self._load_one(item)
+        finally:
+            await close_clients()
+
+
+def run_pipeline(
+    servers: Optional[List[str]] = None,
+    game_modes: Optional[List[str]] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    fetch_workers: int = PUBGConfig.FETCH_WORKERS,
+    upload_workers: int = PUBGConfig.UPLOAD_WORKERS,
+    queue_size: int = PUBGConfig.PIPELINE_QUEUE_SIZE,
+    fetch: FetchFn = fetch_pubg_leaderboard,
+    write: WriteFn = write_leaderboard_data_minio,
+    load: LoadFn = load_into_redis,
+) -> Dict[Tuple[str, str], str]:
+    """
+    Fetches every leaderboard, uploads it to MinIO and loads it into Redis as it arrives.
+
+    Fetch workers feed upload workers, which feed a single loader running the Redis
+    writes on its own event loop. Every hand-over goes through a queue of `queue_size`,
+    so when Redis or MinIO slow down the stages before them wait rather than piling
+    up leaderboards in memory. Leaderboards MinIO already holds are not loaded again.
+
+    Args:
+        servers (List[str], optional): Servers to fetch. Defaults to PUBGConfig.SERVERS.
+        game_modes (List[str], optional): Game modes to fetch. Defaults to PUBGConfig.GAME_MODE.
+        rate_limiter (TokenBucket, optional): Request budget. Defaults to the configured PUBG limit.
+        fetch_workers (int): Leaderboards fetched at once.
+        upload_workers (int): MinIO uploads in flight at once.
+        queue_size (int): Leaderboards waiting in front of each stage at most.
+        fetch (FetchFn): Fetches one leaderboard, called with server, game_mode and rate_limiter.
+        write (WriteFn): Uploads one leaderboard, called with bucket_name and data.
+        load (LoadFn): Loads one leaderboard into Redis, called with server, game_mode and data.
+
+    Returns:
+        Dict[Tuple[str, str], str]: "loaded", "unchanged", "inactive" or the error for each (server, game_mode).
+    """
+    servers = servers or PUBGConfig.SERVERS
+    game_modes = game_modes or PUBGConfig.GAME_MODE
+    if rate_limiter is None:
+        rate_limiter = TokenBucket(
+            capacity=PUBGConfig.RATE_LIMIT_REQUESTS, period=PUBGConfig.RATE_LIMIT_PERIOD
+        )
+
+    pipeline = _Pipeline(rate_limiter, queue_size, fetch, write, load)
+    start = time.perf_counter()
+
+    loader = threading.Thread(
+        target=asyncio.run, args=(pipeline.load_all(),), name="load"
+    )
+    uploaders = [
+        threading.Thread(target=pipeline.upload_worker, name=f"upload-{i}")
+        for i in range(upload_workers)
+    ]
+    loader.start()
+    for uploader in uploaders:
+        uploader.start()
+
+    with ThreadPoolExecutor(fetch_workers, thread_name_prefix="fetch") as fetch_pool:
+        for server in servers:
+            for game_mode in game_modes:
+                fetch_pool.submit(pipeline.fetch_one, server, game_mode)
+
+    # Shut the stages down in order, each draining its queue first
+    for _ in uploaders:
+        pipeline.uploads.put(_DONE)
+    for uploader in uploaders:
+        uploader.join()
+    pipeline.loads.put(_DONE)
+    loader.join()
+
+    logging.info(
+        f"Pipelined {len(pipeline.results)} leaderboards"
+        f" in {time.perf_counter() - start:.1f}s"
+    )
+    _push_metrics()
+    return pipeline.results
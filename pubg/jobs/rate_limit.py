@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from typing import Mapping
+
+
+class TokenBucket:
+    """Thread-safe token bucket kept in step with the PUBG API rate-limit headers.
+
+    Starts from a configured capacity per period and is corrected by the
+    X-Ratelimit-Limit/-Remaining/-Reset headers on every response, so concurrent
+    fetches never spend more than the server says is left in the current window.
+    """
+
+    # Cushion for clock skew between the reset header and the local clock
+    RESET_MARGIN_SECONDS = 0.05
+
+    def __init__(self, capacity: int, period: float) -> None:
+        """
+        Args:
+            capacity (int): Requests allowed per period.
+            period (float): Length of the rate-limit window in seconds.
+        """
+        self.capacity = capacity
+        self.period = period
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        if now < self._blocked_until:
+            self._updated = now
+            return
+        if self._blocked_until:
+            # The server's window has reset, the full quota is available again
+            self._blocked_until = 0.0
+            self._tokens = float(self.capacity)
+        else:
+            rate = self.capacity / self.period
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * rate
+            )
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent, then spends one token."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(
+                    self._blocked_until - now,
+                    (1 - self._tokens) * self.period / self.capacity,
+                )
+                self._cond.wait(wait)
+
+    def block_for(self, seconds: float) -> None:
+        """Stops all requests for `seconds`, e.g. after a 429."""
+        with self._cond:
+            self._tokens = 0.0
+            self._blocked_until = max(
+                self._blocked_until,
+                time.monotonic() + seconds + self.RESET_MARGIN_SECONDS,
+            )
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Corrects the bucket with the rate-limit headers from a response.
+
+        Args:
+            headers (Mapping[str, str]): The response headers.
+        """
+        limit = headers.get("X-Ratelimit-Limit")
+        remaining = headers.get("X-Ratelimit-Remaining")
+        reset = headers.get("X-Ratelimit-Reset")
+
+        with self._cond:
+            if limit is not None and int(limit) != self.capacity:
+                logging.info(f"Rate limit is {limit} requests per window")
+                self.capacity = int(limit)
+            if remaining is None:
+                return
+            self._tokens = min(self._tokens, float(remaining))
+            if int(remaining) <= 0 and reset is not None:
+                # Reset is the epoch second at which the window reopens
+                wait = max(0.0, float(reset) - time.time())
+                self._blocked_until = max(
+                    self._blocked_until,
+                    time.monotonic() + wait + self.RESET_MARGIN_SECONDS,
+                )
+            self._cond.notify_all()
@@ -0,0 +1,297 @@
+import argparse
+import gzip
+import json
+import logging
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional
+
+from minio import Minio
+from minio.error import S3Error
+
+from pubg.config import MinioConfig
+from pubg.jobs.config import PUBGConfig
+from pubg.snapshot import Leaderboard, decode_snapshot, snapshot_timestamp
+
+# Archives hold {snapshot object name: leaderboard}, gzipped JSON, so each original
+# snapshot can be recovered exactly
+Archive = Dict[str, Leaderboard]
+Plan = Dict[str, List[str]]
+
+
+ARCHIVE_METADATA_KEY = "pubg-archive"
+_ARCHIVE_VERSION = "v1"
+_ARCHIVE_EXTENSION = ".json.gz"
+
+
+class ArchiveError(Exception):
+    """Raised when a roll up cannot be completed safely"""
+
+
+def daily_archive_name(day: date) -> str:
+    return f"{MinioConfig.ARCHIVE_PREFIX}daily_{day:%Y-%m-%d}{_ARCHIVE_EXTENSION}"
+
+
+def weekly_archive_name(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{MinioConfig.ARCHIVE_PREFIX}weekly_{year}-W{week:02d}{_ARCHIVE_EXTENSION}"
+
+
+def _daily_archive_day(object_name: str) -> Optional[date]:
+    prefix = f"{MinioConfig.ARCHIVE_PREFIX}daily_"
+    if not object_name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(
+            object_name[len(prefix) :].removesuffix(_ARCHIVE_EXTENSION), "%Y-%m-%d"
+        ).date()
+    except ValueError:
+        return None
+
+
+def plan_retention(
+    object_names: Iterable[str],
+    today: date,
+    keep_days: int = MinioConfig.RETENTION_KEEP_DAYS,
+    daily_days: int = MinioConfig.RETENTION_DAILY_DAYS,
+    protected: Iterable[str] = (),
+) -> Plan:
+    """
+    Decides which objects of a bucket are rolled up into which archive.
+
+    Snapshots from the last `keep_days` days are left alone. Older ones go into the
+    archive for their day, and once more than `daily_days` further days old into the
+    archive for their ISO week, which also absorbs any daily archives of that age.
+
+    Args:
+        object_names (Iterable[str]): Every object in the bucket.
+        today (date): The day the job runs.
+        keep_days (int): Days snapshots are kept as written.
+        daily_days (int): Days after that they are kept in daily archives.
+        protected (Iterable[str]): Objects never to roll up, e.g. the latest snapshot.
+
+    Returns:
+        Plan: Archive name mapped to the objects rolled into it, oldest first.
+    """
+    keep_from = today - timedelta(days=keep_days)
+    daily_from = keep_from - timedelta(days=daily_days)
+    protected = set(protected)
+    plan: Plan = {}
+
+    for object_name in sorted(object_names):
+        if object_name in protected:
+            continue
+
+        if object_name.startswith(MinioConfig.SNAPSHOT_PREFIX):
+            try:
+                day = snapshot_timestamp(object_name).date()
+            except ValueError:
+                logging.warning(f"Leaving {object_name}, its name has no timestamp")
+                continue
+            if day >= keep_from:
+                continue
+            archive_name = (
+                daily_archive_name(day)
+                if day >= daily_from
+                else weekly_archive_name(day)
+            )
+        else:
+            day = _daily_archive_day(object_name)  # type: ignore[assignment]
+            if day is None or day >= daily_from:
+                continue
+            archive_name = weekly_archive_name(day)
+
+        plan.setdefault(archive_name, []).append(object_name)
+    return plan
+
+
+def encode_archive(archive: Archive) -> bytes:
+    return gzip.compress(json.dumps(archive, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_archive(body: bytes) -> Archive:
+    return json.loads(gzip.decompress(body))
+
+
+def _read(minio_client: Minio, bucket_name: str, object_name: str) -> Archive:
+    """Reads a snapshot or archive as an archive, a snapshot being one entry"""
+    response = minio_client.get_object(bucket_name, object_name)
+    try:
+        body = response.read()
+        headers = response.headers
+    finally:
+        response.close()
+        response.release_conn()
+
+    if object_name.startswith(MinioConfig.ARCHIVE_PREFIX):
+        return decode_archive(body)
+    return {object_name: decode_snapshot(body, headers)}
+
+
+def _read_existing(minio_client: Minio, bucket_name: str, archive_name: str) -> Archive:
+    try:
+        return _read(minio_client, bucket_name, archive_name)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            return {}
+        raise
+
+
+def roll_up(
+    minio_client: Minio, bucket_name: str, archive_name: str, sources: List[str]
+) -> int:
+    """
+    Writes an archive of `sources`, verifies it, and only then deletes the sources.
+
+    An archive left by an interrupted run is read back and extended, never replaced,
+    so repeating a run loses nothing.
+
+    Args:
+        minio_client (Minio): The client to use.
+        bucket_name (str): The bucket holding the objects.
+        archive_name (str): The archive to write.
+        sources (List[str]): Snapshots and daily archives to roll into it.
+
+    Returns:
+        int: Snapshots held by the archive.
+
+    Raises:
+        S3Error: If an object cannot be read, written or deleted.
+        ArchiveError: If the archive read back does not match what was written.
+    """
+    archive = _read_existing(minio_client, bucket_name, archive_name)
+    for object_name in sources:
+        archive.update(_read(minio_client, bucket_name, object_name))
+
+    body = encode_archive(archive)
+    minio_client.put_object(
+        bucket_name=bucket_name,
+        object_name=archive_name,
+        data=BytesIO(body),
+        length=len(body),
+        content_type="application/gzip",
+        metadata={ARCHIVE_METADATA_KEY: _ARCHIVE_VERSION},  # type: ignore[dict-item]
+    )
+
+    # Compare what MinIO now holds, not what was sent, before anything is deleted
+    if _read(minio_client, bucket_name, archive_name) != archive:
+        raise ArchiveError(f"{bucket_name}/{archive_name} did not verify, kept sources")
+
+    for object_name in sources:
+        minio_client.remove_object(bucket_name, object_name)
+    return len(archive)
+
+
+def _latest_snapshot(minio_client: Minio, bucket_name: str) -> Optional[str]:
+    try:
+        response = minio_client.get_object(bucket_name, MinioConfig.LATEST_POINTER_NAME)
+    except S3Error:
+        return None
+    try:
+        return json.loads(response.read())["object_name"]
+    except (ValueError, KeyError) as e:
+        # A corrupt pointer protects nothing, but must not stop the other buckets
+        logging.warning(f"Ignoring unreadable latest pointer in {bucket_name}: {e}")
+        return None
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def apply_retention(
+    minio_client: Minio,
+    bucket_name: str,
+    today: date,
+    dry_run: bool = False,
+) -> Dict[str, str]:
+    """
+    Rolls up one bucket according to the configured retention.
+
+    Args:
+        minio_client (Minio): The client to use.
+        bucket_name (str): The bucket to roll up.
+        today (date): The day the job runs.
+        dry_run (bool): Only log what would be archived and deleted.
+
+    Returns:
+        Dict[str, str]: The outcome for each archive in the plan.
+    """
+    object_names = [obj.object_name for obj in minio_client.list_objects(bucket_name)]
+    latest = _latest_snapshot(minio_client, bucket_name)
+    plan = plan_retention(object_names, today, protected=[latest] if latest else [])
+
+    results: Dict[str, str] = {}
+    for archive_name, sources in plan.items():
+        if dry_run:
+            logging.info(
+                f"Would roll {len(sources)} objects into {bucket_name}/{archive_name}"
+                f" and delete {', '.join(sources)}"
+            )
+            results[archive_name] = f"would archive {len(sources)}"
+            continue
+
+        try:
+            count = roll_up(minio_client, bucket_name, archive_name, sources)
+        except (S3Error, ArchiveError) as e:
+            logging.error(f"Roll up into {bucket_name}/{archive_name} failed: {e}")
+            results[archive_name] = f"failed: {e}"
+            continue
+        logging.info(
+            f"Rolled {len(sources)} objects into {bucket_name}/{archive_name},"
+            f" now holding {count} snapshots"
+        )
+        results[archive_name] = f"archived {len(sources)}"
+    return results
+
+
+def run_retention(
+    servers: Optional[List[str]] = None,
+    game_modes: Optional[List[str]] = None,
+    today: Optional[date] = None,
+    dry_run: bool = False,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Applies retention to every server/game mode bucket.
+
+    Args:
+        servers (List[str], optional): Servers to roll up. Defaults to PUBGConfig.SERVERS.
+        game_modes (List[str], optional): Game modes to roll up. Defaults to PUBGConfig.GAME_MODE.
+        today (date, optional): The day the job runs. Defaults to today.
+        dry_run (bool): Only log what would be archived and deleted.
+
+    Returns:
+        Dict[str, Dict[str, str]]: The outcome for each archive, by bucket.
+    """
+    minio_client = Minio(
+        endpoint=MinioConfig.MINIO_ENDPOINT,
+        access_key=MinioConfig.MINIO_ROOT_USER,
+        secret_key=MinioConfig.MINIO_ROOT_PASSWORD,
+        secure=False,  # no TLS encryption
+    )
+    today = today or datetime.now().date()
+
+    results: Dict[str, Dict[str, str]] = {}
+    for server in servers or PUBGConfig.SERVERS:
+        for game_mode in game_modes or PUBGConfig.GAME_MODE:
+            bucket_name = f"{MinioConfig.BUCKET_BASE_NAME}-{server}-{game_mode}"
+            if not minio_client.bucket_exists(bucket_name):
+                continue
+            results[bucket_name] = apply_retention(
+                minio_client, bucket_name, today, dry_run=dry_run
+            )
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Roll up old leaderboard snapshots")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only log what would be archived and deleted",
+    )
+    args = parser.parse_args()
+
+    logging.info("Beginning snapshot retention...")
+    run_retention(dry_run=args.dry_run)
+    logging.info("Completed snapshot retention.")
@@ -0,0 +1,103 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pubg.config import MinioConfig
+from pubg.jobs.config import PUBGConfig
+from pubg.jobs.get_season_data import fetch_pubg_leaderboard
+from pubg.jobs.normalize import Leaderboard
+from pubg.jobs.rate_limit import TokenBucket
+from pubg.jobs.write_minio import write_leaderboard_data_minio
+
+FetchFn = Callable[..., Leaderboard]
+WriteFn = Callable[..., Optional[bool]]
+
+
+def run_job(
+    servers: Optional[List[str]] = None,
+    game_modes: Optional[List[str]] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    fetch_workers: int = PUBGConfig.FETCH_WORKERS,
+    upload_workers: int = PUBGConfig.UPLOAD_WORKERS,
+    fetch: FetchFn = fetch_pubg_leaderboard,
+    write: WriteFn = write_leaderboard_data_minio,
+) -> Dict[Tuple[str, str], str]:
+    """
+    Fetches every server/game mode leaderboard concurrently and uploads each to MinIO.
+
+    Fetches share one token bucket, so they run as fast as the API quota allows.
+    Uploads run on their own pool, overlapping with the fetches still in progress.
+
+    Args:
+        servers (List[str], optional): Servers to fetch. Defaults to PUBGConfig.SERVERS.
+        game_modes (List[str], optional): Game modes to fetch. Defaults to PUBGConfig.GAME_MODE.
+        rate_limiter (TokenBucket, optional): Request budget. Defaults to the configured PUBG limit.
+        fetch_workers (int): Leaderboards fetched at once.
+        upload_workers (int): MinIO uploads in flight at once.
+        fetch (FetchFn): Fetches one leaderboard, called with server, game_mode and rate_limiter.
+        write (WriteFn): Uploads one leaderboard, called with bucket_name and data.
+
+    Returns:
+        Dict[Tuple[str, str], str]: "written", "unchanged", "inactive" or the error for each (server, game_mode).
+    """
+    servers = servers or PUBGConfig.SERVERS
+    game_modes = game_modes or PUBGConfig.GAME_MODE
+    if rate_limiter is None:
+        rate_limiter = TokenBucket(
+            capacity=PUBGConfig.RATE_LIMIT_REQUESTS, period=PUBGConfig.RATE_LIMIT_PERIOD
+        )
+
+    results: Dict[Tuple[str, str], str] = {}
+    start = time.perf_counter()
+
+    def fetch_one(server: str, game_mode: str) -> Leaderboard:
+        logging.info(f"Beginning fetch for {server} in game mode {game_mode}")
+        return fetch(server=server, game_mode=game_mode, rate_limiter=rate_limiter)
+
+    def write_one(server: str, game_mode: str, data: Leaderboard) -> Optional[bool]:
+        bucket_name = f"{MinioConfig.BUCKET_BASE_NAME}-{server}-{game_mode}"
+        logging.info(f"Beginning write for {bucket_name}")
+        written = write(bucket_name=bucket_name, data=data)
+        logging.info(f"Job completed for {bucket_name}")
+        return written
+
+    with ThreadPoolExecutor(
+        fetch_workers, thread_name_prefix="fetch"
+    ) as fetch_pool, ThreadPoolExecutor(
+        upload_workers, thread_name_prefix="upload"
+    ) as upload_pool:
+        fetches: Dict[Future, Tuple[str, str]] = {
+            fetch_pool.submit(fetch_one, server, game_mode): (server, game_mode)
+            for server in servers
+            for game_mode in game_modes
+        }
+        uploads: Dict[Future, Tuple[str, str]] = {}
+
+        for future in as_completed(fetches):
+            combination = fetches[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                logging.error(f"Fetch failed for {combination}: {e}")
+                results[combination] = f"fetch failed: {e}"
+                continue
+            if not data:
+                results[combination] = "inactive"
+                continue
+            uploads[upload_pool.submit(write_one, *combination, data)] = combination
+
+        for future in as_completed(uploads):
+            combination = uploads[future]
+            try:
+                # Writers that report nothing are taken to have written
+                written = future.result()
+                results[combination] = "unchanged" if written is False else "written"
+            except Exception as e:
+                logging.error(f"Upload failed for {combination}: {e}")
+                results[combination] = f"upload failed: {e}"
+
+    logging.info(
+        f"Fetched {len(fetches)} leaderboards in {time.perf_counter() - start:.1f}s"
+    )
+    return results
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class SeasonCache:
+    """Current season ID per server, shared by every fetch in a job run.
+
+    Lookups for the same server are serialised, so concurrent game mode fetches
+    trigger a single /seasons request. Optionally persisted to a JSON file so the
+    next run can skip the lookup while the entry is younger than the TTL.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 6 * 3600) -> None:
+        """
+        Args:
+            path (str, optional): JSON file to persist seasons to. In-memory only if not set.
+            ttl (float): Maximum age in seconds of a season loaded from the file.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._seasons: Dict[str, Tuple[str, float]] = {}
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._guard = threading.Lock()
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:  # type: ignore[arg-type]
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.info(f"No usable season cache at {self.path}: {e}")
+            return
+
+        now = time.time()
+        for server, (season_id, fetched_at) in stored.items():
+            if now - fetched_at < self.ttl:
+                self._seasons[server] = (season_id, fetched_at)
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._seasons, f)
+        os.replace(tmp_path, self.path)  # type: ignore[arg-type]
+
+    def get(self, server: str, fetch: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        Returns the cached season for a server, calling `fetch` on a miss.
+
+        Args:
+            server (str): The server being evaluated.
+            fetch (Callable[[], Optional[str]]): Looks up the current season from the API.
+
+        Returns:
+            Optional[str]: The current season ID, or None if it could not be found.
+        """
+        with self._guard:
+            lock = self._locks[server]
+
+        with lock:
+            cached = self._seasons.get(server)
+            if cached is not None:
+                return cached[0]
+
+            season_id = fetch()
+            if season_id is not None:
+                with self._guard:
+                    self._seasons[server] = (season_id, time.time())
+                    if self.path:
+                        self._save()
+            return season_id
+
+    def clear(self) -> None:
+        with self._guard:
+            self._seasons.clear()
@@ -2,13 +2,37 @@ import json
 import logging
 from datetime import datetime
 from io import BytesIO
-from typing import Dict
+from typing import Optional
 
 import tenacity
 from minio import Minio
 from minio.error import S3Error
 
 from pubg.config import MinioConfig
+from pubg.jobs.normalize import Leaderboard
+from pubg.snapshot import (
+    CONTENT_HASH_METADATA_KEY,
+    content_hash,
+    encode_snapshot,
+    snapshot_extension,
+)
+
+
+def _latest_hash(minio_client: Minio, bucket_name: str) -> Optional[str]:
+    """The content hash the latest pointer records, None if there is no usable one"""
+    try:
+        response = minio_client.get_object(
+            bucket_name=bucket_name, object_name=MinioConfig.LATEST_POINTER_NAME
+        )
+    except S3Error:
+        return None
+    try:
+        return json.loads(response.read()).get("sha256")
+    except ValueError:
+        return None
+    finally:
+        response.close()
+        response.release_conn()
 
 
 @tenacity.retry(
@@ -18,9 +42,24 @@ from pubg.config import MinioConfig
     stop=tenacity.stop_after_attempt(3),  # Retry 3 times
     reraise=True,  # Reraise exceptions after retries
 )
-def write_leaderboard_data_minio(
-    bucket_name: str, data: Dict[str, Dict[str, str]]
-) -> None:
+def write_leaderboard_data_minio(bucket_name: str, data: Leaderboard) -> Optional[bool]:
+    """
+    Uploads a leaderboard snapshot and moves the bucket's latest pointer to it.
+
+    Nothing is written when the leaderboard is empty, or has the same content hash
+    as the latest snapshot, so unchanged leaderboards are not loaded again downstream.
+
+    Args:
+        bucket_name (str): The bucket for the server and game mode.
+        data (Leaderboard): Player IDs mapped to their stats.
+
+    Returns:
+        Optional[bool]: True once a new snapshot is uploaded, False when it matches the
+            latest one, None when the leaderboard is empty and there is nothing to write.
+
+    Raises:
+        S3Error: If the snapshot or pointer cannot be written, once retries run out.
+    """
 
     minio_client = Minio(
         endpoint=MinioConfig.MINIO_ENDPOINT,
@@ -32,12 +71,12 @@ def write_leaderboard_data_minio(
     # Get the current date
     current_date = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
 
-    object_name = f"data_{current_date}.json"
+    object_name = f"{MinioConfig.SNAPSHOT_PREFIX}{current_date}{snapshot_extension(MinioConfig.SNAPSHOT_FORMAT)}"
 
     # Early exit if data is blank
     if data == {}:
         logging.info("Not writing any data, data is not active")
-        return
+        return None
 
     # Make the bucket if it doesn't exist.
     found = minio_client.bucket_exists(bucket_name)
@@ -45,18 +84,45 @@ def write_leaderboard_data_minio(
         minio_client.make_bucket(bucket_name)
         logging.info(f"Created bucket {bucket_name}")
 
-    # Convert dictionary to JSON string
-    json_data = json.dumps(data).encode("utf-8")
+    digest = content_hash(data)  # type: ignore[arg-type]
+    if found and _latest_hash(minio_client, bucket_name) == digest:
+        logging.info(f"Leaderboard for {bucket_name} unchanged, not uploading")
+        return False
+
+    # Encode in the configured format, recorded in the object metadata for readers
+    body, metadata, content_type = encode_snapshot(
+        data,  # type: ignore[arg-type]
+        fmt=MinioConfig.SNAPSHOT_FORMAT,
+        compression=MinioConfig.SNAPSHOT_COMPRESSION,
+    )
+    metadata[CONTENT_HASH_METADATA_KEY] = digest
 
-    # Write JSON data to the MinIO bucket
+    # Write the snapshot to the MinIO bucket
     try:
         minio_client.put_object(
             bucket_name=bucket_name,
             object_name=object_name,
-            data=BytesIO(json_data),
-            length=len(json_data),
-            content_type="application/json",
+            data=BytesIO(body),
+            length=len(body),
+            content_type=content_type,
+            metadata=metadata,  # type: ignore[arg-type]
+        )
+        logging.info(
+            f"Snapshot ({len(body)} bytes) uploaded to {bucket_name}/{object_name} successfully."
         )
-        logging.info(f"JSON data uploaded to {bucket_name}/{object_name} successfully.")
     except S3Error as e:
-        logging.warning(f"Error: {e}")
+        # Raised so the upload is retried, and reported as failed if it never succeeds
+        logging.warning(f"Uploading {bucket_name}/{object_name} failed: {e}")
+        raise
+
+    # Only move the pointer once the snapshot itself is in place
+    pointer = json.dumps({"object_name": object_name, "sha256": digest}).encode("utf-8")
+    minio_client.put_object(
+        bucket_name=bucket_name,
+        object_name=MinioConfig.LATEST_POINTER_NAME,
+        data=BytesIO(pointer),
+        length=len(pointer),
+        content_type="application/json",
+    )
+    logging.info(f"Latest pointer for {bucket_name} now {object_name}")
+    return True
@@ -0,0 +1,418 @@
+import codecs
+import gzip
+import hashlib
+import json
+import re
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+try:  # optional dependency, gzip is always available
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Object metadata keys, MinIO stores them as x-amz-meta-<key>
+FORMAT_METADATA_KEY = "pubg-format"
+COMPRESSION_METADATA_KEY = "pubg-compression"
+CONTENT_HASH_METADATA_KEY = "pubg-content-sha256"
+
+JSON_FORMAT = "json"
+COLUMNAR_FORMAT = "columnar-v1"
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+_MAGIC = b"PUBGSNAP"
+_VERSION = 1
+_HEADER = struct.Struct("<8sHI")  # magic, version, player count
+_MISSING = -(2**31)  # int32 stand-in for a missing stat
+_FIELDS = ("rank", "wins", "games_played")
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Text before the first underscore, then a YYYY-MM-DD-HH-MM-SS timestamp (fields after
+# the year may be one digit, as strptime allowed), an optional _suffix and one of the
+# extensions snapshots are written with
+_OBJECT_NAME = re.compile(
+    r"[^_]*_(\d{4})-(\d{1,2})-(\d{1,2})-(\d{1,2})-(\d{1,2})-(\d{1,2})"
+    r"(?:_[^.]*)?\.(?:json|snap)"
+)
+
+Leaderboard = Dict[str, Dict[str, Optional[int]]]
+
+
+class SnapshotTooLarge(ValueError):
+    """Raised when a snapshot is bigger than the configured maximum size"""
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, raw: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _encode_columnar(data: Mapping[str, Mapping[str, Optional[int]]]) -> bytes:
+    """Packs player IDs followed by one int32 column per stat.
+
+    Layout: header, newline separated UTF-8 IDs, then rank, wins and games_played columns.
+    """
+    ids = "\n".join(data).encode("utf-8")
+    parts = [
+        _HEADER.pack(_MAGIC, _VERSION, len(data)),
+        struct.pack("<I", len(ids)),
+        ids,
+    ]
+    for field in _FIELDS:
+        column = array(
+            "i",
+            (
+                _MISSING if stats.get(field) is None else stats[field]
+                for stats in data.values()
+            ),
+        )
+        parts.append(_little_endian(column))
+    return b"".join(parts)
+
+
+def _decode_columnar(body: bytes) -> Leaderboard:
+    magic, version, count = _HEADER.unpack_from(body)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"Unsupported snapshot header: {magic!r} v{version}")
+
+    offset = _HEADER.size
+    (ids_length,) = struct.unpack_from("<I", body, offset)
+    offset += 4
+    ids = (
+        body[offset : offset + ids_length].decode("utf-8").split("\n") if count else []
+    )
+    offset += ids_length
+
+    columns = []
+    for _ in _FIELDS:
+        columns.append(_from_little_endian("i", body[offset : offset + 4 * count]))
+        offset += 4 * count
+
+    ranks, wins, games = columns
+    players: Leaderboard = {
+        player_id: {"rank": rank, "wins": win, "games_played": played}
+        for player_id, rank, win, played in zip(ids, ranks, wins, games)
+    }
+    if count and min(min(column) for column in columns) == _MISSING:
+        for stats in players.values():
+            for field, value in stats.items():
+                if value == _MISSING:
+                    stats[field] = None
+    return players
+
+
+def _compress(body: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        return zstandard.ZstdCompressor().compress(body)
+    return body
+
+
+def _decompress(body: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(body)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compressed snapshot requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
+
+
+def encode_snapshot(
+    data: Mapping[str, Mapping[str, Optional[int]]],
+    fmt: str = JSON_FORMAT,
+    compression: str = "none",
+) -> Tuple[bytes, Dict[str, str], str]:
+    """Encodes a leaderboard for upload.
+
+    Args:
+        data (Mapping): Player IDs mapped to their rank, wins and games_played.
+        fmt (str): JSON_FORMAT or COLUMNAR_FORMAT.
+        compression (str): One of COMPRESSIONS.
+
+    Returns:
+        Tuple[bytes, Dict[str, str], str]: The body, the object metadata describing it, and its content type.
+
+    Raises:
+        ValueError: If the format or compression is not supported.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression}")
+
+    if fmt == JSON_FORMAT:
+        body = json.dumps(data).encode("utf-8")
+        content_type = "application/json"
+    elif fmt == COLUMNAR_FORMAT:
+        body = _encode_columnar(data)
+        content_type = "application/octet-stream"
+    else:
+        raise ValueError(f"Unknown snapshot format {fmt}")
+
+    metadata = {FORMAT_METADATA_KEY: fmt, COMPRESSION_METADATA_KEY: compression}
+    return _compress(body, compression), metadata, content_type
+
+
+def content_hash(data: Mapping[str, Mapping[str, Optional[int]]]) -> str:
+    """Hashes a leaderboard's players and stats, whatever format it is stored in.
+
+    Args:
+        data (Mapping): Player IDs mapped to their rank, wins and games_played.
+
+    Returns:
+        str: The hex SHA-256 of the canonical JSON of `data`.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def snapshot_metadata(headers: Mapping[str, str]) -> Tuple[str, str]:
+    """Reads the format and compression from object headers.
+
+    Objects written before the metadata existed are plain JSON.
+    """
+    fmt = headers.get(f"x-amz-meta-{FORMAT_METADATA_KEY}", JSON_FORMAT)
+    compression = headers.get(f"x-amz-meta-{COMPRESSION_METADATA_KEY}", "none")
+    return fmt, compression
+
+
+def decode_snapshot(body: bytes, headers: Mapping[str, str]) -> Leaderboard:
+    """Decodes a downloaded snapshot using the format recorded in its headers.
+
+    Args:
+        body (bytes): The raw object body.
+        headers (Mapping[str, str]): The object's response headers.
+
+    Returns:
+        Leaderboard: Player IDs mapped to their rank, wins and games_played.
+
+    Raises:
+        ValueError: If the format or compression is not supported.
+    """
+    fmt, compression = snapshot_metadata(headers)
+    body = _decompress(body, compression)
+
+    if fmt == JSON_FORMAT:
+        return json.loads(body.decode("utf-8"))
+    if fmt == COLUMNAR_FORMAT:
+        return _decode_columnar(body)
+    raise ValueError(f"Unknown snapshot format {fmt}")
+
+
+def _decompressed(chunks: Iterable[bytes], compression: str) -> Iterator[bytes]:
+    if compression == "none":
+        yield from chunks
+        return
+    if compression == "gzip":
+        decompressor: Any = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compressed snapshot requires the zstandard package")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        raise ValueError(f"Unknown compression {compression}")
+
+    for chunk in chunks:
+        yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
+def _bounded(chunks: Iterable[bytes], max_size: int | None) -> Iterator[bytes]:
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise SnapshotTooLarge(f"Snapshot is larger than {max_size} bytes")
+        yield chunk
+
+
+class _JsonStream:
+    """Reads JSON values from a byte stream, holding only the undecoded tail of a chunk"""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._uncut_until = 0
+
+    def _more(self) -> bool:
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            decoded = self._text.decode(b"", final=True)
+        else:
+            decoded = self._text.decode(chunk)
+        self._uncut_until = max(0, self._uncut_until - self._pos)
+        self._buffer = self._buffer[self._pos :] + decoded
+        self._pos = 0
+        return True
+
+    def complete_entries(self) -> Dict[str, Any] | None:
+        """Parses every entry up to the last "}," in the buffer in one go.
+
+        A cut that lands inside a string or a nested value leaves unbalanced JSON and
+        fails to parse, in which case None is returned and that cut is not tried again.
+        """
+        cut = self._buffer.rfind("},", max(self._pos, self._uncut_until))
+        if cut <= self._pos:
+            return None
+        try:
+            entries = json.loads("{" + self._buffer[self._pos : cut + 1] + "}")
+        except json.JSONDecodeError:
+            self._uncut_until = cut + 1
+            return None
+        self._pos = cut + 2
+        return entries
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character, or "" at the end."""
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._more():
+                return ""
+
+    def expect(self, character: str, description: str) -> None:
+        if self.peek() != character:
+            raise ValueError(f"Expected {description} in snapshot")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                parsed, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number at the end of the buffer may carry on into the next chunk
+            if end == len(self._buffer) and self._more():
+                continue
+            self._pos = end
+            return parsed
+
+
+def _iter_json_players(
+    chunks: Iterable[bytes],
+) -> Iterator[Tuple[str, Dict[str, Optional[int]]]]:
+    """Parses a JSON object of players a buffer at a time.
+
+    Memory stays flat however many players the snapshot has. Every complete entry in
+    the buffer is parsed with a single json.loads, falling back to one entry at a time
+    where the buffer cannot be cut cleanly, e.g. at the end of a chunk.
+    """
+    stream = _JsonStream(chunks)
+    stream.expect("{", "a JSON object")
+    if stream.peek() == "}":
+        return
+
+    while True:
+        entries = stream.complete_entries()
+        if entries:
+            yield from entries.items()
+            continue
+
+        if stream.peek() != '"':
+            raise ValueError("Expected a player ID in snapshot")
+        player_id = stream.value()
+        stream.expect(":", "':'")
+        yield player_id, stream.value()
+
+        if stream.peek() == "}":
+            return
+        stream.expect(",", "',' or '}'")
+
+
+def iter_snapshot(
+    chunks: Iterable[bytes],
+    headers: Mapping[str, str],
+    batch_size: int = 5000,
+    max_size: int | None = None,
+) -> Iterator[Leaderboard]:
+    """Decodes a snapshot as it is downloaded, in batches of players.
+
+    JSON snapshots are parsed incrementally, so neither the whole body nor the whole
+    leaderboard is ever held in memory. Columnar snapshots keep their stats after every
+    ID, so they are decoded whole, they are a fraction of the size of the JSON.
+
+    Args:
+        chunks (Iterable[bytes]): The raw object body, in pieces.
+        headers (Mapping[str, str]): The object's response headers.
+        batch_size (int): The number of players in each batch yielded.
+        max_size (int, optional): The largest body accepted, compressed or not.
+
+    Yields:
+        Leaderboard: Up to batch_size players, in snapshot order.
+
+    Raises:
+        SnapshotTooLarge: If the body goes over max_size.
+        ValueError: If the format or compression is not supported, or the body is malformed.
+    """
+    fmt, compression = snapshot_metadata(headers)
+    body = _bounded(_decompressed(_bounded(chunks, max_size), compression), max_size)
+
+    if fmt == JSON_FORMAT:
+        players: Iterator[Tuple[str, Dict[str, Optional[int]]]] = _iter_json_players(
+            body
+        )
+    elif fmt == COLUMNAR_FORMAT:
+        players = iter(_decode_columnar(b"".join(body)).items())
+    else:
+        raise ValueError(f"Unknown snapshot format {fmt}")
+
+    batch: Leaderboard = {}
+    for player_id, stats in players:
+        batch[player_id] = stats
+        if len(batch) >= batch_size:
+            yield batch
+            batch = {}
+    if batch:
+        yield batch
+
+
+def snapshot_extension(fmt: str) -> str:
+    return ".json" if fmt == JSON_FORMAT else ".snap"
+
+
+def snapshot_timestamp(v: str) -> datetime:
+    """Reads the time a snapshot was taken from its object name.
+
+    Raises:
+        ValueError: If the name does not contain a valid timestamp.
+    """
+    match = _OBJECT_NAME.fullmatch(v)
+    if match is None:
+        raise ValueError(
+            f"Invalid object_name format: {v}. Files will contain a datetime"
+        )
+    try:
+        # The pattern only checks the shape, the constructor rejects e.g. month 13
+        return datetime(*map(int, match.groups()))
+    except ValueError:
+        raise ValueError(
+            f"Invalid object_name format: {v}. The datetime part must be in the format YYYY-MM-DD_HH-MM-SS"
+        )
@@ -1,6 +1,14 @@
+import json
+import math
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
+from redis.crc import key_slot
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ResponseError
 
 
 # Fixture to patch environment variable
@@ -12,3 +20,301 @@ def patch_env_variable():
 
     # Yield to test
     yield
+
+
+def _bound(value) -> tuple[float, bool]:
+    """A ZRANGEBYSCORE style bound as (score, exclusive)"""
+    if isinstance(value, str) and value.startswith("("):
+        return float(value[1:]), True
+    return float(value), False
+
+
+def _in_range(score, start, end) -> bool:
+    (low, low_open), (high, high_open) = _bound(start), _bound(end)
+    above = score > low if low_open else score >= low
+    below = score < high if high_open else score <= high
+    return above and below
+
+
+class FakePipeline:
+    """Queues commands and runs them against the FakeRedis on execute"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def mset(self, mapping):
+        # Multi-key commands must stay on one cluster slot
+        assert len({key_slot(key.encode()) for key in mapping}) == 1
+        self.commands.append(lambda: self.redis.store.update(mapping))
+        return self
+
+    def delete(self, *keys):
+        self.commands.append(lambda: self.redis._delete(*keys))
+        return self
+
+    def hset(self, key, mapping):
+        self.commands.append(lambda: self.redis._hset(key, mapping))
+        return self
+
+    def mget(self, keys):
+        assert len({key_slot(key.encode()) for key in keys}) == 1
+        self.commands.append(
+            lambda: [self.redis._get(key, strict=False) for key in keys]
+        )
+        return self
+
+    def hgetall(self, key):
+        self.commands.append(lambda: self.redis._hgetall(key))
+        return self
+
+    def hget(self, key, field):
+        self.commands.append(lambda: self.redis._hgetall(key).get(field.encode()))
+        return self
+
+    def hmget(self, key, fields):
+        self.commands.append(lambda: self.redis._hmget(key, fields))
+        return self
+
+    def sadd(self, key, *members):
+        self.commands.append(
+            lambda: self.redis.sets.setdefault(key, set()).update(members)
+        )
+        return self
+
+    def srem(self, key, *members):
+        self.commands.append(
+            lambda: self.redis.sets.get(key, set()).difference_update(members)
+        )
+        return self
+
+    def zadd(self, key, mapping):
+        self.commands.append(
+            lambda: self.redis.zsets.setdefault(key, {}).update(mapping)
+        )
+        return self
+
+    def zremrangebyscore(self, key, start, end):
+        self.commands.append(lambda: self.redis._zremrangebyscore(key, start, end))
+        return self
+
+    def expire(self, key, seconds):
+        self.commands.append(lambda: self.redis.expiring.__setitem__(key, seconds))
+        return self
+
+    async def execute(self, raise_on_error=True):
+        self.redis.executions += 1
+        if self.redis.failures:
+            self.redis.failures -= 1
+            raise RedisConnectionError("dropped")
+        replies = []
+        for command in self.commands:
+            try:
+                replies.append(command())
+            except ResponseError as e:
+                if raise_on_error:
+                    raise
+                replies.append(e)
+        return replies
+
+
+class FakeRedis:
+    """Just enough of the cluster client for the tests.
+
+    Strings are stored as str and hashes as dict in `store`, sets and sorted sets (dicts
+    of member to score) in `sets` and `zsets`. `expiring` maps keys to their TTL, and
+    the first `failures` pipelines fail with a dropped connection.
+    """
+
+    def __init__(self, failures=0):
+        self.store = {}
+        self.sets = {}
+        self.zsets = {}
+        self.expiring = {}
+        self.executions = 0
+        self.failures = failures
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def _typed(self, key, kind):
+        value = self.store.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise ResponseError(
+                "WRONGTYPE Operation against a key holding the wrong kind"
+            )
+        return value
+
+    def _get(self, key, strict=True):
+        if not strict and isinstance(self.store.get(key), dict):
+            return None  # MGET returns nil for keys of another type
+        value = self._typed(key, str)
+        return value.encode() if value is not None else None
+
+    def _hgetall(self, key):
+        value = self._typed(key, dict) or {}
+        return {field.encode(): str(stat).encode() for field, stat in value.items()}
+
+    def _hset(self, key, mapping):
+        value = self._typed(key, dict)
+        if value is None:
+            value = self.store[key] = {}
+        value.update(mapping)
+        return len(mapping)
+
+    def _hmget(self, key, fields):
+        values = self._hgetall(key)
+        return [values.get(field.encode()) for field in fields]
+
+    def _delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            for kind in (self.store, self.sets, self.zsets):
+                deleted += kind.pop(key, None) is not None
+        return deleted
+
+    def _ordered(self, key):
+        return sorted(
+            self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0])
+        )
+
+    def _zremrangebyscore(self, key, start, end):
+        zset = self.zsets.get(key, {})
+        removed = [m for m, score in zset.items() if _in_range(score, start, end)]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+    async def get(self, key):
+        return self._get(key)
+
+    async def set(self, key, value, nx=False, ex=None, get=False):
+        previous = self._get(key)
+        if nx and previous is not None:
+            return None
+        self.store[key] = str(value)
+        if ex is not None:
+            self.expiring[key] = ex
+        return previous if get else True
+
+    async def delete(self, *keys):
+        return self._delete(*keys)
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    async def hgetall(self, key):
+        return self._hgetall(key)
+
+    async def hmget(self, key, fields):
+        return self._hmget(key, fields)
+
+    async def sscan_iter(self, key, count=None):
+        for member in self.sets.get(key, ()):
+            yield member.encode()
+
+    async def zrange(self, key, start, end, byscore=False, withscores=False):
+        ordered = self._ordered(key)
+        if byscore:
+            members = [item for item in ordered if _in_range(item[1], start, end)]
+        else:
+            members = ordered[start : end + 1 if end != -1 else None]
+        if withscores:
+            return [(member.encode(), float(score)) for member, score in members]
+        return [member.encode() for member, _ in members]
+
+    async def zrank(self, key, member):
+        members = [m for m, _ in self._ordered(key)]
+        return members.index(member) if member in members else None
+
+
+class PUBGStub:
+    """Local stand-in for the PUBG API that enforces a fixed-window rate limit.
+
+    Requests over the limit get a 429, mirroring the real API's X-Ratelimit-* headers.
+    """
+
+    def __init__(self, limit: int, window: float, latency: float = 0.0) -> None:
+        self.limit = limit
+        self.window = window
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.window_count = 0
+        self.requests: list[str] = []
+        self.rejected = 0
+
+    def admit(self) -> tuple[bool, dict[str, str]]:
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.window:
+                elapsed_windows = int((now - self.window_start) // self.window)
+                self.window_start += elapsed_windows * self.window
+                self.window_count = 0
+            reset = self.window_start + self.window
+            allowed = self.window_count < self.limit
+            if allowed:
+                self.window_count += 1
+            else:
+                self.rejected += 1
+            headers = {
+                "X-Ratelimit-Limit": str(self.limit),
+                "X-Ratelimit-Remaining": str(self.limit - self.window_count),
+                "X-Ratelimit-Reset": f"{reset:.3f}",
+            }
+            if not allowed:
+                headers["Retry-After"] = str(math.ceil(reset - now))
+            return allowed, headers
+
+    def respond(self, path: str) -> dict:
+        self.requests.append(path)
+        parts = path.strip("/").split("/")
+        if parts[-1] == "seasons":
+            return {
+                "data": [
+                    {"id": "season-old", "attributes": {"isCurrentSeason": False}},
+                    {"id": "season-cur", "attributes": {"isCurrentSeason": True}},
+                ]
+            }
+        return {
+            "included": [
+                {
+                    "id": f"account.{parts[0]}.{i}",
+                    "attributes": {
+                        "rank": i + 1,
+                        "stats": {"wins": i, "games": 10 * i},
+                    },
+                }
+                for i in range(500)
+            ]
+        }
+
+
+@pytest.fixture
+def pubg_stub():
+    """Starts a PUBGStub on a free local port, configure it before sending requests."""
+    stub = PUBGStub(limit=1000, window=1.0)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(stub.latency)
+            allowed, headers = stub.admit()
+            body = json.dumps(stub.respond(self.path) if allowed else {}).encode()
+            self.send_response(200 if allowed else 429)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{server.server_port}"
+    yield stub
+    server.shutdown()
+    server.server_close()
@@ -1,7 +1,12 @@
 import pytest
+from fastapi.testclient import TestClient
 from pydantic import ValidationError
 
+from pubg import snapshot
+from pubg.api import models, router
+from pubg.api.main import app
 from pubg.api.models import (
+    BatchUserDataRequest,
     GameModeRequest,
     UserDataRequest,
     UserDataResponse,
@@ -13,12 +18,23 @@ from pubg.api.models import (
     "object_name, expected_valid",
     [
         ("data_2022-03-25-12-30-45.json", True),
+        ("data_2022-03-25-12-30-45.snap", True),  # Columnar snapshot
         (
             "2022-03-25-12-30-45_data.json",
             False,
         ),  # Invalid case with datetime part elsewhere
         ("2022-03-25-12-30-45", False),  # Data needs to be part of the name
         ("invalid_format", False),  # Invalid case with no datetime part
+        ("data_2022-13-25-12-30-45.json", False),  # Month out of range
+        ("data_2022-02-30-12-30-45.json", False),  # Day out of range
+        ("data_2022-03-25-12-30-45x.json", False),  # Trailing text after the datetime
+        ("data_2022-03-25-12-30-45_v2.json", True),  # Suffix after another underscore
+        ("data_2022-3-5-1-2-3.json", True),  # Single-digit fields, as strptime allowed
+        ("data_2022-03-25-12-30-45.txt", False),  # Not a snapshot extension
+        ("data_2022-03-25-12-30-45.json.bak", False),  # Extension after the extension
+        ("data_2022-03-25-12-30-45.", False),  # Trailing dot without an extension
+        ("data_2022-03-25-12-30-45", False),  # No extension
+        ("data_22-03-25-12-30-45.json", False),  # Two-digit year
     ],
 )
 def test_object_name_validation(object_name, expected_valid) -> None:
@@ -112,3 +128,87 @@ def test_game_mode_req() -> None:
 
     with pytest.raises(ValidationError):
         GameModeRequest(server="kakao", game_mode="abc")
+
+
+def test_batch_user_ids() -> None:
+
+    request = BatchUserDataRequest(user_ids=["account.a", "account.b", "account.a"])
+    assert request.user_ids == ["account.a", "account.b"]
+
+    with pytest.raises(ValidationError):
+        BatchUserDataRequest(user_ids=["account.a", "user123"])
+
+    with pytest.raises(ValidationError):
+        BatchUserDataRequest(user_ids=[])
+
+    with pytest.raises(ValidationError):
+        BatchUserDataRequest(user_ids=[f"account.{i}" for i in range(101)])
+
+
+class Counting:
+    """Wraps a lookup set or compiled pattern and counts how often it is checked."""
+
+    def __init__(self, wrapped) -> None:
+        self.wrapped = wrapped
+        self.calls = 0
+
+    def __contains__(self, value) -> bool:
+        self.calls += 1
+        return value in self.wrapped
+
+    def fullmatch(self, value):
+        self.calls += 1
+        return self.wrapped.fullmatch(value)
+
+
+@pytest.fixture
+def checks(monkeypatch) -> dict:
+    modules = {"_SERVERS": models, "_GAME_MODES": models, "_OBJECT_NAME": snapshot}
+    counters = {
+        name: Counting(getattr(module, name)) for name, module in modules.items()
+    }
+    for name, counter in counters.items():
+        monkeypatch.setattr(modules[name], name, counter)
+    return counters
+
+
+def test_write_redis_data_validates_once(monkeypatch, checks) -> None:
+    loaded = []
+
+    async def fake_load(server, game_mode, object_name):
+        loaded.append((server, game_mode, object_name))
+        return 1
+
+    monkeypatch.setattr(router, "load_snapshot", fake_load)
+
+    response = TestClient(app).post(
+        "/write_redis_data",
+        json={
+            "object_name": "data_2022-03-25-12-30-45.json",
+            "server": "kakao",
+            "game_mode": "squad-fpp",
+        },
+    )
+
+    assert response.status_code == 200
+    assert loaded == [("kakao", "squad-fpp", "data_2022-03-25-12-30-45.json")]
+    assert {name: counter.calls for name, counter in checks.items()} == {
+        "_SERVERS": 1,
+        "_GAME_MODES": 1,
+        "_OBJECT_NAME": 1,
+    }
+
+
+def test_most_recent_data_validates_once(monkeypatch, checks) -> None:
+    async def fake_recent(game_mode, server):
+        return "data_2022-03-25-12-30-45.json"
+
+    monkeypatch.setattr(router, "get_minio_recent", fake_recent)
+
+    response = TestClient(app).request(
+        "GET", "/most_recent_data", json={"server": "xbox", "game_mode": "squad"}
+    )
+
+    assert response.status_code == 200
+    assert checks["_SERVERS"].calls == 1
+    assert checks["_GAME_MODES"].calls == 1
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from pubg.api import minio_cache, redis_cache
+from pubg.api.main import app
+
+SLOW_BACKEND_SECONDS = 1.0
+
+
+class SlowResponse:
+    def read(self):
+        return json.dumps({"object_name": "data_2024-01-01-00-00-00.json"}).encode()
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class SlowMinio:
+    """Blocking MinIO stand-in whose reads take a long time"""
+
+    def get_object(self, bucket_name, object_name):
+        time.sleep(SLOW_BACKEND_SECONDS)
+        return SlowResponse()
+
+
+class FastRedis:
+    """Async Redis stand-in that answers immediately"""
+
+    async def get(self, key):
+        if key == redis_cache.GENERATION_POINTER_KEY:
+            return None
+        return json.dumps({"rank": 1, "wins": 10, "games_played": 100}).encode()
+
+
+@pytest.fixture
+def slow_minio_fast_redis(monkeypatch):
+    monkeypatch.setattr(minio_cache, "get_minio_client", lambda: SlowMinio())
+    monkeypatch.setattr(redis_cache, "get_redis_client", lambda: FastRedis())
+    redis_cache.invalidate_user_cache()
+    minio_cache.invalidate_recent_cache()
+    yield
+    redis_cache.invalidate_user_cache()
+
+
+def test_slow_backend_does_not_block_other_requests(slow_minio_fast_redis) -> None:
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            slow = asyncio.create_task(
+                client.request(
+                    "GET",
+                    "/most_recent_data",
+                    json={"server": "steam", "game_mode": "squad-fpp"},
+                )
+            )
+            await asyncio.sleep(0.1)  # let the slow listing start
+
+            start = time.perf_counter()
+            health = await client.get("/healthcheck")
+            user = await client.get("/get_user_data/account.abc123")
+            elapsed = time.perf_counter() - start
+
+            assert not slow.done()
+            slow_response = await slow
+            assert slow_response.status_code == 200
+            assert slow_response.json() == "data_2024-01-01-00-00-00.json"
+            return health, user, elapsed
+
+    health, user, elapsed = asyncio.run(run())
+
+    assert health.status_code == 200
+    assert user.status_code == 200
+    assert user.json() == {
+        "user_id": "account.abc123",
+        "rank": 1,
+        "wins": 10,
+        "games_played": 100,
+    }
+    assert elapsed < SLOW_BACKEND_SECONDS / 2
+
+
+class RefreshFakes:
+    """Stand-ins for MinIO and Redis under /refresh_all_data, recording swaps"""
+
+    def __init__(self) -> None:
+        self.failing_server = "psn"
+        self.events: list[tuple] = []
+
+    async def recent(self, server, game_mode):
+        await asyncio.sleep(0.01)
+        return None if server == "stadia" else "data_2024-01-01-00-00-00.json"
+
+    async def stream(self, game_mode, file_name, server):
+        yield {
+            f"account.{server}.{game_mode}": {"rank": 1, "wins": 1, "games_played": 1}
+        }
+
+    async def write(self, data, generation):
+        from redis.exceptions import ConnectionError as RedisConnectionError
+
+        if any(f".{self.failing_server}." in key for key in data):
+            raise RedisConnectionError("503")
+        return len(data)
+
+    async def index(self, *args):
+        return 1
+
+    async def activate_index(self, server, game_mode, version):
+        self.events.append(("index activated", server, game_mode))
+
+    async def discard_index(self, server, game_mode, version):
+        self.events.append(("index discarded", server, game_mode))
+
+    async def begin(self):
+        return 7
+
+    async def activate(self, generation):
+        self.events.append(("activated", generation))
+
+    async def expire(self, generation):
+        self.events.append(("expired", generation))
+
+
+@pytest.fixture
+def refresh_fakes(monkeypatch):
+    from pubg.api import router
+
+    fakes = RefreshFakes()
+    monkeypatch.setattr(router, "get_minio_recent", fakes.recent)
+    monkeypatch.setattr(router, "stream_minio_data", fakes.stream)
+    monkeypatch.setattr(router, "write_redis", fakes.write)
+    monkeypatch.setattr(router, "begin_leaderboard_version", fakes.index)
+    monkeypatch.setattr(router, "add_to_leaderboard_version", fakes.index)
+    monkeypatch.setattr(router, "activate_leaderboard_version", fakes.activate_index)
+    monkeypatch.setattr(router, "discard_leaderboard_version", fakes.discard_index)
+    monkeypatch.setattr(router, "begin_generation", fakes.begin)
+    monkeypatch.setattr(router, "activate_generation", fakes.activate)
+    monkeypatch.setattr(router, "expire_generation", fakes.expire)
+    return fakes
+
+
+def test_refresh_isolates_failed_combinations(refresh_fakes) -> None:
+    from fastapi.testclient import TestClient
+
+    response = TestClient(app).post("/refresh_all_data")
+
+    assert response.status_code == 200
+    statuses = {(r["server"], r["game_mode"]): r for r in response.json()}
+    assert len(statuses) == 15
+    assert statuses[("psn", "solo")]["status"] == "failed"
+    assert statuses[("stadia", "solo")]["status"] == "skipped"
+    # Loaded, but never served since the generation was not activated
+    assert statuses[("steam", "solo")]["status"] == "abandoned"
+    assert statuses[("steam", "solo")]["keys_written"] == 1
+    assert statuses[("steam", "solo")]["file_name"] == "data_2024-01-01-00-00-00.json"
+    # One failure keeps readers on the current generation and rank indexes, the
+    # failed loads dropping their own staged index
+    events = refresh_fakes.events
+    assert ("expired", 7) in events
+    assert sorted(e for e in events if e[0] != "expired") == sorted(
+        ("index discarded", server, game_mode)
+        for server in ("kakao", "psn", "steam", "xbox")
+        for game_mode in ("squad-fpp", "solo", "squad")
+    )
+
+
+def test_refresh_activates_indexes_with_generation(refresh_fakes) -> None:
+    from fastapi.testclient import TestClient
+
+    refresh_fakes.failing_server = None
+
+    response = TestClient(app).post("/refresh_all_data")
+
+    assert {r["status"] for r in response.json()} == {"refreshed", "skipped"}
+    assert refresh_fakes.events[0] == ("activated", 7)
+    # Rank indexes only switch over once the players they list are live
+    assert sorted(refresh_fakes.events[1:]) == sorted(
+        ("index activated", server, game_mode)
+        for server in ("kakao", "psn", "steam", "xbox")
+        for game_mode in ("squad-fpp", "solo", "squad")
+    )
+
+
+def test_minio_error_blocks_generation(monkeypatch, refresh_fakes) -> None:
+    from fastapi.testclient import TestClient
+    from minio.error import S3Error
+
+    from pubg.api import router
+
+    def read_pointer(bucket_name, object_name):
+        code = {
+            "pubg-leaderboard-bucket-stadia-solo": "NoSuchBucket",
+            "pubg-leaderboard-bucket-xbox-solo": "InternalError",
+        }.get(bucket_name)
+        if code is not None:
+            raise S3Error(
+                code=code,
+                message=code,
+                resource=bucket_name,
+                request_id=None,
+                host_id=None,
+                response=None,
+            )
+        return json.dumps({"object_name": "data_2024-01-01-00-00-00.json"}).encode()
+
+    refresh_fakes.failing_server = None
+    monkeypatch.setattr(router, "get_minio_recent", minio_cache.get_minio_recent)
+    monkeypatch.setattr(minio_cache, "_read_object", read_pointer)
+    minio_cache.invalidate_recent_cache()
+
+    response = TestClient(app).post("/refresh_all_data")
+    minio_cache.invalidate_recent_cache()
+
+    statuses = {(r["server"], r["game_mode"]): r for r in response.json()}
+    # A bucket that does not exist has nothing to load, an unreadable one is a failure
+    assert statuses[("stadia", "solo")]["status"] == "skipped"
+    assert statuses[("xbox", "solo")]["status"] == "failed"
+    assert statuses[("xbox", "solo")]["detail"] == "MinIO error: InternalError"
+    assert statuses[("steam", "solo")]["status"] == "abandoned"
+    assert ("expired", 7) in refresh_fakes.events
+    assert ("activated", 7) not in refresh_fakes.events
+
+
+def test_failed_stream_discards_staged_version(monkeypatch) -> None:
+    from minio.error import S3Error
+
+    from pubg.api import router
+
+    async def broken_stream(game_mode, file_name, server):
+        yield {"account.1": {"rank": 1, "wins": 1, "games_played": 1}}
+        raise S3Error(
+            code="InternalError",
+            message="connection reset",
+            resource=file_name,
+            request_id=None,
+            host_id=None,
+            response=None,
+        )
+
+    async def fake_write(data, generation):
+        return len(data)
+
+    async def fake_begin(server, game_mode):
+        return 3
+
+    async def fake_add(*args):
+        pass
+
+    calls = []
+
+    async def fake_activate(server, game_mode, version):
+        calls.append(("activated", version))
+
+    async def fake_discard(server, game_mode, version):
+        calls.append(("discarded", version))
+
+    monkeypatch.setattr(router, "stream_minio_data", broken_stream)
+    monkeypatch.setattr(router, "write_redis", fake_write)
+    monkeypatch.setattr(router, "begin_leaderboard_version", fake_begin)
+    monkeypatch.setattr(router, "add_to_leaderboard_version", fake_add)
+    monkeypatch.setattr(router, "activate_leaderboard_version", fake_activate)
+    monkeypatch.setattr(router, "discard_leaderboard_version", fake_discard)
+
+    with pytest.raises(S3Error):
+        asyncio.run(router._stream_into_redis("steam", "solo", "data.json", 1))
+
+    assert calls == [("discarded", 3)]
+
+
+class StreamingResponse:
+    def __init__(self, body):
+        self.body = body
+        self.headers = {"Content-Length": str(len(body))}
+        self.released = False
+
+    def stream(self, amt):
+        for i in range(0, len(self.body), amt):
+            yield self.body[i : i + amt]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        self.released = True
+
+
+def test_abandoned_stream_releases_connection(monkeypatch) -> None:
+    players = {
+        f"account.{i}": {"rank": i, "wins": 0, "games_played": 0} for i in range(50)
+    }
+    response = StreamingResponse(json.dumps(players).encode())
+
+    class StreamingMinio:
+        def get_object(self, bucket_name, object_name):
+            return response
+
+    monkeypatch.setattr(minio_cache, "get_minio_client", lambda: StreamingMinio())
+
+    async def first_batch():
+        batches = minio_cache.stream_minio_data(
+            "solo", "data.json", "steam", batch_size=10
+        )
+        batch = await anext(batches)
+        await batches.aclose()
+        return batch
+
+    assert len(asyncio.run(first_batch())) == 10
+    assert response.released
+
+
+def test_oversized_snapshot_rejected_before_download(monkeypatch) -> None:
+    response = StreamingResponse(b"{}")
+    response.headers["Content-Length"] = str(10**12)
+
+    class StreamingMinio:
+        def get_object(self, bucket_name, object_name):
+            return response
+
+    monkeypatch.setattr(minio_cache, "get_minio_client", lambda: StreamingMinio())
+
+    with pytest.raises(minio_cache.SnapshotTooLarge):
+        asyncio.run(minio_cache.get_minio_data("solo", "data.json", "steam"))
+    assert response.released
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from redis.asyncio.cluster import RedisCluster
+
+from pubg.api import invalidation, minio_cache, redis_cache
+from pubg.api.cache import LocalCache, StaleWhileRevalidateCache
+
+
+def _metric(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_negative_results_expire_sooner() -> None:
+    cache = LocalCache("test-negative", maxsize=10, ttl=60, negative_ttl=0.05)
+    cache.store("found", {"rank": 1}, cache.generation)
+    cache.store("missing", None, cache.generation)
+
+    assert cache.lookup("missing") == (True, None)
+    time.sleep(0.1)
+
+    assert cache.lookup("missing") == (False, None)
+    assert cache.lookup("found") == (True, {"rank": 1})
+
+
+def test_invalidate_drops_entries_and_in_flight_loads() -> None:
+    cache = LocalCache("test-invalidate", maxsize=10, ttl=60, negative_ttl=60)
+    cache.store("a", 1, cache.generation)
+    in_flight_generation = cache.generation
+
+    cache.invalidate()
+    cache.store("b", 2, in_flight_generation)
+
+    assert cache.lookup("a") == (False, None)
+    assert cache.lookup("b") == (False, None)
+
+
+def test_lru_bound_and_metrics() -> None:
+    cache = LocalCache("test-lru", maxsize=2, ttl=60, negative_ttl=60)
+    for key in "abc":
+        cache.store(key, key, cache.generation)
+
+    assert len(cache) == 2
+    assert cache.lookup("a") == (False, None)
+    assert cache.lookup("c") == (True, "c")
+    assert _metric("pubg_cache_evictions_total", cache="test-lru", reason="size") == 1
+    assert _metric("pubg_cache_lookups_total", cache="test-lru", result="hit") == 1
+    assert _metric("pubg_cache_lookups_total", cache="test-lru", result="miss") == 1
+
+
+def test_update_event_evicts_only_listed_players(monkeypatch) -> None:
+    published = []
+
+    async def execute_command(*args, target_nodes=None):
+        command, channel, message = args
+        assert command == "PUBLISH"
+        assert target_nodes == RedisCluster.RANDOM
+        published.append(json.loads(message))
+
+    # The real cluster client, which never connects as only its raw command is faked
+    client = RedisCluster(host="localhost", port=6379)
+    monkeypatch.setattr(client, "execute_command", execute_command)
+    monkeypatch.setattr(invalidation, "get_redis_client", lambda: client)
+    cache = redis_cache.user_cache
+    cache.invalidate()
+    for user_id in ("account.a", "account.b"):
+        cache.store(user_id, {"rank": 1}, cache.generation)
+
+    asyncio.run(invalidation.publish_leaderboard_update("steam", "solo", ["account.a"]))
+
+    assert cache.lookup("account.a") == (False, None)
+    assert cache.lookup("account.b") == (True, {"rank": 1})
+    assert published == [
+        {"server": "steam", "game_mode": "solo", "user_ids": ["account.a"]}
+    ]
+
+    # Another worker receiving the same event evicts the same players
+    cache.store("account.a", {"rank": 1}, cache.generation)
+    invalidation._apply_update(published[0])
+    assert cache.lookup("account.a") == (False, None)
+    assert cache.lookup("account.b") == (True, {"rank": 1})
+    cache.invalidate()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("listing failed")
+        return f"data_{self.calls}.json"
+
+
+def test_stale_value_is_served_while_refreshing() -> None:
+    clock, load = Clock(), Loader()
+    cache = StaleWhileRevalidateCache(
+        "test-swr", soft_ttl=10, hard_ttl=100, timer=clock
+    )
+
+    async def run():
+        first = await cache.get("steam", load)
+        clock.now = 5
+        fresh = await cache.get("steam", load)
+        clock.now = 50
+        stale = [await cache.get("steam", load) for _ in range(3)]
+        await asyncio.sleep(0.05)  # let the background refresh land
+        return first, fresh, stale, await cache.get("steam", load)
+
+    first, fresh, stale, refreshed = asyncio.run(run())
+
+    assert first == fresh == "data_1.json"
+    assert stale == ["data_1.json"] * 3
+    assert refreshed == "data_2.json"
+    assert load.calls == 2
+
+
+def test_hard_expired_value_is_not_served() -> None:
+    clock, load = Clock(), Loader()
+    cache = StaleWhileRevalidateCache(
+        "test-swr", soft_ttl=10, hard_ttl=100, timer=clock
+    )
+
+    async def run():
+        await cache.get("steam", load)
+        clock.now = 150
+        return await cache.get("steam", load)
+
+    assert asyncio.run(run()) == "data_2.json"
+
+
+def test_failed_refresh_keeps_stale_value() -> None:
+    clock, load = Clock(), Loader()
+    cache = StaleWhileRevalidateCache(
+        "test-swr", soft_ttl=10, hard_ttl=100, timer=clock
+    )
+
+    async def run():
+        await cache.get("steam", load)
+        load.fail = True
+        clock.now = 50
+        stale = await cache.get("steam", load)
+        await asyncio.sleep(0.05)
+        return stale, await cache.get("steam", load)
+
+    assert asyncio.run(run()) == ("data_1.json", "data_1.json")
+
+    load.fail = True
+    clock.now = 150
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get("steam", load))
+
+
+def test_update_event_invalidates_recent_name(monkeypatch) -> None:
+    names = iter(["data_1.json", "data_2.json"])
+    monkeypatch.setattr(minio_cache, "_find_most_recent", lambda bucket: next(names))
+    minio_cache.invalidate_recent_cache()
+
+    first = asyncio.run(minio_cache.get_minio_recent("steam", "solo"))
+    cached = asyncio.run(minio_cache.get_minio_recent("steam", "solo"))
+    invalidation._apply_update({"server": "steam", "game_mode": "solo", "user_ids": []})
+    reloaded = asyncio.run(minio_cache.get_minio_recent("steam", "solo"))
+
+    assert (first, cached, reloaded) == ("data_1.json", "data_1.json", "data_2.json")
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from pubg.api import minio_cache, redis_cache
+from pubg.api.coalesce import SingleFlight
+from pubg.api.main import app
+
+CONCURRENT_REQUESTS = 1000
+
+
+class CountingRedis:
+    """Async Redis stand-in that counts player reads and answers slowly"""
+
+    def __init__(self):
+        self.reads = 0
+
+    async def get(self, key):
+        if key == redis_cache.GENERATION_POINTER_KEY:
+            return None
+        self.reads += 1
+        await asyncio.sleep(0.05)
+        return json.dumps({"rank": 1, "wins": 10, "games_played": 100}).encode()
+
+
+@pytest.fixture
+def counting_redis(monkeypatch):
+    fake = CountingRedis()
+    monkeypatch.setattr(redis_cache, "get_redis_client", lambda: fake)
+    redis_cache.invalidate_user_cache()
+    yield fake
+    redis_cache.invalidate_user_cache()
+
+
+def test_concurrent_user_requests_share_one_read(counting_redis) -> None:
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return await asyncio.gather(
+                *(
+                    client.get("/get_user_data/account.popular")
+                    for _ in range(CONCURRENT_REQUESTS)
+                )
+            )
+
+    responses = asyncio.run(run())
+
+    assert all(response.status_code == 200 for response in responses)
+    assert counting_redis.reads == 1
+    assert len(redis_cache.user_flight) == 0
+
+
+def test_invalidation_starts_a_new_read(counting_redis) -> None:
+    async def run():
+        first = asyncio.ensure_future(redis_cache.fetch_redis("account.a"))
+        await asyncio.sleep(0)
+        redis_cache.invalidate_user_cache(["account.a"])
+        return await asyncio.gather(first, redis_cache.fetch_redis("account.a"))
+
+    asyncio.run(run())
+
+    assert counting_redis.reads == 2
+
+
+def test_concurrent_recent_lookups_share_one_listing(monkeypatch) -> None:
+    listings = []
+
+    def slow_find(bucket_name):
+        listings.append(bucket_name)
+        time.sleep(0.05)
+        return "data_2024-01-01-00-00-00.json"
+
+    monkeypatch.setattr(minio_cache, "_find_most_recent", slow_find)
+    minio_cache.invalidate_recent_cache()
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                minio_cache.get_minio_recent(server="steam", game_mode="solo")
+                for _ in range(CONCURRENT_REQUESTS)
+            )
+        )
+
+    results = asyncio.run(run())
+
+    assert set(results) == {"data_2024-01-01-00-00-00.json"}
+    assert listings == ["pubg-leaderboard-bucket-steam-solo"]
+
+
+def test_errors_are_shared_and_not_kept() -> None:
+    flight = SingleFlight("test")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("key", failing) for _ in range(10)), return_exceptions=True
+        )
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+    assert len(calls) == 1
+
+    # The failure is not remembered, the next burst tries again
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_others() -> None:
+    flight = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("key", slow))
+        second = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pubg.api import delta, redis_cache, router
+from pubg.api.main import app
+from tests.conftest import FakeRedis
+
+
+def _players(ranks):
+    return {
+        f"account.{user}": {"rank": rank, "wins": user, "games_played": user}
+        for user, rank in ranks.items()
+    }
+
+
+def test_diff_players_finds_changes_and_drop_offs() -> None:
+    previous = {
+        user_id: delta._fingerprint(stats)
+        for user_id, stats in _players({1: 1, 2: 2, 3: 3}).items()
+    }
+
+    changed, removed = delta.diff_players(previous, _players({1: 1, 2: 3, 4: 2}))
+
+    assert set(changed) == {"account.2", "account.4"}
+    assert removed == ["account.3"]
+
+
+@pytest.fixture
+def delta_refresh(monkeypatch):
+    """Runs /refresh_all_data in delta mode over snapshots set on the returned dict"""
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_cache, "get_redis_client", lambda: fake)
+    monkeypatch.setattr(delta, "get_redis_client", lambda: fake)
+    monkeypatch.setattr(router, "get_redis_client", lambda: fake)
+    monkeypatch.setattr(router.Config, "REFRESH_MODE", "delta")
+    monkeypatch.setattr(router.PUBGConfig, "SERVERS", ["steam"])
+    redis_cache.invalidate_user_cache()
+
+    snapshot = {"downloads": 0, "modes": {}}
+
+    async def fake_recent(server, game_mode):
+        return "data_2024-01-01-00-00-00.json"
+
+    async def fake_etag(game_mode, file_name, server):
+        return snapshot["modes"][game_mode][0]
+
+    async def fake_data(game_mode, file_name, server):
+        snapshot["downloads"] += 1
+        return snapshot["modes"][game_mode][1]
+
+    async def fake_index(server, game_mode, data):
+        return 1
+
+    monkeypatch.setattr(router, "get_minio_recent", fake_recent)
+    monkeypatch.setattr(router, "get_minio_etag", fake_etag)
+    monkeypatch.setattr(router, "get_minio_data", fake_data)
+    monkeypatch.setattr(router, "write_leaderboard_index", fake_index)
+
+    client = TestClient(app)
+
+    def refresh(etag, data, squad=None):
+        """Refreshes steam/solo, and steam/squad too when given its (etag, data)"""
+        snapshot["modes"] = {"solo": (etag, data)}
+        if squad is not None:
+            snapshot["modes"]["squad"] = squad
+        monkeypatch.setattr(router.PUBGConfig, "GAME_MODE", list(snapshot["modes"]))
+        response = client.post("/refresh_all_data")
+        assert response.status_code == 200
+        return response.json()[0]
+
+    refresh.snapshot = snapshot
+    refresh.redis = fake
+    yield refresh
+    redis_cache.invalidate_user_cache()
+
+
+def test_delta_refresh_writes_only_changes(delta_refresh) -> None:
+    first = delta_refresh("a", _players({1: 1, 2: 2, 3: 3}))
+    second = delta_refresh("b", _players({1: 1, 2: 3, 4: 2}))
+
+    assert (first["keys_written"], first["keys_skipped"]) == (3, 0)
+    assert second["status"] == "refreshed"
+    assert (second["keys_written"], second["keys_skipped"]) == (2, 1)
+    assert second["keys_deleted"] == 1
+    assert "account.3" not in delta_refresh.redis.store
+    assert asyncio.run(redis_cache.fetch_redis("account.2"))["rank"] == 3
+
+
+def test_delta_refresh_skips_identical_snapshot(delta_refresh) -> None:
+    delta_refresh("a", _players({1: 1}))
+    unchanged = delta_refresh("a", _players({1: 1}))
+
+    assert unchanged["status"] == "skipped"
+    assert unchanged["detail"] == "Snapshot unchanged"
+    assert delta_refresh.snapshot["downloads"] == 1
+
+
+def test_player_on_another_leaderboard_is_not_deleted(delta_refresh) -> None:
+    both = _players({1: 1, 2: 2})
+    delta_refresh("a", both, squad=("x", both))
+
+    # account.2 drops off solo but is still on squad, account.1 leaves both
+    result = delta_refresh("b", _players({3: 1}), squad=("y", _players({2: 1})))
+
+    assert result["keys_deleted"] == 1
+    assert asyncio.run(redis_cache.fetch_redis("account.1")) is None
+    assert asyncio.run(redis_cache.fetch_redis("account.2")) is not None
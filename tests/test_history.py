@@ -0,0 +1,185 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pubg.api import history
+from pubg.api.main import app
+from pubg.api.models import HistoryIndexResult
+from tests.conftest import FakeRedis
+
+
+class FakeBucket:
+    """Snapshots by name, listed in name order like MinIO"""
+
+    def __init__(self):
+        self.snapshots = {}
+        self.reads = 0
+
+    async def list(self, server, game_mode, start_after, limit):
+        names = sorted(
+            n for n in self.snapshots if start_after is None or n > start_after
+        )
+        return names[:limit]
+
+    async def stream(self, game_mode, file_name, server):
+        self.reads += 1
+        yield self.snapshots[file_name]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(history, "get_redis_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    fake = FakeBucket()
+    monkeypatch.setattr(history, "list_minio_snapshots", fake.list)
+    monkeypatch.setattr(history, "stream_minio_data", fake.stream)
+    return fake
+
+
+def _snapshot(day, rank):
+    return (
+        f"data_2024-03-{day:02d}-12-00-00.json",
+        {"account.1": {"rank": rank, "wins": day, "games_played": 2 * day}},
+    )
+
+
+def test_index_is_incremental(fake_redis, bucket) -> None:
+    bucket.snapshots.update([_snapshot(1, 10), _snapshot(2, 8)])
+    assert asyncio.run(history.index_history("steam", "solo")) == [
+        "data_2024-03-01-12-00-00.json",
+        "data_2024-03-02-12-00-00.json",
+    ]
+
+    bucket.snapshots.update([_snapshot(3, 5)])
+    assert asyncio.run(history.index_history("steam", "solo")) == [
+        "data_2024-03-03-12-00-00.json"
+    ]
+    assert asyncio.run(history.index_history("steam", "solo")) == []
+
+    # Each snapshot is read once, however many runs there are
+    assert bucket.reads == 3
+    points = asyncio.run(history.get_player_history("steam", "solo", "account.1"))
+    assert [point["rank"] for point in points] == [10, 8, 5]
+
+
+def test_reindexing_a_snapshot_adds_nothing(fake_redis, bucket) -> None:
+    bucket.snapshots.update([_snapshot(1, 10)])
+    asyncio.run(history.index_history("steam", "solo"))
+
+    # A run that died before moving the cursor is repeated
+    fake_redis.store.clear()
+    asyncio.run(history.index_history("steam", "solo"))
+
+    assert (
+        len(fake_redis.zsets[history._history_key("steam", "solo", "account.1")]) == 1
+    )
+
+
+def test_history_endpoint(fake_redis, bucket) -> None:
+    bucket.snapshots.update([_snapshot(day, 20 - day) for day in range(1, 6)])
+    client = TestClient(app)
+    client.post("/index_history")
+
+    response = client.get(
+        "/history/steam/solo/account.1",
+        params={"since": "2024-03-02T00:00:00Z", "until": "2024-03-04T00:00:00Z"},
+    )
+    missing = client.get("/history/steam/solo/account.2")
+    invalid = client.get("/history/steam/solo/player.1")
+
+    assert response.status_code == 200
+    assert response.json()["points"] == [
+        {
+            "timestamp": "2024-03-02T12:00:00Z",
+            "rank": 18,
+            "wins": 2,
+            "games_played": 4,
+        },
+        {
+            "timestamp": "2024-03-03T12:00:00Z",
+            "rank": 17,
+            "wins": 3,
+            "games_played": 6,
+        },
+    ]
+    assert missing.status_code == 404
+    assert invalid.status_code == 400
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    """Runs the test in a local time zone other than UTC"""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_naive_times_are_utc(fake_redis, bucket, new_york) -> None:
+    bucket.snapshots.update([_snapshot(day, 20 - day) for day in range(1, 4)])
+    asyncio.run(history.index_history("steam", "solo"))
+
+    # 11:00 UTC on the 2nd is before that day's snapshot, but after it in New York
+    points = asyncio.run(
+        history.get_player_history(
+            "steam",
+            "solo",
+            "account.1",
+            since=datetime(2024, 3, 2, 11),
+            until=datetime(2024, 3, 2, 13),
+        )
+    )
+
+    assert [point["rank"] for point in points] == [18]
+
+
+def test_history_is_trimmed_to_retention(monkeypatch, fake_redis, bucket) -> None:
+    monkeypatch.setattr(history.RedisConfig, "REDIS_HISTORY_RETENTION_DAYS", 2)
+    bucket.snapshots.update([_snapshot(day, 20 - day) for day in range(1, 6)])
+    asyncio.run(history.index_history("steam", "solo"))
+
+    points = asyncio.run(history.get_player_history("steam", "solo", "account.1"))
+    key = history._history_key("steam", "solo", "account.1")
+
+    # Two days back from the newest snapshot, inclusive
+    assert [point["rank"] for point in points] == [17, 16, 15]
+    assert fake_redis.expiring == {key: 2 * 24 * 60 * 60}
+
+
+def test_scheduled_indexing_works_through_backlog_once(monkeypatch, fake_redis) -> None:
+    monkeypatch.setattr(history.RedisConfig, "REDIS_HISTORY_INDEX_BATCH", 2)
+    backlog = [2, 2, 1]
+    runs = []
+
+    async def index():
+        runs.append(backlog.pop(0) if backlog else 0)
+        return [
+            HistoryIndexResult(
+                server="steam", game_mode="solo", snapshots_indexed=runs[-1]
+            )
+        ]
+
+    async def run_workers():
+        workers = [
+            asyncio.create_task(history.run_history_indexer(index, interval=60))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    asyncio.run(run_workers())
+
+    # Full batches go straight on to the next, and the other worker sees the claim
+    assert runs == [2, 2, 1]
+    assert fake_redis.expiring == {history.INDEXER_CLAIM_KEY: 60}
@@ -0,0 +1,163 @@
+import json
+
+import pytest
+from minio.error import S3Error
+
+from pubg.jobs import write_minio
+from pubg.jobs.normalize import normalize_leaderboard
+from pubg.jobs.scheduler import run_job
+from pubg.snapshot import CONTENT_HASH_METADATA_KEY, content_hash
+
+
+def _row(user_id="account.1", rank=1, wins=2, games=3):
+    return {
+        "id": user_id,
+        "attributes": {"rank": rank, "stats": {"wins": wins, "games": games}},
+    }
+
+
+def test_normalize_keeps_only_well_formed_rows() -> None:
+    rows = [
+        _row(),
+        _row("account.2", rank=None),
+        _row("account.3", wins="4"),
+        _row("account.4", rank=True),
+        _row("account.5", wins=5, games=4),
+        _row("player.6"),
+        {"id": "account.7"},
+        "not a row",
+        _row("account.8", rank=8, wins=0, games=0),
+        _row("account.9"),
+        _row("account.9"),
+    ]
+
+    players, rejected = normalize_leaderboard(rows)
+
+    assert players == {
+        "account.1": {"rank": 1, "wins": 2, "games_played": 3},
+        "account.8": {"rank": 8, "wins": 0, "games_played": 0},
+    }
+    assert rejected == 9
+
+
+def test_content_hash_ignores_key_order() -> None:
+    a = {"account.1": {"rank": 1, "wins": 2, "games_played": 3}}
+    b = {"account.1": {"games_played": 3, "wins": 2, "rank": 1}}
+
+    assert content_hash(a) == content_hash(b)
+    assert content_hash(a) != content_hash({"account.1": {**a["account.1"], "wins": 3}})
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def read(self):
+        return self.body
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+def _s3_error(code, resource):
+    return S3Error(
+        code=code,
+        message=code,
+        resource=resource,
+        request_id=None,
+        host_id=None,
+        response=None,
+    )
+
+
+class FakeMinio:
+    objects: dict = {}
+    puts = 0
+    failing = False
+
+    def __init__(self, **kwargs):
+        pass
+
+    def bucket_exists(self, bucket_name):
+        return any(bucket == bucket_name for bucket, _ in self.objects)
+
+    def make_bucket(self, bucket_name):
+        pass
+
+    def get_object(self, bucket_name, object_name):
+        if (bucket_name, object_name) not in self.objects:
+            raise _s3_error("NoSuchKey", object_name)
+        return FakeResponse(self.objects[bucket_name, object_name][0])
+
+    def put_object(
+        self, bucket_name, object_name, data, length, metadata=None, **kwargs
+    ):
+        FakeMinio.puts += 1
+        if self.failing:
+            raise _s3_error("InternalError", object_name)
+        self.objects[bucket_name, object_name] = (data.read(), metadata)
+
+
+@pytest.fixture
+def fake_minio(monkeypatch):
+    FakeMinio.objects = {}
+    FakeMinio.puts = 0
+    FakeMinio.failing = False
+    monkeypatch.setattr(write_minio, "Minio", FakeMinio)
+    return FakeMinio.objects
+
+
+def test_unchanged_leaderboard_is_not_uploaded(fake_minio) -> None:
+    data = {"account.1": {"rank": 1, "wins": 2, "games_played": 3}}
+
+    assert write_minio.write_leaderboard_data_minio("bucket", data)
+    assert not write_minio.write_leaderboard_data_minio("bucket", dict(data))
+
+    snapshots = [v for (_, name), v in fake_minio.items() if name.startswith("data_")]
+    assert len(snapshots) == 1
+    assert snapshots[0][1][CONTENT_HASH_METADATA_KEY] == content_hash(data)
+    pointer = json.loads(fake_minio["bucket", "latest.json"][0])
+    assert pointer["sha256"] == content_hash(data)
+
+
+def test_changed_or_unhashed_leaderboard_is_uploaded(fake_minio) -> None:
+    # Pointers written before hashes were recorded never match
+    fake_minio["bucket", "latest.json"] = (b'{"object_name": "data_x"}', None)
+    data = {"account.1": {"rank": 1, "wins": 2, "games_played": 3}}
+
+    assert write_minio.write_leaderboard_data_minio("bucket", data)
+    assert write_minio.write_leaderboard_data_minio(
+        "bucket", {"account.1": {**data["account.1"], "wins": 3}}
+    )
+
+
+def test_failed_upload_is_retried_and_raised(fake_minio) -> None:
+    FakeMinio.failing = True
+    data = {"account.1": {"rank": 1, "wins": 2, "games_played": 3}}
+
+    with pytest.raises(S3Error):
+        write_minio.write_leaderboard_data_minio("bucket", data)
+
+    assert FakeMinio.puts == 3
+    assert ("bucket", "latest.json") not in fake_minio
+
+
+def test_run_job_reports_failed_and_inactive_uploads(fake_minio) -> None:
+    FakeMinio.failing = True
+    leaderboards = {
+        "solo": {"account.1": {"rank": 1, "wins": 2, "games_played": 3}},
+        "duo": {},
+    }
+
+    results = run_job(
+        servers=["steam"],
+        game_modes=list(leaderboards),
+        fetch=lambda server, game_mode, rate_limiter: leaderboards[game_mode],
+    )
+
+    assert results["steam", "solo"].startswith("upload failed: ")
+    assert results["steam", "duo"] == "inactive"
+    assert FakeMinio.puts == 3
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from functools import partial
+
+from pubg.jobs.get_season_data import fetch_pubg_leaderboard, season_cache
+from pubg.jobs.metrics import registry
+from pubg.jobs.pipeline import run_pipeline
+from pubg.jobs.rate_limit import TokenBucket
+
+SERVERS = ["kakao", "psn", "steam", "xbox", "stadia"]
+GAME_MODES = ["squad-fpp", "solo", "squad"]
+
+
+class InFlight:
+    """Counts leaderboards fetched but not yet loaded"""
+
+    def __init__(self, load_delay: float = 0.0) -> None:
+        self.load_delay = load_delay
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+        self.loaded: list[tuple[str, str]] = []
+
+    def fetch(self, server, game_mode, rate_limiter):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        return {f"account.{server}": {"rank": 1, "wins": 0, "games_played": 0}}
+
+    async def load(self, server, game_mode, data):
+        await asyncio.sleep(self.load_delay)
+        with self.lock:
+            self.current -= 1
+            self.loaded.append((server, game_mode))
+
+
+def _freshness_count() -> float:
+    return registry.get_sample_value("pubg_pipeline_freshness_lag_seconds_count") or 0
+
+
+def test_pipeline_fetches_uploads_and_loads(pubg_stub) -> None:
+    season_cache.clear()
+    written = []
+    loaded = {}
+
+    def write(bucket_name, data):
+        written.append(bucket_name)
+
+    async def load(server, game_mode, data):
+        loaded[server, game_mode] = len(data)
+
+    before = _freshness_count()
+    results = run_pipeline(
+        servers=SERVERS[:2],
+        game_modes=GAME_MODES[:2],
+        rate_limiter=TokenBucket(1000, period=1.0),
+        fetch=partial(
+            fetch_pubg_leaderboard,
+            url=f"{pubg_stub.url}/leaderboards",
+            season_url=pubg_stub.url,
+        ),
+        write=write,
+        load=load,
+    )
+    season_cache.clear()
+
+    assert set(results.values()) == {"loaded"}
+    assert len(written) == 4
+    assert set(loaded.values()) == {500}
+    assert _freshness_count() - before == 4
+
+
+def test_slow_loads_hold_back_fetches() -> None:
+    stages = InFlight(load_delay=0.02)
+
+    results = run_pipeline(
+        servers=SERVERS,
+        game_modes=GAME_MODES,
+        rate_limiter=TokenBucket(1000, period=1.0),
+        fetch_workers=2,
+        upload_workers=1,
+        queue_size=1,
+        fetch=stages.fetch,
+        write=lambda bucket_name, data: True,
+        load=stages.load,
+    )
+
+    assert len(stages.loaded) == len(SERVERS) * len(GAME_MODES)
+    assert set(results.values()) == {"loaded"}
+    # Two fetching, one in each queue, one uploading and one loading at most
+    assert stages.peak <= 2 + 1 + 1 + 1 + 1
+
+
+def test_unchanged_and_failed_leaderboards_are_not_loaded() -> None:
+    stages = InFlight()
+
+    def write(bucket_name, data):
+        if bucket_name.endswith("-psn-solo"):
+            raise OSError("MinIO down")
+        return not bucket_name.endswith("-kakao-solo")
+
+    async def load(server, game_mode, data):
+        if server == "steam":
+            raise OSError("Redis down")
+        await stages.load(server, game_mode, data)
+
+    results = run_pipeline(
+        servers=["kakao", "psn", "steam"],
+        game_modes=["solo"],
+        rate_limiter=TokenBucket(1000, period=1.0),
+        fetch=stages.fetch,
+        write=write,
+        load=load,
+    )
+
+    assert results[("kakao", "solo")] == "unchanged"
+    assert results[("psn", "solo")] == "upload failed: MinIO down"
+    assert results[("steam", "solo")] == "load failed: Redis down"
+    assert stages.loaded == []
@@ -0,0 +1,122 @@
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from pubg.jobs.get_season_data import fetch_pubg_leaderboard, season_cache
+from pubg.jobs.rate_limit import TokenBucket
+from pubg.jobs.scheduler import run_job
+from pubg.jobs.season_cache import SeasonCache
+
+SERVERS = ["kakao", "psn", "steam"]
+GAME_MODES = ["squad-fpp", "solo"]
+
+
+@pytest.fixture(autouse=True)
+def clear_season_cache():
+    season_cache.clear()
+    yield
+    season_cache.clear()
+
+
+class BlindBucket(TokenBucket):
+    """Ignores the rate-limit headers, so only 429s can slow it down"""
+
+    def update_from_headers(self, headers):
+        pass
+
+
+class RecordingWriter:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.buckets: list[str] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, bucket_name, data):
+        time.sleep(self.delay)
+        assert len(data) == 500
+        with self.lock:
+            self.buckets.append(bucket_name)
+
+
+def _run(stub, writer, workers, rate_limiter):
+    fetch = partial(
+        fetch_pubg_leaderboard,
+        url=f"{stub.url}/leaderboards",
+        season_url=stub.url,
+    )
+    start = time.perf_counter()
+    results = run_job(
+        servers=SERVERS,
+        game_modes=GAME_MODES,
+        rate_limiter=rate_limiter,
+        fetch_workers=workers,
+        upload_workers=workers,
+        fetch=fetch,
+        write=writer,
+    )
+    return results, time.perf_counter() - start
+
+
+def test_rate_limit_never_exceeded(pubg_stub) -> None:
+    pubg_stub.limit, pubg_stub.window = 4, 0.5
+    writer = RecordingWriter()
+
+    results, _ = _run(
+        pubg_stub, writer, workers=4, rate_limiter=TokenBucket(capacity=4, period=0.5)
+    )
+
+    assert set(results.values()) == {"written"}
+    assert len(writer.buckets) == len(SERVERS) * len(GAME_MODES)
+    assert pubg_stub.rejected == 0
+
+
+def test_rate_limited_requests_are_retried(pubg_stub) -> None:
+    pubg_stub.limit, pubg_stub.window = 4, 0.5
+    writer = RecordingWriter()
+
+    # Bucket believes it has far more quota than the server grants
+    results, _ = _run(
+        pubg_stub, writer, workers=4, rate_limiter=BlindBucket(capacity=100, period=0.5)
+    )
+
+    assert pubg_stub.rejected > 0
+    assert set(results.values()) == {"written"}
+    assert len(writer.buckets) == len(SERVERS) * len(GAME_MODES)
+
+
+def test_concurrent_run_is_faster_than_serial(pubg_stub) -> None:
+    pubg_stub.latency = 0.05
+    writer = RecordingWriter(delay=0.05)
+
+    _, serial = _run(
+        pubg_stub, writer, workers=1, rate_limiter=TokenBucket(1000, period=1.0)
+    )
+    _, concurrent = _run(
+        pubg_stub, writer, workers=4, rate_limiter=TokenBucket(1000, period=1.0)
+    )
+
+    assert pubg_stub.rejected == 0
+    assert concurrent < serial * 0.6
+
+
+def test_season_looked_up_once_per_server(pubg_stub) -> None:
+    _run(pubg_stub, RecordingWriter(), workers=4, rate_limiter=TokenBucket(1000, 1.0))
+
+    season_requests = [path for path in pubg_stub.requests if path.endswith("/seasons")]
+    assert sorted(season_requests) == sorted(f"/{server}/seasons" for server in SERVERS)
+    # One leaderboard per combination plus one season lookup per server
+    assert len(pubg_stub.requests) == len(SERVERS) * (len(GAME_MODES) + 1)
+
+
+def test_season_cache_persists_with_ttl(tmp_path) -> None:
+    path = str(tmp_path / "seasons.json")
+    SeasonCache(path=path, ttl=60).get("steam", lambda: "season-cur")
+
+    assert (
+        SeasonCache(path=path, ttl=60).get("steam", lambda: "refetched") == "season-cur"
+    )
+    assert (
+        SeasonCache(path=path, ttl=0).get("steam", lambda: "refetched") == "refetched"
+    )
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.crc import key_slot
+
+from pubg.api import leaderboard
+from pubg.api.main import app
+from tests.conftest import FakeRedis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(leaderboard, "get_redis_client", lambda: fake)
+    return fake
+
+
+def _players(count, offset=0):
+    return {
+        f"account.{i}": {"rank": i + offset, "wins": i, "games_played": 2 * i}
+        for i in range(1, count + 1)
+    }
+
+
+def test_refresh_swaps_in_new_version(fake_redis) -> None:
+    assert (
+        asyncio.run(leaderboard.write_leaderboard_index("steam", "solo", _players(10)))
+        == 1
+    )
+    assert (
+        asyncio.run(
+            leaderboard.write_leaderboard_index(
+                "steam", "solo", _players(10, offset=100)
+            )
+        )
+        == 2
+    )
+
+    version, players = asyncio.run(leaderboard.get_rank_range("steam", "solo", 101, 3))
+
+    assert version == 2
+    assert [stats["rank"] for _, stats in players] == [101, 102, 103]
+    # Every key of one leaderboard must land on a single node
+    assert len({key_slot(key.encode()) for key in fake_redis.zsets}) == 1
+    # The replaced version is left to expire rather than deleted under readers
+    assert list(fake_redis.expiring) == [
+        leaderboard._ranks_key("steam", "solo", 1),
+        leaderboard._stats_key("steam", "solo", 1),
+    ]
+
+
+def test_rank_range_endpoint(fake_redis) -> None:
+    asyncio.run(leaderboard.write_leaderboard_index("steam", "solo", _players(300)))
+
+    response = TestClient(app).get(
+        "/leaderboard/steam/solo", params={"start_rank": 200, "count": 50}
+    )
+
+    assert response.status_code == 200
+    players = response.json()["players"]
+    assert [p["rank"] for p in players] == list(range(200, 250))
+    assert players[0] == {
+        "user_id": "account.200",
+        "rank": 200,
+        "wins": 200,
+        "games_played": 400,
+    }
+
+
+def test_around_endpoint_clips_at_top(fake_redis) -> None:
+    asyncio.run(leaderboard.write_leaderboard_index("steam", "solo", _players(20)))
+    client = TestClient(app)
+
+    around = client.get(
+        "/leaderboard/steam/solo/around/account.10", params={"radius": 2}
+    )
+    top = client.get("/leaderboard/steam/solo/around/account.1", params={"radius": 2})
+    missing = client.get("/leaderboard/steam/solo/around/account.999")
+
+    assert [p["rank"] for p in around.json()["players"]] == [8, 9, 10, 11, 12]
+    assert [p["rank"] for p in top.json()["players"]] == [1, 2, 3]
+    assert missing.status_code == 404
+
+
+def test_leaderboard_rejects_unknown_combination(fake_redis) -> None:
+    response = TestClient(app).get("/leaderboard/xbox/duo-fpp-nope")
+
+    assert response.status_code == 400
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import socket
+import uuid
+from io import BytesIO
+
+import pytest
+from minio import Minio
+
+from pubg.api import notifications
+from pubg.api.notifications import SnapshotNotifier, created_snapshots
+from tests.conftest import FakeRedis
+
+
+class Loader:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.loaded = []
+
+    async def __call__(self, server, game_mode, object_name):
+        if self.fail:
+            raise OSError("Redis down")
+        self.loaded.append((server, game_mode, object_name))
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(notifications, "get_redis_client", lambda: fake)
+    return fake
+
+
+def _event(bucket_name, *keys):
+    return {
+        "Records": [
+            {"s3": {"bucket": {"name": bucket_name}, "object": {"key": key}}}
+            for key in keys
+        ]
+    }
+
+
+def test_created_snapshots_decodes_keys_and_skips_other_objects() -> None:
+    event = _event("bucket", "data_2024-03-01-00-00-00.json", "latest.json")
+    event["Records"].append({"s3": {"object": {"key": "data_no-bucket"}}})
+    encoded = _event("bucket", "data_2024-03-01%2000.json")
+
+    assert list(created_snapshots(event)) == [
+        ("bucket", "data_2024-03-01-00-00-00.json")
+    ]
+    assert list(created_snapshots(encoded)) == [("bucket", "data_2024-03-01 00.json")]
+    assert list(created_snapshots({"Records": None})) == []
+
+
+def test_burst_is_loaded_once_with_the_newest(fake_redis) -> None:
+    load = Loader()
+
+    async def scenario():
+        notifier = SnapshotNotifier(load, debounce=0.05)
+        for name in ["data_2", "data_3", "data_1"]:
+            notifier.notify("steam", "solo", name)
+        notifier.notify("psn", "solo", "data_1")
+        await asyncio.sleep(0.2)
+        # A later write opens a new window
+        notifier.notify("steam", "solo", "data_4")
+        await asyncio.sleep(0.2)
+
+    asyncio.run(scenario())
+
+    assert sorted(load.loaded) == [
+        ("psn", "solo", "data_1"),
+        ("steam", "solo", "data_3"),
+        ("steam", "solo", "data_4"),
+    ]
+
+
+def test_each_object_is_loaded_by_one_worker(fake_redis) -> None:
+    loads = [Loader(), Loader()]
+
+    async def scenario():
+        # Every worker hears every notification, and MinIO may deliver it again
+        workers = [SnapshotNotifier(load, debounce=0.01) for load in loads]
+        for _ in range(2):
+            for worker in workers:
+                worker.notify("steam", "solo", "data_1")
+            await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+
+    assert sum(len(load.loaded) for load in loads) == 1
+
+
+def test_failed_load_can_be_retried(fake_redis) -> None:
+    load = Loader(fail=True)
+
+    async def scenario():
+        notifier = SnapshotNotifier(load, debounce=0.01)
+        notifier.notify("steam", "solo", "data_1")
+        await asyncio.sleep(0.05)
+        load.fail = False
+        notifier.notify("steam", "solo", "data_1")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+
+    assert load.loaded == [("steam", "solo", "data_1")]
+
+
+@pytest.fixture
+def local_minio(monkeypatch):
+    """A scratch bucket on the MinIO from docker-compose, if one is running"""
+    endpoint = os.environ.get("MINIO_ENDPOINT", "localhost:9000")
+    host, port = endpoint.split(":")
+    try:
+        socket.create_connection((host, int(port)), timeout=1).close()
+    except OSError:
+        pytest.skip(f"No local MinIO at {endpoint}")
+
+    user = os.environ.get("MINIO_ROOT_USER", "minioadmin")
+    password = os.environ.get("MINIO_ROOT_PASSWORD", "minioadmin")
+    monkeypatch.setattr(notifications.MinioConfig, "MINIO_ENDPOINT", endpoint)
+    monkeypatch.setattr(notifications.MinioConfig, "MINIO_ROOT_USER", user)
+    monkeypatch.setattr(notifications.MinioConfig, "MINIO_ROOT_PASSWORD", password)
+    client = Minio(endpoint, access_key=user, secret_key=password, secure=False)
+
+    server = f"test{uuid.uuid4().hex[:8]}"
+    bucket_name = f"{notifications.MinioConfig.BUCKET_BASE_NAME}-{server}-solo"
+    client.make_bucket(bucket_name)
+    yield client, bucket_name, server
+    for obj in client.list_objects(bucket_name):
+        client.remove_object(bucket_name, obj.object_name)
+    client.remove_bucket(bucket_name)
+
+
+def test_loads_object_written_to_local_minio(fake_redis, local_minio) -> None:
+    client, bucket_name, server = local_minio
+    load = Loader()
+
+    async def scenario():
+        listener = asyncio.create_task(
+            notifications.listen_for_snapshots(load, [(server, "solo")])
+        )
+        await asyncio.sleep(1)  # let the stream open
+        for name in ["data_2024-03-01-00-00-00.json", "latest.json"]:
+            await asyncio.to_thread(
+                client.put_object, bucket_name, name, BytesIO(b"{}"), 2
+            )
+        # Waits out the default debounce window
+        for _ in range(100):
+            if load.loaded:
+                break
+            await asyncio.sleep(0.1)
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+    asyncio.run(scenario())
+
+    assert load.loaded == [(server, "solo", "data_2024-03-01-00-00-00.json")]
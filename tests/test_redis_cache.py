@@ -0,0 +1,205 @@
+import asyncio
+
+import pytest
+from redis.crc import key_slot
+
+from pubg.api import redis_cache
+from tests.conftest import FakeRedis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_cache, "get_redis_client", lambda: fake)
+    monkeypatch.setattr(redis_cache.RedisConfig, "REDIS_WRITE_BATCH_SIZE", 100)
+    redis_cache.invalidate_user_cache()
+    yield fake
+    redis_cache.invalidate_user_cache()
+
+
+def _players(count):
+    return {
+        f"account.{i}": {"rank": i, "wins": i, "games_played": i} for i in range(count)
+    }
+
+
+def test_slot_batches_respect_batch_size() -> None:
+    encoded = {f"account.{i}": "{}" for i in range(1000)}
+
+    batches = list(redis_cache._slot_batches(encoded, batch_size=64))
+
+    assert all(sum(len(m) for m in batch) <= 64 for batch in batches)
+    assert sum(len(m) for batch in batches for m in batch) == 1000
+    for batch in batches:
+        for mapping in batch:
+            assert len({key_slot(key.encode()) for key in mapping}) == 1
+
+
+def test_write_redis_batches_keys(fake_redis) -> None:
+    written = asyncio.run(redis_cache.write_redis(_players(450)))
+
+    assert written == 450
+    assert len(fake_redis.store) == 450
+    assert fake_redis.executions == 5
+
+
+def test_write_redis_retries_only_failed_batch(fake_redis) -> None:
+    fake_redis.failures = 1
+
+    asyncio.run(redis_cache.write_redis(_players(450)))
+
+    # One failed execution is resent, the other four batches go through once
+    assert fake_redis.executions == 6
+    assert len(fake_redis.store) == 450
+
+
+@pytest.mark.parametrize("layout", redis_cache.LAYOUTS)
+def test_fetch_reads_either_layout(fake_redis, monkeypatch, layout) -> None:
+    monkeypatch.setattr(redis_cache.RedisConfig, "REDIS_STORAGE_LAYOUT", layout)
+    asyncio.run(
+        redis_cache.write_redis(
+            {"account.a": {"rank": 1, "wins": 2, "games_played": 3}}
+        )
+    )
+
+    other = "json" if layout == "hash" else "hash"
+    monkeypatch.setattr(redis_cache.RedisConfig, "REDIS_STORAGE_LAYOUT", other)
+    asyncio.run(
+        redis_cache.write_redis(
+            {"account.b": {"rank": 4, "wins": 5, "games_played": 6}}
+        )
+    )
+
+    assert isinstance(fake_redis.store["account.a"], dict) == (layout == "hash")
+    assert asyncio.run(redis_cache.fetch_redis("account.a")) == {
+        "rank": 1,
+        "wins": 2,
+        "games_played": 3,
+    }
+    assert asyncio.run(redis_cache.fetch_redis("account.b")) == {
+        "rank": 4,
+        "wins": 5,
+        "games_played": 6,
+    }
+    assert asyncio.run(redis_cache.fetch_redis("account.missing")) is None
+
+
+def test_hash_layout_replaces_json_value(fake_redis, monkeypatch) -> None:
+    fake_redis.store["account.a"] = '{"rank": 9, "wins": 9, "games_played": 9}'
+    monkeypatch.setattr(redis_cache.RedisConfig, "REDIS_STORAGE_LAYOUT", "hash")
+
+    asyncio.run(
+        redis_cache.write_redis(
+            {"account.a": {"rank": 1, "wins": 2, "games_played": 3}}
+        )
+    )
+
+    assert fake_redis.store["account.a"] == {"rank": 1, "wins": 2, "games_played": 3}
+
+
+@pytest.mark.parametrize("layout", redis_cache.LAYOUTS)
+def test_fetch_many_mixes_cache_layouts_and_misses(
+    fake_redis, monkeypatch, layout
+) -> None:
+    monkeypatch.setattr(redis_cache.RedisConfig, "REDIS_STORAGE_LAYOUT", "json")
+    asyncio.run(redis_cache.write_redis(_players(30)))
+    monkeypatch.setattr(redis_cache.RedisConfig, "REDIS_STORAGE_LAYOUT", "hash")
+    asyncio.run(redis_cache.write_redis({"account.100": _players(101)["account.100"]}))
+    monkeypatch.setattr(redis_cache.RedisConfig, "REDIS_STORAGE_LAYOUT", layout)
+
+    asyncio.run(redis_cache.fetch_redis("account.0"))  # now cached
+    fake_redis.store.pop("account.0")
+
+    user_ids = [f"account.{i}" for i in range(30)] + ["account.100", "account.nope"]
+    results = asyncio.run(redis_cache.fetch_redis_many(user_ids))
+
+    assert set(results) == set(user_ids)
+    assert results["account.0"] == {"rank": 0, "wins": 0, "games_played": 0}
+    assert results["account.29"] == {"rank": 29, "wins": 29, "games_played": 29}
+    assert results["account.100"] == {"rank": 100, "wins": 100, "games_played": 100}
+    assert results["account.nope"] is None
+
+
+def test_generation_swap_is_atomic_for_readers(fake_redis) -> None:
+    asyncio.run(
+        redis_cache.write_redis(
+            {"account.a": {"rank": 1, "wins": 1, "games_played": 1}}
+        )
+    )
+
+    async def refresh():
+        generation = await redis_cache.begin_generation()
+        await redis_cache.write_redis(
+            {"account.a": {"rank": 2, "wins": 2, "games_played": 2}},
+            generation=generation,
+        )
+        # Loaded but not live, readers still see the bare keys
+        staged = await redis_cache.fetch_redis("account.a")
+        redis_cache.invalidate_user_cache()
+        await redis_cache.activate_generation(generation)
+        return generation, staged, await redis_cache.fetch_redis("account.a")
+
+    generation, staged, live = asyncio.run(refresh())
+
+    assert staged["rank"] == 1
+    assert live["rank"] == 2
+    assert fake_redis.store[f"pubg:g{generation}:account.a"]
+
+    async def second_refresh():
+        next_generation = await redis_cache.begin_generation()
+        await redis_cache.write_redis(_players(3), generation=next_generation)
+        return await redis_cache.activate_generation(next_generation)
+
+    # The replaced generation is left to expire, not deleted under readers
+    assert asyncio.run(second_refresh()) == generation
+    assert set(fake_redis.expiring) == {
+        f"pubg:g{generation}:account.a",
+        f"pubg:g{generation}:members",
+    }
+
+
+def test_write_redis_defaults_to_live_generation(fake_redis) -> None:
+    async def run():
+        await redis_cache.activate_generation(await redis_cache.begin_generation())
+        await redis_cache.write_redis(_players(2))
+
+    asyncio.run(run())
+
+    assert "pubg:g1:account.1" in fake_redis.store
+    assert "account.1" not in fake_redis.store
+
+
+def test_user_body_is_serialized_once(fake_redis) -> None:
+    from fastapi.testclient import TestClient
+
+    from pubg.api.main import app
+
+    asyncio.run(
+        redis_cache.write_redis(
+            {"account.a": {"rank": 1, "wins": 2, "games_played": 3}}
+        )
+    )
+    client = TestClient(app)
+
+    first = client.get("/get_user_data/account.a")
+    fake_redis.store.clear()  # a second request must not need Redis
+    second = client.get("/get_user_data/account.a")
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["content-type"] == "application/json"
+    assert second.json() == {
+        "user_id": "account.a",
+        "rank": 1,
+        "wins": 2,
+        "games_played": 3,
+    }
+
+    # Invalidation drops the body along with the decoded player
+    redis_cache.invalidate_user_cache(["account.a"])
+    assert client.get("/get_user_data/account.a").status_code == 404
+
+    schema = client.get("/openapi.json").json()
+    response = schema["paths"]["/get_user_data/{user_id}"]["get"]["responses"]["200"]
+    assert response["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/UserDataResponse"
+    }
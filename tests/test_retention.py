@@ -0,0 +1,212 @@
+import json
+import os
+import socket
+import uuid
+from datetime import date
+from io import BytesIO
+
+import pytest
+from minio import Minio
+from minio.error import S3Error
+
+from pubg.jobs import retention
+from pubg.jobs.retention import (
+    ArchiveError,
+    apply_retention,
+    daily_archive_name,
+    decode_archive,
+    plan_retention,
+    weekly_archive_name,
+)
+
+TODAY = date(2024, 3, 31)
+
+
+def _name(day, hour=0):
+    return f"data_{day:%Y-%m-%d}-{hour:02d}-00-00.json"
+
+
+def _leaderboard(seed):
+    return {f"account.{seed}": {"rank": seed, "wins": 1, "games_played": 2}}
+
+
+class FakeResponse:
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+
+    def read(self):
+        return self.body
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    """One bucket of objects, corrupting archives on write when asked to"""
+
+    def __init__(self):
+        self.objects = {}
+        self.corrupt_writes = False
+
+    def add_snapshot(self, name, data):
+        self.objects[name] = (json.dumps(data).encode(), {})
+
+    def list_objects(self, bucket_name):
+        return [type("Object", (), {"object_name": n}) for n in sorted(self.objects)]
+
+    def get_object(self, bucket_name, object_name):
+        if object_name not in self.objects:
+            raise S3Error(
+                code="NoSuchKey",
+                message="missing",
+                resource=object_name,
+                request_id=None,
+                host_id=None,
+                response=None,
+            )
+        return FakeResponse(*self.objects[object_name])
+
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        body = data.read()
+        if self.corrupt_writes:
+            body = retention.encode_archive({})
+        self.objects[object_name] = (body, {})
+
+    def remove_object(self, bucket_name, object_name):
+        self.objects.pop(object_name)
+
+
+def test_plan_keeps_recent_and_rolls_up_by_age() -> None:
+    names = [
+        _name(date(2024, 3, 30)),  # within keep_days
+        _name(date(2024, 3, 20), 0),
+        _name(date(2024, 3, 20), 12),
+        _name(date(2024, 2, 1)),  # past daily_days
+        daily_archive_name(date(2024, 2, 2)),
+        "latest.json",
+        "data_not-a-date.json",
+    ]
+
+    plan = plan_retention(names, TODAY, keep_days=7, daily_days=28)
+
+    assert plan == {
+        daily_archive_name(date(2024, 3, 20)): [
+            _name(date(2024, 3, 20), 0),
+            _name(date(2024, 3, 20), 12),
+        ],
+        # 1 and 2 February share an ISO week
+        weekly_archive_name(date(2024, 2, 1)): [
+            daily_archive_name(date(2024, 2, 2)),
+            _name(date(2024, 2, 1)),
+        ],
+    }
+
+
+def test_plan_never_touches_protected() -> None:
+    old = _name(date(2024, 1, 1))
+
+    assert plan_retention([old], TODAY, protected=[old]) == {}
+
+
+def test_roll_up_verifies_before_deleting() -> None:
+    minio = FakeMinio()
+    minio.add_snapshot(_name(date(2024, 3, 1)), _leaderboard(1))
+    minio.corrupt_writes = True
+
+    with pytest.raises(ArchiveError):
+        retention.roll_up(
+            minio,
+            "bucket",
+            daily_archive_name(date(2024, 3, 1)),
+            [_name(date(2024, 3, 1))],
+        )
+
+    assert _name(date(2024, 3, 1)) in minio.objects
+
+
+def test_apply_retention_extends_archives_and_dry_run_changes_nothing() -> None:
+    minio = FakeMinio()
+    day = date(2024, 3, 1)
+    archive_name = daily_archive_name(day)
+    for hour in (0, 12):
+        minio.add_snapshot(_name(day, hour), _leaderboard(hour))
+
+    before = dict(minio.objects)
+    assert apply_retention(minio, "bucket", TODAY, dry_run=True) == {
+        archive_name: "would archive 2"
+    }
+    assert minio.objects == before
+
+    apply_retention(minio, "bucket", TODAY)
+    # A snapshot a previous run failed to roll up joins the existing archive
+    minio.add_snapshot(_name(day, 18), _leaderboard(18))
+    apply_retention(minio, "bucket", TODAY)
+
+    assert sorted(minio.objects) == [archive_name]
+    assert decode_archive(minio.objects[archive_name][0]) == {
+        _name(day, hour): _leaderboard(hour) for hour in (0, 12, 18)
+    }
+
+
+@pytest.mark.parametrize("pointer", [b"{not json", b"{}"])
+def test_unreadable_latest_pointer_does_not_stop_retention(pointer) -> None:
+    minio = FakeMinio()
+    day = date(2024, 3, 1)
+    minio.add_snapshot(_name(day), _leaderboard(1))
+    minio.objects["latest.json"] = (pointer, {})
+
+    assert apply_retention(minio, "bucket", TODAY) == {
+        daily_archive_name(day): "archived 1"
+    }
+
+
+@pytest.fixture
+def local_minio():
+    """A scratch bucket on the MinIO from docker-compose, if one is running"""
+    endpoint = os.environ.get("MINIO_ENDPOINT", "localhost:9000")
+    host, port = endpoint.split(":")
+    try:
+        socket.create_connection((host, int(port)), timeout=1).close()
+    except OSError:
+        pytest.skip(f"No local MinIO at {endpoint}")
+
+    client = Minio(
+        endpoint=endpoint,
+        access_key=os.environ.get("MINIO_ROOT_USER", "minioadmin"),
+        secret_key=os.environ.get("MINIO_ROOT_PASSWORD", "minioadmin"),
+        secure=False,
+    )
+    bucket_name = f"pubg-retention-test-{uuid.uuid4().hex[:8]}"
+    client.make_bucket(bucket_name)
+    yield client, bucket_name
+    for obj in client.list_objects(bucket_name):
+        client.remove_object(bucket_name, obj.object_name)
+    client.remove_bucket(bucket_name)
+
+
+def test_retention_against_local_minio(local_minio) -> None:
+    client, bucket_name = local_minio
+    names = [_name(date(2024, 3, 1), hour) for hour in range(3)] + [
+        _name(date(2024, 3, 30))
+    ]
+    for seed, name in enumerate(names):
+        body = json.dumps(_leaderboard(seed)).encode()
+        client.put_object(bucket_name, name, BytesIO(body), len(body))
+
+    results = apply_retention(client, bucket_name, TODAY)
+
+    archive_name = daily_archive_name(date(2024, 3, 1))
+    assert results == {archive_name: "archived 3"}
+    remaining = sorted(obj.object_name for obj in client.list_objects(bucket_name))
+    assert remaining == [archive_name, _name(date(2024, 3, 30))]
+    response = client.get_object(bucket_name, archive_name)
+    try:
+        archive = decode_archive(response.read())
+    finally:
+        response.close()
+        response.release_conn()
+    assert archive == {name: _leaderboard(seed) for seed, name in enumerate(names[:3])}
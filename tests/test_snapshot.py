@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from pubg.snapshot import (
+    COLUMNAR_FORMAT,
+    JSON_FORMAT,
+    SnapshotTooLarge,
+    decode_snapshot,
+    encode_snapshot,
+    iter_snapshot,
+)
+
+DATA = {
+    "account.a": {"rank": 1, "wins": 40, "games_played": 120},
+    "account.ü": {"rank": 2, "wins": 0, "games_played": 2**31 - 1},
+    "account.c": {"rank": 3, "wins": None, "games_played": 7},
+}
+
+
+def _as_headers(metadata):
+    return {f"x-amz-meta-{key}": value for key, value in metadata.items()}
+
+
+@pytest.mark.parametrize("fmt", [JSON_FORMAT, COLUMNAR_FORMAT])
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_snapshot_round_trip(fmt, compression) -> None:
+    body, metadata, _ = encode_snapshot(DATA, fmt=fmt, compression=compression)
+
+    assert decode_snapshot(body, _as_headers(metadata)) == DATA
+
+
+def test_legacy_json_without_metadata() -> None:
+    assert decode_snapshot(b'{"account.a": {"rank": 1}}', {}) == {
+        "account.a": {"rank": 1}
+    }
+
+
+def test_columnar_is_smaller_than_json() -> None:
+    data = {
+        f"account.{i:032x}": {"rank": i, "wins": i % 50, "games_played": i % 300}
+        for i in range(500)
+    }
+    json_body, _, _ = encode_snapshot(data, fmt=JSON_FORMAT)
+    columnar_body, _, _ = encode_snapshot(data, fmt=COLUMNAR_FORMAT)
+
+    assert len(columnar_body) < len(json_body) * 0.6
+
+
+def test_unknown_format_rejected() -> None:
+    with pytest.raises(ValueError):
+        decode_snapshot(b"", {"x-amz-meta-pubg-format": "parquet"})
+
+
+def _chunked(body, size):
+    return (body[i : i + size] for i in range(0, len(body), size))
+
+
+@pytest.mark.parametrize("fmt", [JSON_FORMAT, COLUMNAR_FORMAT])
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_snapshot_matches_decode(fmt, compression, chunk_size) -> None:
+    body, metadata, _ = encode_snapshot(DATA, fmt=fmt, compression=compression)
+
+    batches = list(
+        iter_snapshot(_chunked(body, chunk_size), _as_headers(metadata), batch_size=2)
+    )
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert {k: v for batch in batches for k, v in batch.items()} == DATA
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 16, 4096])
+def test_iter_snapshot_cuts_only_between_players(chunk_size) -> None:
+    # Nested values and "}," inside strings must not be mistaken for player boundaries
+    data = {
+        f"account.{i}}},": {"rank": i, "extra": {"a": {"b": i}, "c": "},"}}
+        for i in range(20)
+    }
+    body = json.dumps(data).encode()
+
+    batches = list(iter_snapshot(_chunked(body, chunk_size), {}, batch_size=7))
+
+    assert {k: v for batch in batches for k, v in batch.items()} == data
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"[1, 2]", b'{"account.a": {"rank": 1} "account.b": {}}', b'{"account.a": {'],
+)
+def test_iter_snapshot_rejects_malformed_json(body) -> None:
+    with pytest.raises(ValueError):
+        list(iter_snapshot(_chunked(body, 4), {}))
+
+
+def test_iter_snapshot_enforces_max_size() -> None:
+    body, metadata, _ = encode_snapshot(DATA, compression="gzip")
+
+    # The decompressed size is bounded too, not just the bytes downloaded
+    with pytest.raises(SnapshotTooLarge):
+        list(iter_snapshot([body], _as_headers(metadata), max_size=len(body) + 1))